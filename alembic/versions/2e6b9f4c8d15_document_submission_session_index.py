@@ -0,0 +1,40 @@
+"""document submission session index
+
+Revision ID: 2e6b9f4c8d15
+Revises: 8c41e2f07a93
+Create Date: 2026-10-17 15:08:12.640391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e6b9f4c8d15'
+down_revision: Union[str, Sequence[str], None] = '8c41e2f07a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Historical rows are linked to their sessions by scripts/backfill_submission_sessions.py
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_document_submissions_session_template',
+            'document_submissions',
+            ['session_id', 'template_id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_document_submissions_session_template',
+            table_name='document_submissions',
+            postgresql_concurrently=True,
+        )
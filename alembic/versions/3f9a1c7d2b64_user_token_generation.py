@@ -0,0 +1,28 @@
+"""user token generation
+
+Revision ID: 3f9a1c7d2b64
+Revises: 86c6eaea8622
+Create Date: 2026-10-17 09:12:44.318201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c7d2b64'
+down_revision: Union[str, Sequence[str], None] = '86c6eaea8622'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_generation', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_generation')
@@ -0,0 +1,39 @@
+"""template keyset pagination indexes
+
+Revision ID: 5d0c8e3a71f2
+Revises: b7e24d90c1a5
+Create Date: 2026-10-17 12:06:27.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0c8e3a71f2'
+down_revision: Union[str, Sequence[str], None] = 'b7e24d90c1a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('document_templates', 'onboarding_templates')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                f'ix_{table}_company_created_id',
+                table,
+                ['company_id', 'created_at', 'id'],
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.drop_index(f'ix_{table}_company_created_id', table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,52 @@
+"""unique onboarding task per todo
+
+Revision ID: 8c41e2f07a93
+Revises: 5d0c8e3a71f2
+Create Date: 2026-10-17 14:22:48.304175
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41e2f07a93'
+down_revision: Union[str, Sequence[str], None] = '5d0c8e3a71f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent first loads of /onboarding/my-data could create the same task
+    # twice. Keep one row per (session, todo), preferring a completed one.
+    op.execute("""
+        DELETE FROM onboarding_tasks t
+        USING onboarding_tasks keep
+        WHERE keep.session_id = t.session_id
+          AND keep.todo_item_id = t.todo_item_id
+          AND (keep.is_completed, -keep.id) > (t.is_completed, -t.id)
+    """)
+    op.create_unique_constraint(
+        'uq_onboarding_tasks_session_todo',
+        'onboarding_tasks',
+        ['session_id', 'todo_item_id'],
+    )
+
+    # Tasks used to be created lazily on the first GET; create them now for
+    # open sessions that never loaded their checklist.
+    op.execute("""
+        INSERT INTO onboarding_tasks (session_id, todo_item_id, title, description, is_completed)
+        SELECT s.id, t.id, t.title, t.description, false
+        FROM onboarding_sessions s
+        JOIN todo_items t ON t.template_id = s.template_id
+        WHERE s.status NOT IN ('onboarded', 'expired')
+        ON CONFLICT (session_id, todo_item_id) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_onboarding_tasks_session_todo', 'onboarding_tasks', type_='unique')
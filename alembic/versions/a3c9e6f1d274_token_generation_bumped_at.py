@@ -0,0 +1,38 @@
+"""token generation bumped at
+
+Revision ID: a3c9e6f1d274
+Revises: d82a7f3e5b16
+Create Date: 2026-10-17 22:14:03.581942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e6f1d274'
+down_revision: Union[str, Sequence[str], None] = 'd82a7f3e5b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_generation_bumped_at', sa.DateTime(timezone=True), nullable=True))
+    # The bump time of existing revocations is unknown; treat them as recent so
+    # they are kept for one more token lifetime
+    op.execute("UPDATE users SET token_generation_bumped_at = now() WHERE token_generation > 0")
+    op.create_index(
+        'ix_users_token_generation_bumped_at',
+        'users',
+        ['token_generation_bumped_at'],
+        postgresql_where=sa.text('token_generation_bumped_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_token_generation_bumped_at', table_name='users')
+    op.drop_column('users', 'token_generation_bumped_at')
@@ -0,0 +1,40 @@
+"""onboarding session expiry index
+
+Revision ID: a4d2e81c6f37
+Revises: 2e6b9f4c8d15
+Create Date: 2026-10-17 16:22:47.918204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d2e81c6f37'
+down_revision: Union[str, Sequence[str], None] = '2e6b9f4c8d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_onboarding_sessions_pending_expires',
+            'onboarding_sessions',
+            ['expires_at'],
+            postgresql_where=sa.text("status = 'pending'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_onboarding_sessions_pending_expires',
+            table_name='onboarding_sessions',
+            postgresql_concurrently=True,
+        )
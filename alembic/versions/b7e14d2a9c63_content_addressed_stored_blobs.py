@@ -0,0 +1,47 @@
+"""content addressed stored blobs
+
+Revision ID: b7e14d2a9c63
+Revises: f3a8c6d19b42
+Create Date: 2026-10-17 19:02:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e14d2a9c63'
+down_revision: Union[str, Sequence[str], None] = 'f3a8c6d19b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stored_blobs',
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.LargeBinary(length=32), nullable=False),
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('company_id', 'sha256'),
+    )
+    op.create_index(
+        'ix_stored_blobs_unreferenced',
+        'stored_blobs',
+        ['last_used_at'],
+        postgresql_where=sa.text('ref_count = 0'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stored_blobs_unreferenced', table_name='stored_blobs')
+    op.drop_table('stored_blobs')
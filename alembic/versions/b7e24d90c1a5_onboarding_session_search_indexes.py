@@ -0,0 +1,63 @@
+"""onboarding session search indexes
+
+Revision ID: b7e24d90c1a5
+Revises: 3f9a1c7d2b64
+Create Date: 2026-10-17 10:41:03.552817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e24d90c1a5'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_INDEXES = {
+    'ix_onboarding_sessions_first_name_trgm': 'firstName',
+    'ix_onboarding_sessions_last_name_trgm': 'lastName',
+    'ix_onboarding_sessions_email_trgm': 'new_employee_email',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Build concurrently so large tenants' tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_onboarding_sessions_company_status_created',
+            'onboarding_sessions',
+            ['company_id', 'status', 'created_at'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_onboarding_sessions_company_open_created',
+            'onboarding_sessions',
+            ['company_id', 'created_at'],
+            postgresql_where=sa.text("status <> 'onboarded'"),
+            postgresql_concurrently=True,
+        )
+        for index_name, column in TRGM_INDEXES.items():
+            op.create_index(
+                index_name,
+                'onboarding_sessions',
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for index_name in TRGM_INDEXES:
+            op.drop_index(index_name, table_name='onboarding_sessions', postgresql_concurrently=True)
+        op.drop_index('ix_onboarding_sessions_company_open_created', table_name='onboarding_sessions', postgresql_concurrently=True)
+        op.drop_index('ix_onboarding_sessions_company_status_created', table_name='onboarding_sessions', postgresql_concurrently=True)
@@ -0,0 +1,48 @@
+"""email outbox
+
+Revision ID: c5f0a93e1d48
+Revises: b7e14d2a9c63
+Create Date: 2026-10-17 19:48:12.530947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f0a93e1d48'
+down_revision: Union[str, Sequence[str], None] = 'b7e14d2a9c63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('recipient', sa.String(), nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('html_body', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(), server_default='pending', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_email_outbox_due',
+        'email_outbox',
+        ['next_attempt_at'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_email_outbox_due', table_name='email_outbox')
+    op.drop_table('email_outbox')
@@ -0,0 +1,29 @@
+"""company settings version
+
+Revision ID: d82a7f3e5b16
+Revises: c5f0a93e1d48
+Create Date: 2026-10-17 21:05:37.214806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd82a7f3e5b16'
+down_revision: Union[str, Sequence[str], None] = 'c5f0a93e1d48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default is stored in the catalog, so existing rows are not rewritten
+    op.add_column('companies', sa.Column('settings_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('companies', 'settings_version')
@@ -0,0 +1,30 @@
+"""document template upload limits
+
+Revision ID: f3a8c6d19b42
+Revises: e91b3c5d7a20
+Create Date: 2026-10-17 18:11:05.473116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c6d19b42'
+down_revision: Union[str, Sequence[str], None] = 'e91b3c5d7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('document_templates', sa.Column('max_file_size_bytes', sa.BigInteger(), nullable=True))
+    op.add_column('document_templates', sa.Column('allowed_content_types', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('document_templates', 'allowed_content_types')
+    op.drop_column('document_templates', 'max_file_size_bytes')
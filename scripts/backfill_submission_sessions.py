@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import time
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from klaraflow.config.settings import settings
+
+#? --- Run ---
+# poetry run python -m scripts.backfill_submission_sessions --batch-size 5000
+#
+# Links document submissions created before submissions were bound to their
+# onboarding session. A submission belongs to the most recent session of its
+# company with the same employee id. Rows are processed in primary key order,
+# one short transaction per batch, so the table stays writable and the script
+# can be stopped and re-run at any time.
+
+NEXT_BATCH_SQL = text("""
+SELECT id FROM document_submissions
+WHERE session_id IS NULL AND id > :after_id
+ORDER BY id
+LIMIT :batch_size
+""")
+
+LINK_BATCH_SQL = text("""
+UPDATE document_submissions ds
+SET session_id = (
+    SELECT s.id FROM onboarding_sessions s
+    WHERE s.company_id = ds.company_id AND s."empId" = ds.employee_id
+    ORDER BY s.created_at DESC
+    LIMIT 1
+)
+WHERE ds.id = ANY(:ids) AND ds.session_id IS NULL
+""")
+
+
+async def backfill(batch_size: int, pause: float):
+    engine = create_async_engine(settings.DATABASE_URL_ASYNC, echo=False)
+    after_id = 0
+    scanned = 0
+    linked = 0
+    started = time.perf_counter()
+
+    try:
+        while True:
+            async with engine.begin() as conn:
+                ids = (await conn.execute(
+                    NEXT_BATCH_SQL, {"after_id": after_id, "batch_size": batch_size}
+                )).scalars().all()
+                if not ids:
+                    break
+                await conn.execute(LINK_BATCH_SQL, {"ids": list(ids)})
+                linked += (await conn.execute(
+                    text("SELECT count(*) FROM document_submissions WHERE id = ANY(:ids) AND session_id IS NOT NULL"),
+                    {"ids": list(ids)},
+                )).scalar_one()
+
+            scanned += len(ids)
+            after_id = ids[-1]
+            print(f"🔗 {scanned:,} submissions scanned, {linked:,} linked (up to id {after_id})")
+            if pause:
+                await asyncio.sleep(pause)
+    finally:
+        await engine.dispose()
+
+    print(f"✅ Done in {time.perf_counter() - started:.1f}s: {linked:,}/{scanned:,} submissions linked to a session")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Link historical document submissions to onboarding sessions")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.batch_size, args.pause))
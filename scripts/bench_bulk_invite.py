@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from klaraflow.config.settings import settings
+from klaraflow.crud import onboarding_crud
+from klaraflow.models import Company, Department, Designation, OnboardingTemplate, TodoItem
+from klaraflow.schemas.onboarding_schema import OnboardingInviteRequest
+
+#? --- Run ---
+# poetry run python -m scripts.bench_bulk_invite --rows 1000
+# poetry run python -m scripts.bench_bulk_invite --rows 5000 --todos 20 --repeat 5 --output bulk_invite_bench.json
+#
+# Invites --rows employees to a template with --todos todos, once through
+# bulk_invite_employees (POST /onboarding/invite/bulk) and once row by row
+# through invite_new_employee (POST /onboarding/invite), and prints the median
+# time and SQL statement count of each. Every run happens in a transaction
+# that is rolled back, so nothing is left behind. Needs a migrated PostgreSQL
+# database: the duplicate check binds a Postgres array.
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+async def seed(db: AsyncSession, todos: int) -> dict:
+    """Company, template and lookups for one run; rolled back together with the invitations."""
+    company = Company(name=f"bulk-invite-bench-{uuid.uuid4().hex[:8]}")
+    db.add(company)
+    await db.flush()
+    template = OnboardingTemplate(company_id=company.id, name="bench template")
+    designation = Designation(company_id=company.id, name="bench designation")
+    department = Department(company_id=company.id, name="bench department")
+    db.add_all([template, designation, department])
+    await db.flush()
+    db.add_all([TodoItem(template_id=template.id, title=f"todo {i}", description="bench") for i in range(todos)])
+    await db.flush()
+    return {
+        "company_id": company.id,
+        "onboardingTemplateId": template.id,
+        "designation": str(designation.id),
+        "department": str(department.id),
+    }
+
+
+def invite_rows(rows: int, ids: dict) -> list:
+    run = uuid.uuid4().hex[:8]
+    return [
+        (number, {
+            "empId": f"B{run}-{number}",
+            "firstName": "Bench",
+            "lastName": f"Employee {number}",
+            "email": f"bench-{run}-{number}@example.com",
+            "gender": "other",
+            "userRole": "employee",
+            "designation": ids["designation"],
+            "department": ids["department"],
+            "onboardingTemplateId": ids["onboardingTemplateId"],
+        })
+        for number in range(1, rows + 1)
+    ]
+
+
+async def bulk_path(db: AsyncSession, ids: dict, rows: list) -> int:
+    report = await onboarding_crud.bulk_invite_employees(db, company_id=ids["company_id"], rows=rows)
+    return report.invited
+
+
+async def per_row_path(db: AsyncSession, ids: dict, rows: list) -> int:
+    for _, record in rows:
+        await onboarding_crud.invite_new_employee(
+            db, invite_data=OnboardingInviteRequest.model_validate(record), company_id=ids["company_id"]
+        )
+    return len(rows)
+
+
+async def sample(engine, counter: StatementCounter, path, rows: int, todos: int) -> tuple[float, int]:
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        ids = await seed(db, todos)
+        records = invite_rows(rows, ids)
+        counter.count = 0
+        started = time.perf_counter()
+        invited = await path(db, ids, records)
+        await db.flush()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        statements = counter.count
+        await db.rollback()
+    assert invited == rows, f"expected {rows} invitations, got {invited}"
+    return elapsed_ms, statements
+
+
+async def run_benchmark(rows: int, todos: int, repeat: int, output: str | None):
+    engine = create_async_engine(settings.DATABASE_URL_ASYNC, echo=False)
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+
+    results = {}
+    try:
+        print(f"Inviting {rows:,} employees to a template with {todos} todos, median of {repeat} runs\n")
+        print(f"{'path':<8} {'median ms':>10} {'rows/s':>10} {'statements':>11}")
+        for label, path in (("bulk", bulk_path), ("per-row", per_row_path)):
+            # Warm up the connection and the statement caches
+            await sample(engine, counter, path, min(rows, 10), todos)
+            runs = [await sample(engine, counter, path, rows, todos) for _ in range(repeat)]
+            median_ms = statistics.median(elapsed for elapsed, _ in runs)
+            statements = runs[-1][1]
+            results[label] = {"median_ms": round(median_ms, 2), "rows_per_second": round(rows / median_ms * 1000), "statements": statements}
+            print(f"{label:<8} {median_ms:>10.1f} {rows / median_ms * 1000:>10,.0f} {statements:>11,}")
+
+        speedup = results["per-row"]["median_ms"] / results["bulk"]["median_ms"]
+        print(f"\nbulk is {speedup:.1f}x faster than inviting row by row in one transaction")
+        if output:
+            with open(output, "w") as f:
+                json.dump({"rows": rows, "todos": todos, "repeat": repeat, "results": results}, f, indent=2)
+            print(f"📝 Results written to {output}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk employee invitations against one invite per row")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--todos", type=int, default=10, help="todos on the invited template, i.e. tasks created per invitation")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per path; the median is reported")
+    parser.add_argument("--output", help="write the timings to this JSON file")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.rows, args.todos, args.repeat, args.output))
@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import statistics
+import time
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from klaraflow.base.responses import create_response
+from klaraflow.config.settings import settings
+from klaraflow.crud import onboarding_crud
+
+#? --- Run ---
+# poetry run python -m scripts.bench_onboarding_data --email new.hire@example.com
+#
+# Compares the two data-access paths behind GET /onboarding/my-data for an
+# existing onboarding session: the ORM path (compiled view cache + overlay,
+# serialized by create_response) and the single-statement json_build_object
+# path. Each sample uses a fresh session and includes building the response
+# body, so both sides pay for a connection checkout and serialization.
+
+MESSAGE = "Onboarding data retrieved successfully"
+
+
+async def orm_path(db: AsyncSession, email: str) -> bytes:
+    data = await onboarding_crud.get_onboarding_data_for_user(db, user_email=email)
+    return create_response(data=data, message=MESSAGE, exclude_none=True).body
+
+
+async def json_path(db: AsyncSession, email: str) -> bytes:
+    return await onboarding_crud.get_onboarding_data_json(db, user_email=email, message=MESSAGE)
+
+
+async def sample(engine, path, email: str, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            await path(db, email)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def summarize(label: str, timings: list[float]):
+    ordered = sorted(timings)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<6} p50 {statistics.median(ordered):8.2f} ms   p99 {p99:8.2f} ms   max {ordered[-1]:8.2f} ms")
+
+
+async def run_benchmark(email: str, iterations: int, warmup: int):
+    engine = create_async_engine(settings.DATABASE_URL_ASYNC, echo=False)
+    try:
+        for label, path in (("orm", orm_path), ("json", json_path)):
+            await sample(engine, path, email, warmup)
+            summarize(label, await sample(engine, path, email, iterations))
+
+        async with AsyncSession(engine) as db:
+            orm_bytes = await orm_path(db, email)
+            json_bytes = await json_path(db, email)
+        print(f"\nresponse size: orm {len(orm_bytes):,} bytes, json {len(json_bytes):,} bytes")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the onboarding data access paths")
+    parser.add_argument("--email", required=True, help="email of an existing onboarding session")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.email, args.iterations, args.warmup))
@@ -0,0 +1,155 @@
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import time
+from typing import Any, Dict
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.schema import CreateIndex
+from klaraflow.config.settings import settings
+from klaraflow.crud.onboarding_crud import build_onboarding_session_search
+from klaraflow.models import OnboardingSession
+
+#? --- Run ---
+# poetry run python -m scripts.bench_onboarding_session_search --rows 1000000
+# poetry run python -m scripts.bench_onboarding_session_search --repeat 5 --output search_bench.json
+#
+# Seeds a scratch copy of onboarding_sessions (in its own schema, dropped at the
+# end unless --keep is given) and prints EXPLAIN (ANALYZE, BUFFERS) for the
+# list_onboarding_sessions query shapes before and after creating the search
+# indexes declared on the OnboardingSession model. Each query is run --repeat
+# times; the median server-side execution time of each shape is summarized
+# before/after with the speedup and written to --output as JSON if given.
+# Needs a migrated database and the pg_trgm extension.
+
+BENCH_SCHEMA = "bench_onboarding_search"
+LARGE_TENANT_ID = 1
+
+# (label, kwargs for build_onboarding_session_search)
+QUERIES = [
+    ("open sessions of a large tenant", {"company_id": LARGE_TENANT_ID}),
+    ("status filter", {"company_id": LARGE_TENANT_ID, "status": "submitted"}),
+    ("first name contains", {"company_id": LARGE_TENANT_ID, "first_name": "ann"}),
+    ("last name contains", {"company_id": LARGE_TENANT_ID, "last_name": "smi"}),
+    ("email contains", {"company_id": LARGE_TENANT_ID, "email": "42@"}),
+]
+
+SEED_SQL = f"""
+INSERT INTO onboarding_sessions (
+    id, company_id, new_employee_email, status, current_step,
+    invitation_token_hash, created_at, expires_at, "firstName", "lastName"
+)
+SELECT
+    g,
+    -- 40% of the rows belong to one large tenant, the rest spread over 500 tenants
+    CASE WHEN g % 5 < 2 THEN {LARGE_TENANT_ID} ELSE 2 + (g % 500) END,
+    'employee' || g || '@example.com',
+    (ARRAY['pending', 'in_progress', 'submitted', 'onboarded', 'onboarded', 'expired'])[1 + g % 6],
+    1,
+    sha256(g::text::bytea),
+    now() - (g || ' seconds')::interval,
+    now() - (g || ' seconds')::interval + interval '24 hours',
+    (ARRAY['Anna', 'Joanne', 'Brian', 'Carlos', 'Dana', 'Hannah', 'Ivan', 'Mei'])[1 + g % 8] || substr(md5(g::text), 1, 4),
+    (ARRAY['Smith', 'Khan', 'Garcia', 'Nguyen', 'Smirnov', 'Okafor'])[1 + g % 6] || substr(md5((g * 7)::text), 1, 4)
+FROM generate_series(1, :rows) AS g
+"""
+
+
+EXECUTION_TIME = re.compile(r"Execution Time: ([\d.]+) ms")
+SCAN_NODE = re.compile(r"((?:Parallel )?(?:Seq|Index|Index Only|Bitmap Heap|Bitmap Index) Scan)")
+
+
+async def explain_all(conn, heading: str, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Print the plan of every query shape; returns median execution time and scan types per shape."""
+    print(f"\n===== {heading} =====")
+    results = {}
+    for label, filters in QUERIES:
+        stmt = build_onboarding_session_search(**filters).order_by(
+            OnboardingSession.created_at.desc(), OnboardingSession.id.desc()
+        ).limit(100)
+        sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            plan = [line for (line,) in result.all()]
+            timings.append(float(EXECUTION_TIME.search(plan[-1]).group(1)))
+        print(f"\n--- {label} ({elapsed_ms:.1f} ms wall, last of {repeat}) ---")
+        for line in plan:
+            print(line)
+        results[label] = {
+            "execution_ms": statistics.median(timings),
+            "scans": sorted({match.group(1) for line in plan for match in SCAN_NODE.finditer(line)}),
+        }
+    return results
+
+
+def print_summary(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]]) -> None:
+    print("\n===== SUMMARY (median execution time) =====")
+    print(f"{'query':<34} {'before ms':>10} {'after ms':>10} {'speedup':>8}  scans before -> after")
+    for label, _ in QUERIES:
+        b, a = before[label], after[label]
+        speedup = b["execution_ms"] / a["execution_ms"] if a["execution_ms"] else float("inf")
+        print(
+            f"{label:<34} {b['execution_ms']:>10.2f} {a['execution_ms']:>10.2f} {speedup:>7.1f}x"
+            f"  {', '.join(b['scans'])} -> {', '.join(a['scans'])}"
+        )
+
+
+async def run_benchmark(rows: int, keep: bool, repeat: int, output: str | None):
+    engine = create_async_engine(settings.DATABASE_URL_ASYNC, echo=False)
+    search_indexes = [
+        index for index in OnboardingSession.__table__.indexes
+        if index.name.startswith("ix_onboarding_sessions_company_") or index.name.endswith("_trgm")
+    ]
+
+    try:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE")
+            await conn.exec_driver_sql(f"CREATE SCHEMA {BENCH_SCHEMA}")
+            await conn.exec_driver_sql(f"SET search_path TO {BENCH_SCHEMA}, public")
+            # Same columns and defaults as the real table, but no indexes or constraints
+            await conn.exec_driver_sql(
+                f"CREATE TABLE {BENCH_SCHEMA}.onboarding_sessions "
+                f"(LIKE public.onboarding_sessions INCLUDING DEFAULTS)"
+            )
+
+            print(f"🌱 Seeding {rows:,} onboarding sessions into {BENCH_SCHEMA}...")
+            started = time.perf_counter()
+            await conn.exec_driver_sql(SEED_SQL.replace(":rows", str(int(rows))))
+            await conn.exec_driver_sql(f"ALTER TABLE {BENCH_SCHEMA}.onboarding_sessions ADD PRIMARY KEY (id)")
+            await conn.exec_driver_sql(f"ANALYZE {BENCH_SCHEMA}.onboarding_sessions")
+            print(f"✅ Seeded in {time.perf_counter() - started:.1f}s")
+
+            before = await explain_all(conn, "BEFORE (primary key only)", repeat)
+
+            print(f"\n🔧 Creating {len(search_indexes)} search indexes...")
+            started = time.perf_counter()
+            for index in search_indexes:
+                await conn.execute(CreateIndex(index))
+            await conn.exec_driver_sql(f"ANALYZE {BENCH_SCHEMA}.onboarding_sessions")
+            print(f"✅ Indexes built in {time.perf_counter() - started:.1f}s")
+
+            after = await explain_all(conn, "AFTER (search indexes)", repeat)
+            print_summary(before, after)
+            if output:
+                with open(output, "w") as f:
+                    json.dump({"rows": rows, "repeat": repeat, "before": before, "after": after}, f, indent=2)
+                print(f"\n📝 Results written to {output}")
+
+            if not keep:
+                await conn.exec_driver_sql(f"DROP SCHEMA {BENCH_SCHEMA} CASCADE")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark onboarding session search indexes")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema for manual inspection")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per query; the median execution time is reported")
+    parser.add_argument("--output", help="write the before/after timings to this JSON file")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.rows, args.keep, args.repeat, args.output))
@@ -0,0 +1,111 @@
+import argparse
+import json
+import statistics
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from klaraflow.base.responses import SuccessResponse, create_response
+from klaraflow.schemas.document_schema import DocumentFieldRead, DocumentTemplateRead
+
+#? --- Run ---
+# poetry run python -m scripts.bench_response_serialization --templates 500 --fields 20
+#
+# Serializes a page of document templates (the GET /document/templates payload)
+# through the previous create_response pipeline and the current one, checks
+# that both produce the same JSON and prints the time per response.
+#   legacy - model_dump(mode="json") per template in the route, SuccessResponse
+#            model_dump, jsonable_encoder, then stdlib json in JSONResponse
+#   single - create_response with the models themselves, one pydantic-core pass
+
+
+def make_templates(count: int, fields: int) -> list[DocumentTemplateRead]:
+    now = datetime.now(timezone.utc)
+    return [
+        DocumentTemplateRead(
+            id=template_id,
+            company_id=1,
+            name=f"Template {template_id}",
+            max_file_size_bytes=25 * 1024 * 1024,
+            allowed_content_types=["application/pdf", "image/png"],
+            created_at=now,
+            updated_at=now,
+            fields=[
+                DocumentFieldRead(
+                    id=template_id * 1000 + field_id,
+                    template_id=template_id,
+                    label=f"Field {field_id}",
+                    type="text",
+                    required=field_id % 2 == 0,
+                    created_at=now,
+                )
+                for field_id in range(fields)
+            ],
+        )
+        for template_id in range(count)
+    ]
+
+
+def legacy_create_response(data, message: str | None = None, next_cursor: str | None = None) -> bytes:
+    content = SuccessResponse(data=data, message=message, next_cursor=next_cursor).model_dump(exclude_none=True)
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def legacy_response(templates: list[DocumentTemplateRead]) -> bytes:
+    data = [template.model_dump(mode="json") for template in templates]
+    return legacy_create_response(data, message="Document templates retrieved successfully", next_cursor="abc")
+
+
+# Payloads routes still pass as plain dicts, e.g. the document submission response
+DICT_CASES = {
+    "submission": {
+        "id": 1,
+        "template_id": 2,
+        "employee_id": "EMP-1",
+        "uploaded_at": datetime(2026, 10, 17, 9, 30, 15, 123456, tzinfo=timezone.utc),
+        "file_paths": {"passport.pdf": "/uploads/blobs/1/ab/abcdef"},
+    },
+    "naive datetime and date": {"created_at": datetime(2026, 1, 2, 3, 4, 5), "hiring_date": date(2026, 2, 1)},
+    "decimal": {"amount": Decimal("1234.50"), "rate": Decimal("0.075"), "whole": Decimal("10")},
+    "nested": {"items": [{"at": datetime(2026, 10, 17, tzinfo=timezone.utc), "value": None}], "empty": {}},
+    "list of dicts": [{"id": 1, "score": Decimal("2.5")}, {"id": 2, "score": None}],
+}
+
+
+def check_dict_cases() -> None:
+    for label, data in DICT_CASES.items():
+        legacy = legacy_create_response(data, message="ok")
+        single = create_response(data=data, message="ok").body
+        if legacy != single:
+            raise SystemExit(f"Responses differ for {label}:\n  legacy {legacy.decode()}\n  single {single.decode()}")
+    print(f"{len(DICT_CASES)} dict payloads encode the same in both pipelines")
+
+
+def single_pass_response(templates: list[DocumentTemplateRead]) -> bytes:
+    return create_response(data=templates, message="Document templates retrieved successfully", next_cursor="abc").body
+
+
+def measure(label: str, serialize, templates, samples: int) -> None:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        body = serialize(templates)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<7} median {statistics.median(timings):8.2f} ms   min {min(timings):8.2f} ms   {len(body) / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="create_response serialization cost")
+    parser.add_argument("--templates", type=int, default=500)
+    parser.add_argument("--fields", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=20)
+    args = parser.parse_args()
+
+    check_dict_cases()
+    templates = make_templates(args.templates, args.fields)
+    if json.loads(legacy_response(templates)) != json.loads(single_pass_response(templates)):
+        raise SystemExit("Responses differ")
+    print(f"{args.templates} templates x {args.fields} fields\n")
+    measure("legacy", legacy_response, templates, args.samples)
+    measure("single", single_pass_response, templates, args.samples)
@@ -0,0 +1,95 @@
+import asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from klaraflow.config.settings import settings
+from klaraflow.crud import document_template_crud, onboarding_template_crud
+from klaraflow.models import Company
+from klaraflow.schemas.document_schema import DocumentTemplateCreate
+from klaraflow.schemas.onboarding_schema import OnboardingTemplateCreate, OnboardingTemplateUpdate
+
+#? --- Run ---
+# poetry run python -m scripts.bench_template_statement_counts
+#
+# Creates and updates templates of growing size inside a single transaction
+# that is rolled back at the end, and prints how many SQL statements each
+# CRUD call issued. The counts should stay flat as templates grow.
+
+# (fields per document template, todos, document templates per onboarding template)
+SIZES = [(1, 1, 1), (10, 10, 5), (50, 50, 20)]
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+async def count(counter: StatementCounter, coro):
+    counter.count = 0
+    result = await coro
+    return result, counter.count
+
+
+async def run_benchmark():
+    engine = create_async_engine(settings.DATABASE_URL_ASYNC, echo=False)
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            company = Company(name="statement-count-bench")
+            db.add(company)
+            await db.flush()
+
+            print(f"{'fields':>6} {'todos':>6} {'docs':>6} | {'doc create':>10} {'tpl create':>10} {'tpl update':>10}")
+            for field_count, todo_count, doc_count in SIZES:
+                doc_statements = []
+                docs = []
+                for d in range(doc_count):
+                    doc, statements = await count(counter, document_template_crud.create_document_template(
+                        db,
+                        template_data=DocumentTemplateCreate(
+                            name=f"bench doc {d}",
+                            fields=[{"label": f"field {i}", "type": "text"} for i in range(field_count)],
+                        ),
+                        company_id=company.id,
+                    ))
+                    docs.append(doc)
+                    doc_statements.append(statements)
+
+                doc_ids = [doc.id for doc in docs]
+                template, create_statements = await count(counter, onboarding_template_crud.create_onboarding_template(
+                    db,
+                    template_data=OnboardingTemplateCreate(
+                        name="bench template",
+                        todos=[{"title": f"todo {i}"} for i in range(todo_count)],
+                        required_document_ids=doc_ids[::2],
+                        optional_document_ids=doc_ids[1::2],
+                    ),
+                    company_id=company.id,
+                ))
+
+                _, update_statements = await count(counter, onboarding_template_crud.update_onboarding_template(
+                    db,
+                    template_id=template.id,
+                    template_data=OnboardingTemplateUpdate(
+                        required_document_ids=doc_ids[1::2],
+                        optional_document_ids=doc_ids[::2],
+                    ),
+                    company_id=company.id,
+                ))
+
+                print(
+                    f"{field_count:>6} {todo_count:>6} {doc_count:>6} | "
+                    f"{max(doc_statements):>10} {create_statements:>10} {update_statements:>10}"
+                )
+
+            await db.rollback()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import io
+import statistics
+import time
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from klaraflow.core.storage import storage
+
+#? --- Run ---
+# poetry run python -m scripts.bench_upload_event_loop --uploads 16 --size-mb 10
+# STORAGE_BACKEND=local poetry run python -m scripts.bench_upload_event_loop
+#
+# Measures how late a 10 ms timer fires on the event loop while concurrent
+# uploads run against the configured storage backend. The lateness is what
+# every other request served by the worker pays on top of its own latency.
+#   idle     - no uploads
+#   inline   - the old behaviour: the blocking transfer runs on the event loop
+#   executor - storage.upload_file (dedicated thread pool)
+
+PROBE_INTERVAL = 0.01
+FOLDER = "bench/event-loop"
+
+
+def make_upload(payload: bytes) -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(payload),
+        size=len(payload),
+        filename="bench.bin",
+        headers=Headers({"content-type": "application/octet-stream"}),
+    )
+
+
+async def probe(stop: asyncio.Event, lags: list[float]):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+async def inline_upload(payload: bytes):
+    storage._put(io.BytesIO(payload), f"{FOLDER}/inline.bin", "application/octet-stream")
+    await asyncio.sleep(0)
+
+
+async def executor_upload(payload: bytes):
+    await storage.upload_file(make_upload(payload), folder=FOLDER)
+
+
+async def measure(label: str, upload, payload: bytes, uploads: int, idle_seconds: float):
+    stop = asyncio.Event()
+    lags: list[float] = []
+    prober = asyncio.create_task(probe(stop, lags))
+    started = time.perf_counter()
+    if upload is None:
+        await asyncio.sleep(idle_seconds)
+    else:
+        await asyncio.gather(*(upload(payload) for _ in range(uploads)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+
+    ordered = sorted(lags)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{label:<9} {elapsed:7.2f} s   loop lag p50 {statistics.median(ordered):8.2f} ms"
+        f"   p99 {p99:8.2f} ms   max {ordered[-1]:8.2f} ms"
+    )
+
+
+async def run_benchmark(uploads: int, size_mb: int):
+    payload = b"\0" * (size_mb * 1024 * 1024)
+    storage.start()
+    try:
+        print(f"{uploads} concurrent uploads of {size_mb} MB, concurrency {storage.concurrency}\n")
+        await measure("idle", None, payload, uploads, idle_seconds=2.0)
+        await measure("inline", inline_upload, payload, uploads, idle_seconds=0)
+        await measure("executor", executor_upload, payload, uploads, idle_seconds=0)
+        print(f"\n{storage.stats()}")
+    finally:
+        storage.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event loop lag during concurrent uploads")
+    parser.add_argument("--uploads", type=int, default=16)
+    parser.add_argument("--size-mb", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.uploads, args.size_mb))
@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+import email
+import random
+from email import policy
+from aiosmtpd.controller import Controller
+
+#? --- Run ---
+# poetry install --with dev   (aiosmtpd is a dev dependency)
+# poetry run python -m scripts.dev_smtp_server --port 1025
+#
+# Local SMTP server for development and tests. Accepts every message and prints
+# it, so the email outbox can be exercised without a real mail server. Point
+# the API at it with:
+#   MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_STARTTLS=false MAIL_USE_CREDENTIALS=false
+# --fail-rate makes a share of messages fail with a temporary 451 error to
+# exercise the outbox retries.
+
+
+class PrintingHandler:
+    def __init__(self, fail_rate: float):
+        self.fail_rate = fail_rate
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        if random.random() < self.fail_rate:
+            print(f"[{self.received}] rejected (451) for {', '.join(envelope.rcpt_tos)}")
+            return "451 Temporary failure, try again later"
+        message = email.message_from_bytes(envelope.content, policy=policy.default)
+        print(f"[{self.received}] {envelope.mail_from} -> {', '.join(envelope.rcpt_tos)}: {message['Subject']}")
+        return "250 Message accepted for delivery"
+
+
+async def serve(host: str, port: int, fail_rate: float):
+    controller = Controller(PrintingHandler(fail_rate), hostname=host, port=port)
+    controller.start()
+    print(f"SMTP server listening on {host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local SMTP server that prints received mail")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.fail_rate))
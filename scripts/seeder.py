@@ -32,6 +32,8 @@ async def seed_database():
     async with engine.begin() as conn:
         
         await conn.exec_driver_sql("SET search_path TO public")
+        # Needed by the trigram search indexes on onboarding_sessions
+        await conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
         
         # Dropping all tables for a clean seed (optional, for development)
         # await conn.run_sync(Base.metadata.drop_all)
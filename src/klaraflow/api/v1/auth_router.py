@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from klaraflow.crud import user_crud, onboarding_crud
 from klaraflow.schemas import user_schema, onboarding_schema
 from klaraflow.config.database import get_db
-from klaraflow.core.security import create_access_token, verify_password
+from klaraflow.core.security import create_user_access_token, verify_password_async
 from klaraflow.base.exceptions import APIException
 from klaraflow.base.responses import create_response
 from klaraflow.dependencies.auth import get_current_user, get_current_active_user
@@ -24,13 +24,13 @@ async def signup(user: user_schema.UserCreate, db: AsyncSession = Depends(get_db
 @router.post("/login")
 async def login(login_data: user_schema.UserLogin, db: AsyncSession = Depends(get_db)):
     user = await user_crud.get_user_by_email(db=db, email=login_data.email)
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise APIException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             message="Incorrect email or password",
             errors=["Authentication failed"]
         )
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_user_access_token(user)
     
     # Create response matching frontend expectations
     response_data = {
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, status, Body
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Dict, List
 
 from klaraflow.config.database import get_db
+from klaraflow.dependencies.database import get_read_db
+from klaraflow.dependencies.etag import settings_etag
 from klaraflow.dependencies.auth import get_current_active_admin
-from klaraflow.models import User
+from klaraflow.schemas.user_schema import Principal
 from klaraflow.schemas import department_schema
 from klaraflow.crud import department_crud
 from klaraflow.base.responses import create_response
@@ -16,7 +18,7 @@ router = APIRouter()
 async def create_department(
     department_in: department_schema.DepartmentCreate,
     db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    current_admin: Principal = Depends(get_current_active_admin)
 ):
     """Create a new department for the admin's company."""
     new_dept = await department_crud.create_department(
@@ -24,36 +26,38 @@ async def create_department(
     )
     # Use model_validate (from_orm is deprecated in Pydantic v2)
     response_data = department_schema.DepartmentRead.model_validate(new_dept)
-    return create_response(data=response_data, message="Department created successfully")
+    return create_response(data=response_data, message="Department created successfully", exclude_none=True)
 
 @router.get("", response_model=List[department_schema.DepartmentRead])
 async def read_departments(
-    db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    db: AsyncSession = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_active_admin),
+    cache_headers: Dict[str, str] = Depends(settings_etag)
 ):
     """Retrieve all departments for the admin's company."""
     depts = await department_crud.get_departments_by_company(db=db, company_id=current_admin.company_id)
     response_data = [department_schema.DepartmentRead.model_validate(d) for d in depts]
-    return create_response(data=response_data)
+    return create_response(data=response_data, headers=cache_headers, exclude_none=True)
 
 @router.get("/{department_id}", response_model=department_schema.DepartmentRead)
 async def read_department(
     department_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    db: AsyncSession = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_active_admin),
+    cache_headers: Dict[str, str] = Depends(settings_etag)
 ):
     """Retrieve a specific department by ID."""
     dept = await department_crud.get_department(db=db, department_id=department_id, company_id=current_admin.company_id)
     if dept is None:
         raise APIException(status_code=status.HTTP_404_NOT_FOUND, message="Department not found")
-    return create_response(data=department_schema.DepartmentRead.model_validate(dept))
+    return create_response(data=department_schema.DepartmentRead.model_validate(dept), headers=cache_headers, exclude_none=True)
 
 @router.put("/{department_id}", response_model=department_schema.DepartmentRead)
 async def update_department(
     department_id: int,
     department_in: department_schema.DepartmentUpdate,
     db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    current_admin: Principal = Depends(get_current_active_admin)
 ):
     """Update a department."""
     db_department = await department_crud.get_department(db=db, department_id=department_id, company_id=current_admin.company_id)
@@ -61,13 +65,13 @@ async def update_department(
         raise APIException(status_code=status.HTTP_404_NOT_FOUND, message="Department not found")
     
     updated_dept = await department_crud.update_department(db=db, db_department=db_department, department_in=department_in)
-    return create_response(data=department_schema.DepartmentRead.model_validate(updated_dept), message="Department updated successfully")
+    return create_response(data=department_schema.DepartmentRead.model_validate(updated_dept), message="Department updated successfully", exclude_none=True)
 
 @router.delete("/{department_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_department(
     department_id: int,
     db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    current_admin: Principal = Depends(get_current_active_admin)
 ):
     """Delete a department."""
     db_department = await department_crud.get_department(db=db, department_id=department_id, company_id=current_admin.company_id)
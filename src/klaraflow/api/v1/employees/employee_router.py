@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, status
-from klaraflow.config.database import db_manager
+from sqlalchemy.ext.asyncio import AsyncSession
+from klaraflow.config.database import get_db
 from klaraflow.dependencies.auth import get_current_active_admin
-from klaraflow.models import User
+from klaraflow.schemas.user_schema import Principal
 from klaraflow.schemas import user_schema
 from klaraflow.services import employee_service
 from klaraflow.base.responses import create_response
@@ -9,25 +10,21 @@ from klaraflow.base.responses import create_response
 router = APIRouter()
 
 @router.put("/{employee_id}/department/{department_id}")
-async def assign_department_to_employee(employee_id: int, department_id: int, current_admin: User = Depends(get_current_active_admin)):
-    async with db_manager.session() as db:
-        employee = await employee_service.assign_department(db, employee_id, department_id, current_admin.company_id)
-        return create_response(data=user_schema.UserPublic.from_orm(employee), message="Department assigned successfully")
+async def assign_department_to_employee(employee_id: int, department_id: int, db: AsyncSession = Depends(get_db), current_admin: Principal = Depends(get_current_active_admin)):
+    employee = await employee_service.assign_department(db, employee_id, department_id, current_admin.company_id)
+    return create_response(data=user_schema.UserPublic.model_validate(employee), message="Department assigned successfully", exclude_none=True)
 
 @router.delete("/{employee_id}/department")
-async def remove_department_from_employee(employee_id: int, current_admin: User = Depends(get_current_active_admin)):
-    async with db_manager.session() as db:
-        employee = await employee_service.remove_department(db, employee_id, current_admin.company_id)
-        return create_response(data=user_schema.UserPublic.from_orm(employee), message="Department removed successfully")
+async def remove_department_from_employee(employee_id: int, db: AsyncSession = Depends(get_db), current_admin: Principal = Depends(get_current_active_admin)):
+    employee = await employee_service.remove_department(db, employee_id, current_admin.company_id)
+    return create_response(data=user_schema.UserPublic.model_validate(employee), message="Department removed successfully", exclude_none=True)
 
 @router.put("/{employee_id}/designation/{designation_id}")
-async def assign_designation_to_employee(employee_id: int, designation_id: int, current_admin: User = Depends(get_current_active_admin)):
-    async with db_manager.session() as db:
-        employee = await employee_service.assign_designation(db, employee_id, designation_id, current_admin.company_id)
-        return create_response(data=user_schema.UserPublic.from_orm(employee), message="Designation assigned successfully")
+async def assign_designation_to_employee(employee_id: int, designation_id: int, db: AsyncSession = Depends(get_db), current_admin: Principal = Depends(get_current_active_admin)):
+    employee = await employee_service.assign_designation(db, employee_id, designation_id, current_admin.company_id)
+    return create_response(data=user_schema.UserPublic.model_validate(employee), message="Designation assigned successfully", exclude_none=True)
 
 @router.delete("/{employee_id}/designation")
-async def remove_designation_from_employee(employee_id: int, current_admin: User = Depends(get_current_active_admin)):
-    async with db_manager.session() as db:
-        employee = await employee_service.remove_designation(db, employee_id, current_admin.company_id)
-        return create_response(data=user_schema.UserPublic.from_orm(employee), message="Designation removed successfully")
\ No newline at end of file
+async def remove_designation_from_employee(employee_id: int, db: AsyncSession = Depends(get_db), current_admin: Principal = Depends(get_current_active_admin)):
+    employee = await employee_service.remove_designation(db, employee_id, current_admin.company_id)
+    return create_response(data=user_schema.UserPublic.model_validate(employee), message="Designation removed successfully", exclude_none=True)
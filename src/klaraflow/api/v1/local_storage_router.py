@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Request, Response, status
+from klaraflow.core.storage import storage
+from klaraflow.base.exceptions import APIException
+import base64
+import hashlib
+
+# Only mounted with STORAGE_BACKEND=local: accepts the presigned PUT URLs issued
+# by LocalStorageBackend with the same headers S3 would require.
+router = APIRouter()
+
+@router.put("/{key:path}")
+async def put_presigned_object(key: str, request: Request, expires: int, signature: str):
+    content_type = request.headers.get("content-type", "")
+    checksum = request.headers.get("x-amz-checksum-sha256", "")
+    try:
+        size = int(request.headers.get("content-length", ""))
+    except ValueError:
+        raise APIException(status_code=status.HTTP_411_LENGTH_REQUIRED, message="Content-Length is required.")
+
+    if not storage.verify_presigned_put(key, content_type, size, checksum, expires, signature):
+        raise APIException(status_code=status.HTTP_403_FORBIDDEN, message="Invalid or expired upload URL.")
+
+    # The signed size bounds the body, so reading it whole is fine for a dev backend
+    body = await request.body()
+    if len(body) != size or base64.b64encode(hashlib.sha256(body).digest()).decode() != checksum:
+        raise APIException(status_code=status.HTTP_400_BAD_REQUEST, message="Upload does not match the signed size and checksum.")
+
+    # Presigned keys are content-addressed blobs: a late write must not delete a
+    # copy another upload registered in the meantime
+    await storage.put_bytes(key, body, content_type, shared_key=True)
+    return Response(status_code=status.HTTP_200_OK)
@@ -1,16 +1,19 @@
 from fastapi import Request, APIRouter, Depends, status, File, Form, UploadFile, Query
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from klaraflow.crud import onboarding_crud
-from klaraflow.schemas import onboarding_schema
-from klaraflow.config.database import get_db
+from klaraflow.schemas import onboarding_schema, document_schema
+from klaraflow.config.database import get_db, run_after_rollback
+from klaraflow.config.settings import settings
+from klaraflow.dependencies.database import get_read_db, get_user_read_db
 from klaraflow.dependencies.auth import get_current_active_admin, get_current_active_user, get_current_user
 from klaraflow.models.user_model import User
-from klaraflow.schemas.user_schema import Token
+from klaraflow.schemas.user_schema import Token, Principal
 from klaraflow.base.responses import create_response
 from klaraflow.base.exceptions import APIException
-from klaraflow.core.s3_service import s3_service
+from klaraflow.core.multipart_upload import UploadLimits, stream_multipart_upload
 import logging
 
 logger = logging.getLogger("klaraflow.onboarding")
@@ -28,25 +31,39 @@ async def list_onboarding_sessions(
     firstname: Optional[str] = Query(default=None, alias="firstName"),
     lastname: Optional[str] = Query(default=None, alias="lastName"),
     email: Optional[str] = Query(default=None, alias="email"),
-    limit: int = 100,
-    offset: int = 0,
-    db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    include_total: bool = Query(default=False, alias="includeTotal"),
+    db: AsyncSession = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_active_admin)
 ):
     """Admin endpoint to list onboarding sessions.
 
     - Optional `status` query param filters by onboarding status (e.g., pending, in_progress, submitted)
-    - `limit` and `offset` provide simple pagination
-    Returns a list of onboarding sessions for the admin's company.
+    - Optional `firstName`, `lastName` and `email` query params do case-insensitive substring search
+    - `limit` and `cursor` provide keyset pagination (newest first); pass the returned
+      `next_cursor` back as `cursor` to fetch the next page
+    - `includeTotal=true` also returns the number of matching sessions as `total`
+    Returns a page of onboarding sessions for the admin's company.
     """
     company_id = current_admin.company_id
-    sessions = await onboarding_crud.list_onboarding_sessions(db=db, company_id=company_id, status=status_filter, limit=limit, offset=offset)
-    # sessions is a list of Pydantic models; convert to serializable dicts
-    data = [s.model_dump(mode="json") if hasattr(s, "model_dump") else s for s in sessions]
+    page = await onboarding_crud.list_onboarding_sessions(
+        db=db,
+        company_id=company_id,
+        status=status_filter,
+        first_name=firstname,
+        last_name=lastname,
+        email=email,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total
+    )
     return create_response(
-        data=data,
+        data=page.items,
         message="Onboarding sessions retrieved successfully",
-        status_code=status.HTTP_200_OK
+        status_code=status.HTTP_200_OK,
+        next_cursor=page.next_cursor,
+        total=page.total
     )
 
 @router.post(
@@ -57,64 +74,96 @@ async def invite_employee(
     # TODO: Fix the pydantic model parsing with multipart/form-data
     # invite_data: onboarding_schema.OnboardingInviteRequest,
     request: Request,
-    profilePic: Optional[UploadFile] = File(None),
     db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin) 
+    current_admin: Principal = Depends(get_current_active_admin) 
 ):
     """
     Admin endpoint to invite a new employee to the platform.
-    Handles multipart/form-data for optional profile picture upload.
+    Handles multipart/form-data with an optional `profilePic` file, which is
+    streamed to storage while the request body arrives.
     """
-    
-    # Testing
-    form = await request.form()
-    invite_data = onboarding_schema.OnboardingInviteRequest(
-        empId=form.get("empId"),
-        firstName=form.get("firstName"),
-        lastName=form.get("lastName"),
-        email=form.get("email"),
-        gender=form.get("gender"),
-        userRole=form.get("userRole"),
-        phone=form.get("phone"),
-        designation=form.get("designation"),
-        department=form.get("department"),
-        jobType=form.get("jobType"),
-        hiringDate=form.get("hiringDate"),
-        template_id=form.get("template_id"),
-        reportTo=form.get("reportTo"),
-        grade=form.get("grade"),
-        probationPeriod=form.get("probationPeriod"),
-        dateOfBirth=form.get("dateOfBirth"),
-        maritalStatus=form.get("maritalStatus"),
-        nationality=form.get("nationality"),
-        onboardingTemplateId=form.get("onboardingTemplateId")
+    form = await stream_multipart_upload(
+        request,
+        folder=f"profile_pictures/{current_admin.company_id}",
+        limits=UploadLimits(
+            max_file_size=settings.PROFILE_PICTURE_MAX_BYTES,
+            allowed_content_types=settings.PROFILE_PICTURE_CONTENT_TYPES,
+            file_fields={"profilePic"},
+            max_files=1,
+        ),
     )
-    #Over
-    
-    profile_picture_url = None
-    if profilePic:
-        folder = f"profile_pictures/{current_admin.company_id}"
-        logger.info(f"Uploading file to S3: {profilePic.filename} -> {folder}")
-        profile_picture_url = await s3_service.upload_file(profilePic, folder)
-        logger.info(f"File uploaded. S3 URL: {profile_picture_url}")
-    else:
-        logger.info("No avatar_file provided in request.")
+    profile_picture_url = form.files[0].url if form.files else None
 
-    session = await onboarding_crud.invite_new_employee(
-        db=db,
-        invite_data=invite_data,
-        company_id=current_admin.company_id,
-        profile_picture_url=profile_picture_url
-    )
+    try:
+        fields = form.fields
+        invite_data = onboarding_schema.OnboardingInviteRequest(
+            empId=fields.get("empId"),
+            firstName=fields.get("firstName"),
+            lastName=fields.get("lastName"),
+            email=fields.get("email"),
+            gender=fields.get("gender"),
+            userRole=fields.get("userRole"),
+            phone=fields.get("phone"),
+            designation=fields.get("designation"),
+            department=fields.get("department"),
+            jobType=fields.get("jobType"),
+            hiringDate=fields.get("hiringDate"),
+            template_id=fields.get("template_id"),
+            reportTo=fields.get("reportTo"),
+            grade=fields.get("grade"),
+            probationPeriod=fields.get("probationPeriod"),
+            dateOfBirth=fields.get("dateOfBirth"),
+            maritalStatus=fields.get("maritalStatus"),
+            nationality=fields.get("nationality"),
+            onboardingTemplateId=fields.get("onboardingTemplateId")
+        )
+        session = await onboarding_crud.invite_new_employee(
+            db=db,
+            invite_data=invite_data,
+            company_id=current_admin.company_id,
+            profile_picture_url=profile_picture_url
+        )
+    except Exception:
+        await form.discard()
+        raise
+    # The request commits after this returns; if that fails, nothing points at the picture
+    run_after_rollback(db, form.discard)
     logger.info(f"Session created. profile_picture_url in DB: {getattr(session, 'profile_picture_url', None)}")
     session_response = onboarding_schema.OnboardingSessionRead.model_validate(session)
     
     return create_response(
-        data=session_response.model_dump(mode="json"),
+        data=session_response,
         message="Invitation sent successfully",
         status_code=status.HTTP_201_CREATED
     )
 
+@router.post("/invite/bulk", response_model=onboarding_schema.BulkInviteReport)
+async def bulk_invite_employees(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_admin: Principal = Depends(get_current_active_admin)
+):
+    """
+    Admin endpoint to invite a cohort at once. The body is CSV (`text/csv`, with a
+    header row of invite field names) or NDJSON (`application/x-ndjson`), one
+    invitation per row. Returns a per-row report; invalid or duplicate rows are
+    skipped, the rest are invited in one transaction.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.BULK_INVITE_MAX_BYTES:
+            raise APIException(status_code=413, message=f"The upload exceeds {settings.BULK_INVITE_MAX_BYTES} bytes.", errors=["Upload too large."])
+
+    rows = onboarding_crud.parse_bulk_invite_rows(bytes(body), content_type)
+    report = await onboarding_crud.bulk_invite_employees(db, company_id=current_admin.company_id, rows=rows)
+    return create_response(
+        data=report,
+        message=f"{report.invited} invitations sent, {report.rejected} rows rejected",
+        status_code=status.HTTP_200_OK
+    )
+
 @router.get("/session/{token}", response_model=onboarding_schema.OnboardingSessionDataResponse)
 async def get_onboarding_session_data(
     token: str,
@@ -155,14 +204,21 @@ async def update_onboarding_step(
 
 @router.get("/my-data", response_model=onboarding_schema.OnboardingDataRead)
 async def get_my_onboarding_data(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_user_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
+    message = "Onboarding data retrieved successfully"
+    if settings.ONBOARDING_DATA_SQL_JSON:
+        # Postgres builds the whole response body; pass the bytes through untouched
+        body = await onboarding_crud.get_onboarding_data_json(db, user_email=current_user.email, message=message)
+        return Response(content=body, media_type="application/json")
+
     data = await onboarding_crud.get_onboarding_data_for_user(db, user_email=current_user.email)
     return create_response(
         data=data,
-        message="Onboarding data retrieved successfully",
-        status_code=status.HTTP_200_OK
+        message=message,
+        status_code=status.HTTP_200_OK,
+        exclude_none=True
     )
 
 @router.put("/todos/{todo_id}")
@@ -204,15 +260,15 @@ async def update_my_onboarding_data(
         if hasattr(session, key):
             setattr(session, key, value)
     
-    await db.commit()
-    await db.refresh(session)
+    await db.flush()
     
     # Return updated data
     data = await onboarding_crud.get_onboarding_data_for_user(db, user_email=current_user.email)
     return create_response(
         data=data,
         message="Onboarding data updated successfully",
-        status_code=status.HTTP_200_OK
+        status_code=status.HTTP_200_OK,
+        exclude_none=True
     )
 
 
@@ -255,25 +311,41 @@ async def review_and_update_my_info(
     return create_response(
         data=updated_data,
         message="Onboarding info updated successfully",
-        status_code=status.HTTP_200_OK
+        status_code=status.HTTP_200_OK,
+        exclude_none=True
     )
 
 @router.post("/documents/submit/{document_template_id}")
 async def submit_onboarding_document(
     document_template_id: int,
-    employee_id: str = Form(...),
-    fields: str = Form(...),  # JSON string
-    files: Optional[List[UploadFile]] = File(None),
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
+    """
+    Multipart form with `fields` (JSON string) and any number of files; the
+    submission is recorded for the signed-in user. Files are streamed to storage while the body arrives (stored once per
+    company by content hash); the document template's size and type limits
+    reject a file as soon as it breaks them.
+    """
+    limits = await onboarding_crud.get_document_upload_limits(
+        db, document_template_id=document_template_id, company_id=current_user.company_id
+    )
+    # Hand the connection back to the pool while the (possibly slow) body streams in
+    await db.commit()
+    form = await stream_multipart_upload(
+        request,
+        folder=f"onboarding_documents/{current_user.company_id}/{current_user.id}",
+        limits=limits,
+        blob_company_id=current_user.company_id,
+    )
     submission = await onboarding_crud.submit_onboarding_document(
         db=db,
         document_template_id=document_template_id,
-        employee_id=employee_id,
         company_id=current_user.company_id,
-        fields_data=fields,
-        files=files
+        form=form,
+        user_id=current_user.id,
+        user_email=current_user.email
     )
 
     response_data = {
@@ -290,6 +362,58 @@ async def submit_onboarding_document(
         status_code=201
     )
     
+@router.post("/documents/upload-urls/{document_template_id}")
+async def create_document_upload_urls(
+    document_template_id: int,
+    upload_request: document_schema.PresignedUploadRequest,
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Issue presigned PUT URLs so the client uploads document files straight to
+    storage. Send each PUT with the returned headers, then call
+    /documents/finalize/{document_template_id}.
+    """
+    uploads = await onboarding_crud.create_document_upload_urls(
+        db,
+        document_template_id=document_template_id,
+        company_id=current_user.company_id,
+        user_id=current_user.id,
+        upload_request=upload_request
+    )
+    return create_response(
+        data=uploads,
+        message="Upload URLs created successfully",
+        status_code=status.HTTP_201_CREATED
+    )
+
+@router.post("/documents/finalize/{document_template_id}")
+async def finalize_onboarding_document(
+    document_template_id: int,
+    finalize_request: document_schema.DocumentUploadFinalizeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    submission = await onboarding_crud.finalize_onboarding_document(
+        db,
+        document_template_id=document_template_id,
+        company_id=current_user.company_id,
+        finalize_request=finalize_request,
+        user_id=current_user.id,
+        user_email=current_user.email
+    )
+    return create_response(
+        data={
+            "id": submission.id,
+            "template_id": submission.template_id,
+            "employee_id": submission.employee_id,
+            "uploaded_at": submission.submitted_at,
+            "file_paths": submission.file_paths
+        },
+        message="Document submitted successfully",
+        status_code=201
+    )
+    
 @router.put("/step")
 async def increment_onboarding_step(
     db: AsyncSession = Depends(get_db),
@@ -307,7 +431,7 @@ async def increment_onboarding_step(
 async def onboard_employee(
     sessionId: int = Query(..., alias="sessionId"),
     db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    current_admin: Principal = Depends(get_current_active_admin)
 ):
     """Admin endpoint to finalize onboarding for a session.
 
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, status
+
+from klaraflow.dependencies.auth import get_current_active_admin
+from klaraflow.schemas.user_schema import Principal
+from klaraflow.config.database import db_manager
+from klaraflow.core.cache import principal_cache, onboarding_view_cache, invalid_invitation_cache
+from klaraflow.core.hashing_pool import hashing_pool
+from klaraflow.core.storage import storage
+from klaraflow.core.blob_store import blob_store
+from klaraflow.core.token_generations import token_generations
+from klaraflow.services.onboarding_expiry_service import onboarding_expiry_sweeper
+from klaraflow.services.email_outbox_service import email_outbox_worker
+from klaraflow.base.responses import create_response
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_runtime_metrics(
+    current_admin: Principal = Depends(get_current_active_admin)
+):
+    """
+    Operator endpoint exposing in-process runtime counters for this worker.
+    Each worker keeps its own counters, so values differ between workers.
+    """
+    data = {
+        "database_pool": db_manager.pool_stats(),
+        "database_round_trips": db_manager.round_trip_stats(),
+        "principal_cache": principal_cache.stats(),
+        "onboarding_view_cache": onboarding_view_cache.stats(),
+        "invalid_invitation_cache": invalid_invitation_cache.stats(),
+        "hashing_pool": hashing_pool.stats(),
+        "uploads": storage.stats(),
+        "blob_store": blob_store.stats(),
+        "token_generations": token_generations.stats(),
+        "onboarding_expiry": onboarding_expiry_sweeper.stats(),
+        "email_outbox": email_outbox_worker.stats(),
+    }
+    return create_response(
+        data=data,
+        message="Runtime metrics retrieved successfully",
+        status_code=status.HTTP_200_OK
+    )
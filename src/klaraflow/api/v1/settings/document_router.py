@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, Query, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 import shutil
 from pathlib import Path
@@ -9,8 +9,10 @@ import uuid
 from klaraflow.crud import document_template_crud
 from klaraflow.schemas import document_schema
 from klaraflow.config.database import get_db
+from klaraflow.dependencies.database import get_read_db
+from klaraflow.dependencies.etag import settings_etag
 from klaraflow.dependencies.auth import get_current_active_admin
-from klaraflow.models.user_model import User
+from klaraflow.schemas.user_schema import Principal
 from klaraflow.models.documents.document_submission_model import DocumentSubmission
 from klaraflow.base.responses import create_response
 from klaraflow.base.exceptions import APIException
@@ -26,7 +28,7 @@ router = APIRouter()
 async def create_document_template(
     template_data: document_schema.DocumentTemplateCreate,
     db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    current_admin: Principal = Depends(get_current_active_admin)
 ):
     """Create a new document template"""
     
@@ -40,7 +42,7 @@ async def create_document_template(
     template_response = document_schema.DocumentTemplateRead.model_validate(template)
     
     return create_response(
-        data=template_response.model_dump(mode='json'),
+        data=template_response,
         message="Document template created successfully",
         status_code=status.HTTP_201_CREATED
     )
@@ -50,27 +52,36 @@ async def create_document_template(
     response_model=List[document_schema.DocumentTemplateRead]
 )
 async def get_document_templates(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    include_total: bool = Query(default=False, alias="includeTotal"),
+    db: AsyncSession = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_active_admin),
+    cache_headers: Dict[str, str] = Depends(settings_etag)
 ):
-    """Get all document templates for the company"""
+    """
+    Get document templates for the company, newest first.
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    """
     
-    templates = await document_template_crud.get_document_templates(
+    page = await document_template_crud.get_document_templates(
         db=db,
         company_id=current_admin.company_id,
-        skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total
     )
     
     # Convert SQLAlchemy models to Pydantic schemas
-    templates_response = [document_schema.DocumentTemplateRead.model_validate(template) for template in templates]
+    templates_response = [document_schema.DocumentTemplateRead.model_validate(template) for template in page.items]
     
     return create_response(
-        data=[template.model_dump(mode='json') for template in templates_response],
+        data=templates_response,
         message="Document templates retrieved successfully",
-        status_code=status.HTTP_200_OK
+        status_code=status.HTTP_200_OK,
+        next_cursor=page.next_cursor,
+        total=page.total,
+        headers=cache_headers
     )
 
 @router.get(
@@ -79,8 +90,9 @@ async def get_document_templates(
 )
 async def get_document_template(
     template_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    db: AsyncSession = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_active_admin),
+    cache_headers: Dict[str, str] = Depends(settings_etag)
 ):
     """Get a specific document template"""
     
@@ -100,9 +112,10 @@ async def get_document_template(
     template_response = document_schema.DocumentTemplateRead.model_validate(template)
     
     return create_response(
-        data=template_response.model_dump(mode='json'),
+        data=template_response,
         message="Document template retrieved successfully",
-        status_code=status.HTTP_200_OK
+        status_code=status.HTTP_200_OK,
+        headers=cache_headers
     )
 
 @router.put(
@@ -113,7 +126,7 @@ async def update_document_template(
     template_id: int,
     template_data: document_schema.DocumentTemplateUpdate,
     db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    current_admin: Principal = Depends(get_current_active_admin)
 ):
     """Update a document template"""
     
@@ -128,7 +141,7 @@ async def update_document_template(
     template_response = document_schema.DocumentTemplateRead.model_validate(template)
     
     return create_response(
-        data=template_response.model_dump(mode='json'),
+        data=template_response,
         message="Document template updated successfully",
         status_code=status.HTTP_200_OK
     )
@@ -140,7 +153,7 @@ async def update_document_template(
 async def delete_document_template(
     template_id: int,
     db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    current_admin: Principal = Depends(get_current_active_admin)
 ):
     """Delete a document template"""
     
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Dict, List, Optional
 
 from klaraflow.crud import onboarding_template_crud
 from klaraflow.schemas import onboarding_schema
 from klaraflow.config.database import get_db
+from klaraflow.dependencies.database import get_read_db
+from klaraflow.dependencies.etag import settings_etag
 from klaraflow.dependencies.auth import get_current_active_admin
-from klaraflow.models.user_model import User
+from klaraflow.schemas.user_schema import Principal
 from klaraflow.base.responses import create_response
 from klaraflow.base.exceptions import APIException
 
@@ -20,7 +22,7 @@ router = APIRouter()
 async def create_onboarding_template(
     template_data: onboarding_schema.OnboardingTemplateCreate,
     db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    current_admin: Principal = Depends(get_current_active_admin)
 ):
     """Create a new onboarding template"""
     
@@ -34,7 +36,7 @@ async def create_onboarding_template(
     template_response = onboarding_schema.OnboardingTemplateRead.model_validate(template)
     
     return create_response(
-        data=template_response.model_dump(mode='json'),
+        data=template_response,
         message="Onboarding template created successfully",
         status_code=status.HTTP_201_CREATED
     )
@@ -44,27 +46,36 @@ async def create_onboarding_template(
     response_model=List[onboarding_schema.OnboardingTemplateRead]
 )
 async def get_onboarding_templates(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    include_total: bool = Query(default=False, alias="includeTotal"),
+    db: AsyncSession = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_active_admin),
+    cache_headers: Dict[str, str] = Depends(settings_etag)
 ):
-    """Get all onboarding templates for the company"""
+    """
+    Get onboarding templates for the company, newest first.
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    """
     
-    templates = await onboarding_template_crud.get_onboarding_templates(
+    page = await onboarding_template_crud.get_onboarding_templates(
         db=db,
         company_id=current_admin.company_id,
-        skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total
     )
     
     # Convert SQLAlchemy models to Pydantic schemas
-    templates_response = [onboarding_schema.OnboardingTemplateRead.model_validate(template) for template in templates]
+    templates_response = [onboarding_schema.OnboardingTemplateRead.model_validate(template) for template in page.items]
     
     return create_response(
-        data=[template.model_dump(mode='json') for template in templates_response],
+        data=templates_response,
         message="Onboarding templates retrieved successfully",
-        status_code=status.HTTP_200_OK
+        status_code=status.HTTP_200_OK,
+        next_cursor=page.next_cursor,
+        total=page.total,
+        headers=cache_headers
     )
 
 @router.get(
@@ -73,8 +84,9 @@ async def get_onboarding_templates(
 )
 async def get_onboarding_template(
     template_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    db: AsyncSession = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_active_admin),
+    cache_headers: Dict[str, str] = Depends(settings_etag)
 ):
     """Get a specific onboarding template"""
     
@@ -94,9 +106,10 @@ async def get_onboarding_template(
     template_response = onboarding_schema.OnboardingTemplateRead.model_validate(template)
     
     return create_response(
-        data=template_response.model_dump(mode='json'),
+        data=template_response,
         message="Onboarding template retrieved successfully",
-        status_code=status.HTTP_200_OK
+        status_code=status.HTTP_200_OK,
+        headers=cache_headers
     )
 
 @router.put(
@@ -107,7 +120,7 @@ async def update_onboarding_template(
     template_id: int,
     template_data: onboarding_schema.OnboardingTemplateUpdate,
     db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    current_admin: Principal = Depends(get_current_active_admin)
 ):
     """Update an onboarding template"""
     
@@ -122,7 +135,7 @@ async def update_onboarding_template(
     template_response = onboarding_schema.OnboardingTemplateRead.model_validate(template)
     
     return create_response(
-        data=template_response.model_dump(mode='json'),
+        data=template_response,
         message="Onboarding template updated successfully",
         status_code=status.HTTP_200_OK
     )
@@ -134,7 +147,7 @@ async def update_onboarding_template(
 async def delete_onboarding_template(
     template_id: int,
     db: AsyncSession = Depends(get_db),
-    current_admin: User = Depends(get_current_active_admin)
+    current_admin: Principal = Depends(get_current_active_admin)
 ):
     """Delete an onboarding template"""
     
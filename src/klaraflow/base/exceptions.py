@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from .responses import ErrorResponse
 
@@ -18,6 +18,14 @@ class APIException(Exception):
         self.message = message
         self.errors = errors if errors else []
 
+class NotModifiedException(Exception):
+    """
+    Raised by conditional GETs when the client's cached copy (If-None-Match) is
+    still current. Answered with an empty 304 instead of the resource.
+    """
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+
 async def api_exception_handler(request: Request, exc: APIException) -> JSONResponse:
     """
     Handles our custom APIException and returns a standardized error response.
@@ -46,4 +54,10 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content=content,
-    )
\ No newline at end of file
+    )
+
+async def not_modified_handler(request: Request, exc: NotModifiedException) -> Response:
+    """
+    Answers a conditional GET whose ETag still matches with an empty 304.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=exc.headers)
@@ -0,0 +1,82 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, List, Optional, TypeVar
+from fastapi import status
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from .exceptions import APIException
+
+T = TypeVar('T')
+
+@dataclass
+class KeysetPage(Generic[T]):
+    """One page of a keyset-paginated listing."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode the (created_at, id) position of the last row into an opaque cursor."""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise APIException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Invalid pagination cursor",
+            errors=["Malformed cursor."]
+        )
+
+async def fetch_keyset_page(
+    db: AsyncSession,
+    stmt,
+    model,
+    *,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    include_total: bool = False,
+    options: tuple[Any, ...] = (),
+) -> KeysetPage:
+    """
+    Run `stmt` (a filtered SELECT of `model`) as a keyset page ordered by
+    (created_at, id), newest first. Seeking from the cursor keeps every page as
+    cheap as the first. When requested, the total number of rows matching the
+    filters is computed by a scalar subquery in the same statement.
+    """
+    page_stmt = stmt.options(*options).order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        page_stmt = page_stmt.where(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    # Fetch one extra row to know whether there is a next page
+    page_stmt = page_stmt.limit(limit + 1)
+
+    count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    if include_total:
+        page_stmt = page_stmt.add_columns(count_stmt.scalar_subquery().label("total"))
+
+    result = await db.execute(page_stmt)
+    rows = result.all()
+    items = [row[0] for row in rows]
+
+    total = None
+    if include_total:
+        if rows:
+            total = rows[0][1]
+        else:
+            # Past the last page the subquery has no row to ride on
+            total = (await db.execute(count_stmt)).scalar_one()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+
+    return KeysetPage(items=items, next_cursor=next_cursor, total=total)
@@ -1,8 +1,9 @@
 from typing import TypeVar, Generic, Optional, List, Dict, Any
 from fastapi import status
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field
+from pydantic_core import to_json
 
 T = TypeVar('T')
 
@@ -11,6 +12,9 @@ class SuccessResponse(BaseModel, Generic[T]):
     success: bool = Field(default=True)
     data: Optional[T] = None
     message: Optional[str] = None
+    # Set on paginated listings only
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
 
 class ErrorResponse(BaseModel):
     """Standard error response schema that matches the frontend's ApiResponse interface."""
@@ -19,20 +23,49 @@ class ErrorResponse(BaseModel):
     errors: Optional[List[str]] = None
     message: str = "An error occurred."
 
+def _is_model_data(data: Any) -> bool:
+    if isinstance(data, BaseModel):
+        return True
+    return isinstance(data, (list, tuple)) and all(isinstance(item, BaseModel) for item in data)
+
 def create_response(
     data: Optional[T] = None,
     message: Optional[str] = None,
     status_code: int = status.HTTP_200_OK,
-) -> JSONResponse:
+    next_cursor: Optional[str] = None,
+    total: Optional[int] = None,
+    headers: Optional[Dict[str, str]] = None,
+    exclude_none: bool = False,
+) -> Response:
     """
-    A utility function to create a standardized JSON success response.
+    A utility function to create a standardized JSON success response (SuccessResponse).
     This allows us to set custom status codes while maintaining a consistent response body.
+    Paginated listings pass `next_cursor` (and optionally `total`) alongside the page data.
+    `headers` are added to the response, e.g. the ETag of a cacheable resource.
+
+    Pass Pydantic models (or lists of them) as `data` rather than their
+    model_dump(): the envelope and data are serialized straight to bytes in one
+    pass by pydantic-core, with the same output as model_dump(mode="json")
+    (datetimes end in "Z", unset optional fields are null). Values it cannot
+    serialize go through jsonable_encoder.
+
+    Any other `data` (dicts, ORM objects), and models passed with
+    `exclude_none=True`, are encoded as create_response always did, through
+    SuccessResponse.model_dump(exclude_none=True) and jsonable_encoder: None
+    fields of models are left out, datetimes go through isoformat() ("+00:00")
+    and Decimal is a number. Routes that returned models before the single
+    pass existed use `exclude_none=True` so their output does not change.
     """
-    # model_dump may include non-JSON-native types (e.g. datetime). Use jsonable_encoder
-    # to convert those into JSON-serializable forms (ISO strings for datetimes).
-    content = SuccessResponse(data=data, message=message).model_dump(exclude_none=True)
-    content = jsonable_encoder(content)
-    return JSONResponse(
+    if data is not None and (exclude_none or not _is_model_data(data)):
+        data = jsonable_encoder(SuccessResponse(data=data).model_dump(exclude_none=True)["data"])
+    content: Dict[str, Any] = {"success": True}
+    # Unset envelope fields are left out, as with model_dump(exclude_none=True)
+    for key, value in (("data", data), ("message", message), ("next_cursor", next_cursor), ("total", total)):
+        if value is not None:
+            content[key] = value
+    return Response(
+        content=to_json(content, by_alias=False, fallback=jsonable_encoder),
         status_code=status_code,
-        content=content
-    )
\ No newline at end of file
+        headers=headers,
+        media_type="application/json",
+    )
@@ -1,26 +1,192 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from fastapi import Request
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.engine import Engine
+from sqlalchemy import text, exc, event
 from klaraflow.config.settings import settings
 
+logger = logging.getLogger("klaraflow.database")
+
+# Database round trips made by the current request, see count_round_trips()
+_round_trips: ContextVar[Optional[List[int]]] = ContextVar("db_round_trips", default=None)
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records how long callers wait to get a connection,
+    so pool starvation shows up as growing waiters / acquire wait times.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiters = 0
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connect(self):
+        self.waiters += 1
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        else:
+            # Only successful checkouts count towards the wait statistics
+            waited = time.perf_counter() - started
+            self.acquisitions += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            return connection
+        finally:
+            self.waiters -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "waiters": self.waiters,
+            "acquisitions": self.acquisitions,
+            "timeouts": self.timeouts,
+            "avg_acquire_wait_ms": round(self.total_wait_seconds / self.acquisitions * 1000, 3) if self.acquisitions else None,
+            "max_acquire_wait_ms": round(self.max_wait_seconds * 1000, 3),
+        }
+
+def create_engine_from_settings(url: str):
+    """Create an async engine using the pool settings from `Settings`."""
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,  # Show SQL queries in debug mode
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # asyncpg's own per-connection statement cache
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            # SQLAlchemy's prepared statement cache for the asyncpg dialect
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        },
+    )
+
+class PrimarySession(Session):
+    """
+    Session used against the primary. It remembers which tenants it wrote to so
+    reads for those tenants can stick to the primary for a short window.
+    """
+
+def mark_tenant_write(db: AsyncSession, company_id: int) -> None:
+    """
+    Record a tenant write that the ORM cannot see on its own, e.g. a Core
+    insert/delete on an association table.
+    """
+    db.info.setdefault("written_company_ids", set()).add(company_id)
+
+@event.listens_for(PrimarySession, "after_flush")
+def _collect_written_tenants(session, flush_context):
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        company_id = getattr(obj, "company_id", None)
+        if company_id is not None:
+            session.info.setdefault("written_company_ids", set()).add(company_id)
+
+def run_after_commit(db: AsyncSession, func: Callable[..., Any], *args: Any) -> None:
+    """
+    Run `func(*args)` once the current transaction commits, e.g. to invalidate
+    an in-process cache. Dropped if the transaction rolls back.
+    """
+    db.info.setdefault("after_commit_callbacks", []).append((func, args))
+
+def run_after_rollback(db: AsyncSession, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+    """
+    Await `func(*args)` if the unit of work fails instead of committing, e.g. to
+    delete an object uploaded for rows that never made it to the database.
+    Dropped once the transaction commits. Only get_db/get_session run these.
+    """
+    db.info.setdefault("rollback_cleanups", []).append((func, args))
+
+async def _run_rollback_cleanups(session: AsyncSession) -> None:
+    for func, args in session.info.pop("rollback_cleanups", ()):
+        try:
+            await func(*args)
+        except Exception as e:
+            logger.error(f"Rollback cleanup {func.__name__} failed: {e}", exc_info=True)
+
+@event.listens_for(PrimarySession, "after_commit")
+def _record_written_tenants(session):
+    for company_id in session.info.pop("written_company_ids", ()):
+        db_manager.note_tenant_write(company_id)
+    session.info.pop("rollback_cleanups", None)
+    for func, args in session.info.pop("after_commit_callbacks", ()):
+        try:
+            func(*args)
+        except Exception as e:
+            logger.error(f"After-commit callback {func.__name__} failed: {e}", exc_info=True)
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _discard_written_tenants(session):
+    session.info.pop("written_company_ids", None)
+    session.info.pop("after_commit_callbacks", None)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _round_trips.get()
+    if counter is not None:
+        counter[0] += 1
+
+@event.listens_for(Engine, "begin")
+@event.listens_for(Engine, "commit")
+@event.listens_for(Engine, "rollback")
+def _count_transaction_control(conn):
+    counter = _round_trips.get()
+    if counter is not None:
+        counter[0] += 1
+
 class DatabaseManager:
     def __init__(self):
         self.engine = None
         self.session_factory = None
         self.db_name = None
+        self.replica_engines = []
+        self.replica_session_factories = []
+        self.replica_healthy: List[bool] = []
+        self._next_replica = 0
+        self._tenant_writes: Dict[int, float] = {}
+        self._round_trip_stats: Dict[str, Dict[str, int]] = {}
     
     async def connect(self):
         """Connect to database and print info"""
-        self.engine = create_async_engine(
-            settings.DATABASE_URL_ASYNC,
-            echo=settings.DEBUG  # Show SQL queries in debug mode
-        )
+        self.engine = create_engine_from_settings(settings.DATABASE_URL_ASYNC)
         
         self.session_factory = sessionmaker(
             self.engine, 
             class_=AsyncSession,
+            sync_session_class=PrimarySession,
             expire_on_commit=False
         )
+
+        for url in settings.DATABASE_REPLICA_URLS_ASYNC:
+            replica_engine = create_engine_from_settings(url)
+            self.replica_engines.append(replica_engine)
+            self.replica_session_factories.append(sessionmaker(
+                replica_engine,
+                class_=AsyncSession,
+                expire_on_commit=False
+            ))
+            self.replica_healthy.append(False)
         
         # Get database info
         async with self.engine.begin() as conn:
@@ -32,22 +198,145 @@ class DatabaseManager:
             host_info = result.fetchone()
             
         print(f"✅ Connected to database '{self.db_name}' at {host_info[0] or 'localhost'}:{host_info[1] or 5432}")
+
+        if self.replica_engines:
+            await self.check_replicas()
+            print(f"✅ {sum(self.replica_healthy)}/{len(self.replica_engines)} read replicas healthy")
     
     async def disconnect(self):
         """Close database connections"""
+        for replica_engine in self.replica_engines:
+            await replica_engine.dispose()
         if self.engine:
             await self.engine.dispose()
             print(f"📴 Disconnected from database '{self.db_name}'")
+
+    async def check_replicas(self):
+        """Ping every replica and update which ones may serve reads."""
+        for index, replica_engine in enumerate(self.replica_engines):
+            try:
+                async with replica_engine.connect() as conn:
+                    await asyncio.wait_for(
+                        conn.execute(text("SELECT 1")),
+                        timeout=settings.REPLICA_HEALTH_CHECK_TIMEOUT,
+                    )
+                healthy = True
+            except Exception as e:
+                healthy = False
+                if self.replica_healthy[index]:
+                    logger.warning(f"Read replica #{index} marked unhealthy: {e}")
+            if healthy and not self.replica_healthy[index]:
+                logger.info(f"Read replica #{index} marked healthy")
+            self.replica_healthy[index] = healthy
+
+    def note_tenant_write(self, company_id: int):
+        """
+        Pin reads for this tenant to the primary for the read-your-writes window.
+        Tracked per worker, so the guarantee holds for requests served by the same worker.
+        """
+        now = time.monotonic()
+        self._tenant_writes[company_id] = now
+        if len(self._tenant_writes) > 10_000:
+            cutoff = now - settings.READ_YOUR_WRITES_WINDOW_SECONDS
+            self._tenant_writes = {cid: at for cid, at in self._tenant_writes.items() if at >= cutoff}
+
+    def _pick_read_session_factory(self, company_id: int | None):
+        wrote_at = self._tenant_writes.get(company_id)
+        if wrote_at is not None and time.monotonic() - wrote_at < settings.READ_YOUR_WRITES_WINDOW_SECONDS:
+            return self.session_factory
+
+        healthy = [i for i, ok in enumerate(self.replica_healthy) if ok]
+        if not healthy:
+            return self.session_factory
+        index = healthy[self._next_replica % len(healthy)]
+        self._next_replica += 1
+        return self.replica_session_factories[index]
     
+    def pool_stats(self) -> Dict[str, Any] | None:
+        """Live snapshot of the connection pools for operators."""
+        if self.engine is None:
+            return None
+        return {
+            "primary": self.engine.pool.snapshot(),
+            "replicas": [
+                {"healthy": healthy, **replica_engine.pool.snapshot()}
+                for replica_engine, healthy in zip(self.replica_engines, self.replica_healthy)
+            ],
+        }
+
+    def record_round_trips(self, route: str, count: int):
+        stats = self._round_trip_stats.setdefault(route, {"requests": 0, "round_trips": 0, "max": 0})
+        stats["requests"] += 1
+        stats["round_trips"] += count
+        stats["max"] = max(stats["max"], count)
+
+    def round_trip_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Database round trips (statements plus BEGIN/COMMIT/ROLLBACK) per route."""
+        return {
+            route: {
+                "requests": stats["requests"],
+                "avg": round(stats["round_trips"] / stats["requests"], 2),
+                "max": stats["max"],
+            }
+            for route, stats in self._round_trip_stats.items()
+        }
+
+    @asynccontextmanager
     async def get_session(self):
-        """Get database session"""
+        """
+        Get a database session scoped to one unit of work. Code using it only
+        flushes; the transaction is committed once when the block exits cleanly
+        and rolled back when it or the commit raises, running any cleanups
+        registered with run_after_rollback.
+        """
         async with self.session_factory() as session:
+            try:
+                yield session
+                if session.in_transaction():
+                    await session.commit()
+            except Exception:
+                await session.rollback()
+                await _run_rollback_cleanups(session)
+                raise
+
+    @asynccontextmanager
+    async def get_read_session(self, company_id: int | None = None):
+        """
+        Get a read-only session on a healthy replica (round-robin), falling back
+        to the primary when no replica is healthy or the tenant wrote recently.
+        """
+        async with self._pick_read_session_factory(company_id)() as session:
             yield session
 
 # Global database manager
 db_manager = DatabaseManager()
 
+@asynccontextmanager
+async def count_round_trips(request: Request):
+    """
+    Count the database round trips made while handling `request` and record
+    them against its route. Nested uses within one request share the outer count.
+    """
+    if _round_trips.get() is not None:
+        yield
+        return
+
+    counter = [0]
+    _round_trips.set(counter)
+    try:
+        yield
+    finally:
+        _round_trips.set(None)
+        route = request.scope.get("route")
+        db_manager.record_round_trips(
+            f"{request.method} {getattr(route, 'path', request.url.path)}", counter[0]
+        )
+
 # Dependency for FastAPI routes
-async def get_db():
-    async for session in db_manager.get_session():
+async def get_db(request: Request):
+    """
+    Request-scoped unit of work: the session is committed once after the route
+    returns, or rolled back if it raised.
+    """
+    async with count_round_trips(request), db_manager.get_session() as session:
         yield session
\ No newline at end of file
@@ -7,6 +7,23 @@ class Settings(BaseSettings):
     DATABASE_URL_ASYNC: str
     SECRET_KEY: str
     DEBUG: bool = False
+
+    # Connection pool (size workers so that workers * (pool size + overflow) < max_connections)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Set both to 0 when running behind pgbouncer in transaction pooling mode
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+
+    # Read replicas (JSON list of async URLs); reads for a tenant stay on the
+    # primary for READ_YOUR_WRITES_WINDOW_SECONDS after that tenant writes
+    DATABASE_REPLICA_URLS_ASYNC: list[str] = []
+    READ_YOUR_WRITES_WINDOW_SECONDS: float = 5.0
+    REPLICA_HEALTH_CHECK_SECONDS: float = 10.0
+    REPLICA_HEALTH_CHECK_TIMEOUT: float = 2.0
     ENVIRONMENT: str
     JWT_ALG: str
 
@@ -18,12 +35,91 @@ class Settings(BaseSettings):
     MAIL_SERVER: str
     MAIL_STARTTLS: bool = True
     MAIL_SSL_TLS: bool = False
+    # Off for SMTP servers without AUTH, e.g. scripts/dev_smtp_server.py
+    MAIL_USE_CREDENTIALS: bool = True
+    # Persistent SMTP connections kept open by the email outbox worker
+    SMTP_POOL_SIZE: int = 2
+    SMTP_TIMEOUT_SECONDS: float = 30.0
+
+    # Email outbox: polled as a fallback, the worker is also woken on every commit that queues mail
+    EMAIL_OUTBOX_POLL_SECONDS: float = 10.0
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    # Retry delay doubles per attempt, from the base up to the max
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: float = 30.0
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS: float = 3600.0
+    # A claimed message is retried after this long if its worker died mid-send
+    EMAIL_OUTBOX_LEASE_SECONDS: float = 300.0
     
     # S3
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
     AWS_S3_BUCKET_NAME: str
     AWS_REGION: str
+    S3_CONNECT_TIMEOUT_SECONDS: float = 5.0
+
+    # File uploads: "s3", or "local" to write under LOCAL_STORAGE_DIR (development/tests)
+    STORAGE_BACKEND: str = "s3"
+    LOCAL_STORAGE_DIR: str = "uploads"
+    LOCAL_STORAGE_URL_PREFIX: str = "/uploads"
+    # Uploads run on a dedicated thread pool of this size
+    UPLOAD_CONCURRENCY: int = 8
+    UPLOAD_TIMEOUT_SECONDS: float = 60.0
+    # Streaming multipart uploads: parts of one upload request in flight at the same time
+    SUBMISSION_UPLOAD_CONCURRENCY: int = 4
+    UPLOAD_PART_SIZE_BYTES: int = 8 * 1024 * 1024  # S3 requires at least 5 MiB per part
+    UPLOAD_MAX_FIELD_BYTES: int = 1024 * 1024
+    # Document submissions, unless the document template sets its own limits
+    DOCUMENT_UPLOAD_MAX_BYTES: int = 25 * 1024 * 1024
+    # All files of one streamed document submission together
+    DOCUMENT_UPLOAD_MAX_TOTAL_BYTES: int = 100 * 1024 * 1024
+    # Direct-to-storage document uploads (presigned PUT URLs)
+    PRESIGNED_UPLOAD_EXPIRES_SECONDS: int = 900
+    PRESIGNED_UPLOAD_MAX_FILES: int = 20
+    # Content-addressed document blobs: unreferenced blobs older than the grace
+    # period are deleted by a background task
+    BLOB_GC_SECONDS: float = 3600.0
+    BLOB_GC_GRACE_SECONDS: float = 24 * 3600.0
+    BLOB_GC_BATCH_SIZE: int = 100
+    # Invitation profile pictures
+    PROFILE_PICTURE_MAX_BYTES: int = 5 * 1024 * 1024
+    PROFILE_PICTURE_CONTENT_TYPES: list[str] = ["image/jpeg", "image/png", "image/webp"]
+
+    # Principal cache (authenticated users kept in-process between requests)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 2048
+
+    # Compiled onboarding views (entries are versioned, the TTL only bounds memory)
+    ONBOARDING_VIEW_CACHE_TTL_SECONDS: float = 600.0
+    ONBOARDING_VIEW_CACHE_MAX_SIZE: int = 512
+    # Build GET /onboarding/my-data entirely in Postgres (json_build_object) in one query
+    ONBOARDING_DATA_SQL_JSON: bool = False
+    # Invitation tokens that matched no session, so repeated bad links skip the database
+    INVALID_INVITATION_CACHE_TTL_SECONDS: float = 300.0
+    INVALID_INVITATION_CACHE_MAX_SIZE: int = 4096
+
+    # POST /onboarding/invite/bulk
+    BULK_INVITE_MAX_ROWS: int = 5000
+    BULK_INVITE_MAX_BYTES: int = 5 * 1024 * 1024
+
+    # Background sweep that marks expired onboarding invitations
+    ONBOARDING_EXPIRY_SWEEP_SECONDS: float = 60.0
+    ONBOARDING_EXPIRY_BATCH_SIZE: int = 500
+    ONBOARDING_EXPIRY_MAX_BATCHES: int = 20
+
+    # Password hashing pool (defaults to one worker per CPU core)
+    HASHING_WORKERS: int | None = None
+    HASHING_MAX_QUEUE: int = 64
+
+    # How often revoked token generations are reloaded from the users table
+    TOKEN_GENERATION_REFRESH_SECONDS: float = 30.0
+    # Refreshes re-read bumps this far behind the previous one, to catch
+    # transactions that committed after it with an earlier timestamp
+    TOKEN_GENERATION_REFRESH_OVERLAP_SECONDS: float = 300.0
+
+    # Longest lifetime of a login token. Revocations older than this are
+    # dropped, since every token they revoked has expired.
+    ACCESS_TOKEN_EXPIRE_SECONDS: int = 7 * 24 * 3600
 
     class Config:
         env_file = ".env.development"
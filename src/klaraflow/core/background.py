@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger("klaraflow.background")
+
+
+class PeriodicTask:
+    """
+    Runs an async callable every `interval_seconds` on the event loop until stopped.
+    Failures are logged and retried on the next tick; they never stop the loop.
+    Started and stopped from the application lifespan hook in main.py.
+    """
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], Awaitable[None]]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Periodic task '{self.name}' failed")
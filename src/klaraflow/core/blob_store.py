@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from fastapi import status
+from sqlalchemy import case, delete, func, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from klaraflow.config.database import db_manager
+from klaraflow.config.settings import settings
+from klaraflow.core.storage import storage
+from klaraflow.models.documents.stored_blob_model import StoredBlob
+from klaraflow.base.exceptions import APIException
+
+logger = logging.getLogger("klaraflow.blobs")
+
+# SKIP LOCKED lets several workers collect at once without blocking each other.
+# The rows stay locked until their objects are deleted, so an upload looking up
+# the same blob waits and then stores it again instead of reusing a deleted object.
+GARBAGE_BATCH_SQL = text("""
+SELECT company_id, sha256, key FROM stored_blobs
+WHERE ref_count = 0 AND last_used_at < now() - make_interval(secs => :grace_seconds)
+ORDER BY last_used_at
+LIMIT :batch_size
+FOR UPDATE SKIP LOCKED
+""")
+
+
+class BlobStore:
+    """
+    Content-addressed document storage on top of the configured storage backend.
+
+    A file is stored once per company under `blobs/{company_id}/<sha256>` and
+    recorded in `stored_blobs`. Uploading the same bytes again reuses the stored
+    object. Submissions take a reference on every blob their file_paths point
+    at (`add_references`); blobs nobody references are deleted by
+    `collect_garbage` after BLOB_GC_GRACE_SECONDS.
+
+    A row is only written once its object is stored, so any blob found in the
+    table can be referenced right away.
+    """
+
+    def __init__(self):
+        self.lookups = 0
+        self.hits = 0
+        self.bytes_deduplicated = 0
+        self.registered = 0
+        self.collected = 0
+        self.collect_failures = 0
+        self.last_collected_at: float | None = None
+
+    def key_for(self, company_id: int, digest: bytes) -> str:
+        sha256_hex = digest.hex()
+        return f"blobs/{company_id}/{sha256_hex[:2]}/{sha256_hex}"
+
+    async def find(self, company_id: int, digest: bytes) -> Optional[StoredBlob]:
+        """The stored blob with this content, if any. Marks it as recently used."""
+        self.lookups += 1
+        async with db_manager.session_factory() as db:
+            result = await db.execute(
+                update(StoredBlob)
+                .where(StoredBlob.company_id == company_id, StoredBlob.sha256 == digest)
+                .values(last_used_at=func.now())
+                .returning(StoredBlob)
+            )
+            blob = result.scalar_one_or_none()
+            await db.commit()
+        if blob is not None:
+            self.hits += 1
+            self.bytes_deduplicated += blob.size
+        return blob
+
+    async def register(self, company_id: int, digest: bytes, key: str, size: int, content_type: str | None) -> None:
+        """Record an object already stored at `key`. Idempotent for concurrent uploads of the same content."""
+        async with db_manager.session_factory() as db:
+            await db.execute(
+                pg_insert(StoredBlob)
+                .values(company_id=company_id, sha256=digest, key=key, size=size, content_type=content_type)
+                .on_conflict_do_update(
+                    index_elements=[StoredBlob.company_id, StoredBlob.sha256],
+                    set_={"last_used_at": func.now()},
+                )
+            )
+            await db.commit()
+        self.registered += 1
+
+    async def store_bytes(self, company_id: int, digest: bytes, data: bytes, content_type: str | None) -> str:
+        """Store a small file unless the company already has it. Returns its URL."""
+        blob = await self.find(company_id, digest)
+        if blob is not None:
+            return storage.url_for(blob.key)
+        key = self.key_for(company_id, digest)
+        url = await storage.put_bytes(key, data, content_type, shared_key=True)
+        await self.register(company_id, digest, key, len(data), content_type)
+        return url
+
+    async def store_staged(self, company_id: int, digest: bytes, staging_key: str, size: int, content_type: str | None) -> str:
+        """
+        Adopt an object uploaded to `staging_key` before its hash was known: move
+        it to its blob key, or drop it if the company already has the content.
+        """
+        blob = await self.find(company_id, digest)
+        if blob is not None:
+            await storage.delete_key(staging_key)
+            return storage.url_for(blob.key)
+        key = self.key_for(company_id, digest)
+        url = await storage.move(staging_key, key)
+        await self.register(company_id, digest, key, size, content_type)
+        return url
+
+    async def add_references(self, db: AsyncSession, company_id: int, digests: List[bytes]) -> None:
+        """
+        Take one reference per entry in `digests`, in the caller's transaction.
+        Raises a 409 if a blob was garbage-collected in the meantime.
+        """
+        counts = Counter(digests)
+        if not counts:
+            return
+        result = await db.execute(
+            update(StoredBlob)
+            .where(StoredBlob.company_id == company_id, StoredBlob.sha256.in_(list(counts)))
+            .values(
+                ref_count=StoredBlob.ref_count + case(counts, value=StoredBlob.sha256),
+                last_used_at=func.now(),
+            )
+            .returning(StoredBlob.sha256)
+        )
+        if len(result.all()) != len(counts):
+            raise APIException(
+                status_code=status.HTTP_409_CONFLICT,
+                message="An uploaded file is no longer available, please upload it again.",
+                errors=["Stored file not found."]
+            )
+
+    async def _collect_batch(self) -> int:
+        async with db_manager.engine.begin() as conn:
+            rows = (await conn.execute(
+                GARBAGE_BATCH_SQL,
+                {"grace_seconds": settings.BLOB_GC_GRACE_SECONDS, "batch_size": settings.BLOB_GC_BATCH_SIZE},
+            )).all()
+            if not rows:
+                return 0
+            results = await asyncio.gather(*(storage.delete_key(row.key) for row in rows), return_exceptions=True)
+            deleted = []
+            for row, result in zip(rows, results):
+                if isinstance(result, Exception):
+                    # Keep the row; the object is retried on the next run
+                    self.collect_failures += 1
+                    logger.error(f"Failed to delete unreferenced blob {row.key}: {result}")
+                else:
+                    deleted.append((row.company_id, row.sha256))
+            if deleted:
+                await conn.execute(
+                    delete(StoredBlob).where(tuple_(StoredBlob.company_id, StoredBlob.sha256).in_(deleted))
+                )
+            return len(deleted)
+
+    async def collect_garbage(self) -> None:
+        started = time.perf_counter()
+        collected = 0
+        while True:
+            count = await self._collect_batch()
+            collected += count
+            if count < settings.BLOB_GC_BATCH_SIZE:
+                break
+        self.collected += collected
+        self.last_collected_at = time.time()
+        if collected:
+            logger.info(f"Collected {collected} unreferenced blobs in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_ratio": round(self.hits / self.lookups, 3) if self.lookups else None,
+            "bytes_deduplicated": self.bytes_deduplicated,
+            "registered": self.registered,
+            "collected": self.collected,
+            "collect_failures": self.collect_failures,
+            "last_collected_at": self.last_collected_at,
+        }
+
+
+blob_store = BlobStore()
@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from klaraflow.config.settings import settings
+
+
+class TTLCache:
+    """
+    Small bounded in-process cache with per-entry expiry and LRU eviction.
+
+    Every worker process keeps its own copy, so entries can be stale for at most
+    `ttl_seconds` when another worker changes the underlying data. All access
+    happens on the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# --- Application caches ---
+
+# Authenticated principals keyed by token subject (email), see dependencies/auth.py
+principal_cache = TTLCache(
+    name="principals",
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+# Compiled onboarding views keyed by template id, stored as (version, view),
+# see onboarding_crud.get_onboarding_view
+onboarding_view_cache = TTLCache(
+    name="onboarding_views",
+    max_size=settings.ONBOARDING_VIEW_CACHE_MAX_SIZE,
+    ttl_seconds=settings.ONBOARDING_VIEW_CACHE_TTL_SECONDS,
+)
+
+# SHA-256 digests of invitation tokens that matched no session. New tokens are
+# random, so a cached miss can only go stale if the digest is reused.
+invalid_invitation_cache = TTLCache(
+    name="invalid_invitations",
+    max_size=settings.INVALID_INVITATION_CACHE_MAX_SIZE,
+    ttl_seconds=settings.INVALID_INVITATION_CACHE_TTL_SECONDS,
+)
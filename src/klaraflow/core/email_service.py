@@ -1,40 +1,41 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from klaraflow.config.settings import settings
+from typing import List, Tuple
 from pydantic import EmailStr
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from klaraflow.config.database import run_after_commit
+from klaraflow.models.email_outbox_model import EmailOutbox
+from klaraflow.services.email_outbox_service import email_outbox_worker
 
-# --- Configuration ---
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
-)
+# Mail is never sent from a request: it goes to the email_outbox table and is
+# delivered by the outbox worker (services/email_outbox_service.py).
 
-fm = FastMail(conf)
-
-async def send_onboarding_invitation(email_to: EmailStr, token: str):
+def queue_emails(db: AsyncSession, messages: List[Tuple[str, str, str]]) -> List[EmailOutbox]:
     """
-    Sends the onboarding invitation email to a new employee.
+    Add (recipient, subject, html_body) messages to the outbox in the caller's
+    transaction. They are only sent if that transaction commits.
     """
+    outbox = [EmailOutbox(recipient=recipient, subject=subject, html_body=html_body) for recipient, subject, html_body in messages]
+    db.add_all(outbox)
+    run_after_commit(db, email_outbox_worker.wake)
+    return outbox
+
+def queue_email(db: AsyncSession, recipient: str, subject: str, html_body: str) -> EmailOutbox:
+    return queue_emails(db, [(recipient, subject, html_body)])[0]
+
+def _onboarding_invitation(email_to: str, token: str) -> Tuple[str, str, str]:
     html_content = f"""
     <h2>Welcome to KlaraFlow!</h2>
     <p>Please click the link below to complete your profile and set up your account.</p>
     <a href="http://localhost:3000/invite/{token}">Complete Your Profile</a>
     <p>This link will expire in 24 hours.</p>
     """
-    
-    message = MessageSchema(
-        subject="Your KlaraFlow Onboarding Invitation",
-        recipients=[email_to],
-        body=html_content,
-        subtype="html"
-    )
-    
-    await fm.send_message(message)
-    print(f"Onboarding email sent to {email_to}")
\ No newline at end of file
+    return (email_to, "Your KlaraFlow Onboarding Invitation", html_content)
+
+def queue_onboarding_invitation(db: AsyncSession, email_to: EmailStr, token: str) -> EmailOutbox:
+    """
+    Queues the onboarding invitation email to a new employee.
+    """
+    return queue_emails(db, [_onboarding_invitation(email_to, token)])[0]
+
+def queue_onboarding_invitations(db: AsyncSession, invitations: List[Tuple[str, str]]) -> List[EmailOutbox]:
+    """Queues one invitation email per (email, token) pair, for bulk invites."""
+    return queue_emails(db, [_onboarding_invitation(email_to, token) for email_to, token in invitations])
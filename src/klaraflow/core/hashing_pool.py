@@ -0,0 +1,84 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from fastapi import status
+from klaraflow.config.settings import settings
+from klaraflow.base.exceptions import APIException
+
+
+class HashingPool:
+    """
+    Runs bcrypt hashing/verification on a dedicated thread pool so it never
+    blocks the event loop. bcrypt releases the GIL while hashing, so throughput
+    scales with the number of workers (up to the number of CPU cores).
+
+    Admission is bounded: once `workers + max_queue` calls are in flight, new
+    calls are rejected immediately with a 503 instead of piling up.
+    """
+
+    def __init__(self, workers: Optional[int], max_queue: int):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="klaraflow-hash"
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self.in_flight - self.workers, 0)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise APIException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                message="The server is busy, please retry shortly.",
+                errors=["Password hashing queue is full."]
+            )
+
+        self.start()
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_latency_ms": round(self.total_seconds / self.completed * 1000, 2) if self.completed else None,
+            "max_latency_ms": round(self.max_seconds * 1000, 2),
+        }
+
+
+hashing_pool = HashingPool(
+    workers=settings.HASHING_WORKERS,
+    max_queue=settings.HASHING_MAX_QUEUE,
+)
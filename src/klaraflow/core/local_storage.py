@@ -0,0 +1,99 @@
+import base64
+import hashlib
+import hmac
+import os
+import shutil
+import time
+import uuid
+from typing import Any, BinaryIO, List
+from klaraflow.config.settings import settings
+from klaraflow.core.storage import StorageBackend, StoredObject
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Stores uploads under LOCAL_STORAGE_DIR instead of S3, for development and
+    tests. main.py serves the directory at LOCAL_STORAGE_URL_PREFIX.
+    """
+
+    def __init__(self, concurrency: int, timeout_seconds: float):
+        super().__init__(concurrency, timeout_seconds)
+        self.root = settings.LOCAL_STORAGE_DIR
+
+    def _put(self, fileobj: BinaryIO, key: str, content_type: str | None) -> None:
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as target:
+            shutil.copyfileobj(fileobj, target)
+
+    def _url(self, key: str) -> str:
+        return f"{settings.LOCAL_STORAGE_URL_PREFIX}/{key}"
+
+    def _delete(self, key: str) -> None:
+        try:
+            os.remove(os.path.join(self.root, key))
+        except FileNotFoundError:
+            pass
+
+    # Parts are kept as numbered files under .multipart/<upload_id>/ until completion
+
+    def _parts_dir(self, upload_id: str) -> str:
+        return os.path.join(self.root, ".multipart", upload_id)
+
+    def _create_multipart(self, key: str, content_type: str | None) -> str:
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._parts_dir(upload_id))
+        return upload_id
+
+    def _upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> Any:
+        with open(os.path.join(self._parts_dir(upload_id), str(part_number)), "wb") as part:
+            part.write(data)
+        return part_number
+
+    def _complete_multipart(self, key: str, upload_id: str, parts: List[Any]) -> None:
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as target:
+            for part_number in sorted(parts):
+                with open(os.path.join(self._parts_dir(upload_id), str(part_number)), "rb") as part:
+                    shutil.copyfileobj(part, target)
+        shutil.rmtree(self._parts_dir(upload_id))
+
+    def _abort_multipart(self, key: str, upload_id: str) -> None:
+        shutil.rmtree(self._parts_dir(upload_id), ignore_errors=True)
+
+    def _copy(self, source_key: str, key: str) -> None:
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(os.path.join(self.root, source_key), path)
+
+    def _head(self, key: str) -> StoredObject | None:
+        path = os.path.join(self.root, key)
+        if not os.path.isfile(path):
+            return None
+        digest = hashlib.sha256()
+        with open(path, "rb") as stored:
+            for chunk in iter(lambda: stored.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return StoredObject(
+            size=os.path.getsize(path),
+            checksum_sha256=base64.b64encode(digest.digest()).decode(),
+            content_type=None,
+        )
+
+    # Presigned PUTs are served by api/v1/local_storage_router.py, mirroring S3's contract
+
+    def _presign_signature(self, key: str, content_type: str, size: int, checksum_sha256: str, expires: int) -> str:
+        message = f"{key}\n{content_type}\n{size}\n{checksum_sha256}\n{expires}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    def presign_put(self, key: str, content_type: str, size: int, checksum_sha256: str, expires_in: int) -> str:
+        expires = int(time.time()) + expires_in
+        signature = self._presign_signature(key, content_type, size, checksum_sha256, expires)
+        return f"{self._url(key)}?expires={expires}&signature={signature}"
+
+    def verify_presigned_put(self, key: str, content_type: str, size: int, checksum_sha256: str, expires: int, signature: str) -> bool:
+        if expires < time.time():
+            return False
+        expected = self._presign_signature(key, content_type, size, checksum_sha256, expires)
+        return hmac.compare_digest(expected, signature)
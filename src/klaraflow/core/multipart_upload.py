@@ -0,0 +1,333 @@
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+from fastapi import Request, status
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from klaraflow.config.settings import settings
+from klaraflow.core.storage import storage
+from klaraflow.core.blob_store import blob_store
+from klaraflow.base.exceptions import APIException
+
+logger = logging.getLogger("klaraflow.uploads")
+
+
+@dataclass
+class UploadLimits:
+    """What a streaming multipart upload accepts. `None` means unrestricted."""
+    max_file_size: int
+    allowed_content_types: Optional[List[str]] = None
+    file_fields: Optional[Set[str]] = None
+    max_files: Optional[int] = None
+    max_total_size: Optional[int] = None
+
+    def check_content_type(self, filename: str, content_type: str | None) -> None:
+        if self.allowed_content_types is not None and content_type not in self.allowed_content_types:
+            raise APIException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                message=f"File '{filename}' has an unsupported type. Allowed types: {', '.join(self.allowed_content_types)}.",
+                errors=["Unsupported file type."]
+            )
+
+    def check_file_count(self, count: int) -> None:
+        if self.max_files is not None and count > self.max_files:
+            raise APIException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message=f"At most {self.max_files} file(s) can be uploaded with this form.",
+                errors=["Too many files."]
+            )
+
+    def check_size(self, filename: str, size: int) -> None:
+        if size > self.max_file_size:
+            raise APIException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                message=f"File '{filename}' exceeds the maximum size of {self.max_file_size} bytes.",
+                errors=["File too large."]
+            )
+
+    def check_total_size(self, size: int) -> None:
+        if self.max_total_size is not None and size > self.max_total_size:
+            raise APIException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                message=f"The uploaded files exceed the maximum total size of {self.max_total_size} bytes.",
+                errors=["Upload too large."]
+            )
+
+
+@dataclass
+class StoredFile:
+    field_name: str
+    filename: str
+    content_type: str | None
+    size: int
+    url: str
+    # Content hash of files stored as shared blobs (see core/blob_store.py)
+    sha256: bytes | None = None
+
+
+@dataclass
+class StreamedForm:
+    fields: Dict[str, str] = field(default_factory=dict)
+    files: List[StoredFile] = field(default_factory=list)
+
+    @property
+    def file_paths(self) -> Dict[str, str]:
+        return {stored.filename: stored.url for stored in self.files}
+
+    @property
+    def blob_digests(self) -> List[bytes]:
+        return [stored.sha256 for stored in self.files if stored.sha256 is not None]
+
+    async def discard(self) -> None:
+        """
+        Delete every file stored for this form, e.g. when the request fails afterwards.
+        Shared blobs are left to the blob garbage collector, other uploads may use them.
+        """
+        await delete_stored_files([stored.url for stored in self.files if stored.sha256 is None])
+
+
+async def delete_stored_files(urls: List[str]) -> None:
+    results = await asyncio.gather(*(storage.delete_file(url) for url in urls), return_exceptions=True)
+    for url, result in zip(urls, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to clean up uploaded file {url}: {result}")
+
+
+class _FileStream:
+    """
+    One file part on its way to storage. Data is cut into UPLOAD_PART_SIZE_BYTES
+    parts; up to `concurrency` parts upload while the next one is read from the
+    request, so memory stays at roughly (concurrency + 1) parts per upload.
+    Files that fit in a single part are stored with one plain PUT.
+
+    With `blob_company_id`, the content is hashed on the way through and stored
+    as a shared blob: small files are only uploaded if the company does not have
+    them yet, larger ones go to a staging key under `folder` first.
+    """
+
+    def __init__(self, field_name: str, filename: str, content_type: str | None, folder: str, limits: UploadLimits, concurrency: int, blob_company_id: int | None = None):
+        self.field_name = field_name
+        self.filename = filename
+        self.content_type = content_type
+        self.key = storage.new_key(folder, filename)
+        self.blob_company_id = blob_company_id
+        self.digest = hashlib.sha256() if blob_company_id is not None else None
+        self.limits = limits
+        self.concurrency = concurrency
+        self.buffer = bytearray()
+        self.size = 0
+        self.upload_id: str | None = None
+        self.parts: List[asyncio.Task] = []
+        self.pending: Set[asyncio.Task] = set()
+        self.started = time.perf_counter()
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        self.limits.check_size(self.filename, self.size)
+        if self.digest is not None:
+            self.digest.update(data)
+        self.buffer += data
+        part_size = settings.UPLOAD_PART_SIZE_BYTES
+        while len(self.buffer) >= part_size:
+            part = bytes(self.buffer[:part_size])
+            del self.buffer[:part_size]
+            await self._send_part(part)
+
+    async def _send_part(self, data: bytes) -> None:
+        if self.upload_id is None:
+            self.upload_id = await storage.create_multipart(self.key, self.content_type)
+        task = asyncio.create_task(
+            storage.upload_part(self.key, self.upload_id, len(self.parts) + 1, data)
+        )
+        self.parts.append(task)
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+        if len(self.pending) >= self.concurrency:
+            await asyncio.wait(self.pending, return_when=asyncio.FIRST_COMPLETED)
+        # Surface a failed part now instead of after the whole body was read
+        for part in self.parts:
+            if part.done() and part.exception() is not None:
+                raise part.exception()
+
+    async def finish(self) -> StoredFile:
+        digest = self.digest.digest() if self.digest is not None else None
+        if self.upload_id is None:
+            if digest is not None:
+                url = await blob_store.store_bytes(self.blob_company_id, digest, bytes(self.buffer), self.content_type)
+            else:
+                url = await storage.put_bytes(self.key, bytes(self.buffer), self.content_type)
+        else:
+            if self.buffer:
+                await self._send_part(bytes(self.buffer))
+            parts = await asyncio.gather(*self.parts)
+            url = await storage.complete_multipart(self.key, self.upload_id, list(parts))
+            if digest is not None:
+                try:
+                    url = await blob_store.store_staged(self.blob_company_id, digest, self.key, self.size, self.content_type)
+                except BaseException:
+                    await delete_stored_files([url])
+                    raise
+        self.buffer = bytearray()
+        logger.info(
+            f"Stored {self.filename} ({self.size} bytes, {max(len(self.parts), 1)} parts) "
+            f"in {(time.perf_counter() - self.started) * 1000:.1f} ms"
+        )
+        return StoredFile(self.field_name, self.filename, self.content_type, self.size, url, digest)
+
+    async def abort(self) -> None:
+        for part in self.parts:
+            part.cancel()
+        await asyncio.gather(*self.parts, return_exceptions=True)
+        if self.upload_id is not None:
+            try:
+                await storage.abort_multipart(self.key, self.upload_id)
+            except Exception as e:
+                logger.error(f"Failed to abort multipart upload of {self.key}: {e}")
+
+
+class _MultipartStream:
+    def __init__(self, folder: str, limits: UploadLimits, concurrency: int, blob_company_id: int | None):
+        self.folder = folder
+        self.limits = limits
+        self.concurrency = concurrency
+        self.blob_company_id = blob_company_id
+        self.form = StreamedForm()
+        self.events: List[tuple[str, Any]] = []
+        self._header_name = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._field_name = ""
+        self._field_value = bytearray()
+        self._file: _FileStream | None = None
+        self._skip = False
+        self._total_size = 0
+
+    def callbacks(self) -> Dict[str, Any]:
+        # The parser calls these synchronously; the events are handled async after each chunk
+        def data_event(kind):
+            return lambda data, start, end: self.events.append((kind, data[start:end]))
+
+        def event(kind):
+            return lambda: self.events.append((kind, None))
+
+        return {
+            "on_part_begin": event("part_begin"),
+            "on_header_field": data_event("header_field"),
+            "on_header_value": data_event("header_value"),
+            "on_header_end": event("header_end"),
+            "on_headers_finished": event("headers_finished"),
+            "on_part_data": data_event("part_data"),
+            "on_part_end": event("part_end"),
+        }
+
+    async def handle_events(self) -> None:
+        events, self.events = self.events, []
+        for kind, data in events:
+            if kind == "part_begin":
+                self._headers = {}
+                self._field_value = bytearray()
+                self._file = None
+                self._skip = False
+            elif kind == "header_field":
+                self._header_name += data
+            elif kind == "header_value":
+                self._header_value += data
+            elif kind == "header_end":
+                self._headers[self._header_name.lower()] = self._header_value
+                self._header_name = b""
+                self._header_value = b""
+            elif kind == "headers_finished":
+                self._begin_part()
+            elif kind == "part_data":
+                await self._part_data(data)
+            elif kind == "part_end":
+                await self._end_part()
+
+    def _begin_part(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"name" not in options:
+            raise APIException(status_code=status.HTTP_400_BAD_REQUEST, message="Malformed multipart body.", errors=["Part without a field name."])
+        self._field_name = options[b"name"].decode("utf-8", errors="replace")
+        if b"filename" not in options:
+            return
+
+        filename = options[b"filename"].decode("utf-8", errors="replace")
+        if not filename:
+            # Browsers send an empty file part for file inputs left blank
+            self._skip = True
+            return
+        if self.limits.file_fields is not None and self._field_name not in self.limits.file_fields:
+            raise APIException(status_code=status.HTTP_400_BAD_REQUEST, message=f"Unexpected file field '{self._field_name}'.", errors=["Unexpected file."])
+        # Checked before the part is read, so extra files are never stored
+        self.limits.check_file_count(len(self.form.files) + 1)
+
+        content_type = self._headers.get(b"content-type", b"").decode("latin-1") or None
+        self.limits.check_content_type(filename, content_type)
+        self._file = _FileStream(
+            self._field_name, filename, content_type, self.folder, self.limits, self.concurrency, self.blob_company_id
+        )
+
+    async def _part_data(self, data: bytes) -> None:
+        if self._skip:
+            return
+        if self._file is not None:
+            self._total_size += len(data)
+            self.limits.check_total_size(self._total_size)
+            await self._file.write(data)
+            return
+        self._field_value += data
+        if len(self._field_value) > settings.UPLOAD_MAX_FIELD_BYTES:
+            raise APIException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, message=f"Form field '{self._field_name}' is too large.", errors=["Field too large."])
+
+    async def _end_part(self) -> None:
+        if self._skip:
+            return
+        if self._file is not None:
+            stored = await self._file.finish()
+            self._file = None
+            self.form.files.append(stored)
+        else:
+            self.form.fields[self._field_name] = self._field_value.decode("utf-8", errors="replace")
+
+    @property
+    def has_open_file(self) -> bool:
+        return self._file is not None
+
+    async def abort(self) -> None:
+        if self._file is not None:
+            await self._file.abort()
+        await self.form.discard()
+
+
+async def stream_multipart_upload(request: Request, folder: str, limits: UploadLimits, blob_company_id: int | None = None) -> StreamedForm:
+    """
+    Parse a multipart/form-data request while it is being received, piping file
+    parts straight into storage under `folder`, or into the company's shared
+    blobs when `blob_company_id` is given. Size and type limits are checked as
+    soon as a part's headers or data arrive. On any error, files stored so far
+    are deleted and the error is raised.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise APIException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, message="Expected a multipart/form-data request.", errors=["Unsupported content type."])
+
+    stream = _MultipartStream(folder, limits, settings.SUBMISSION_UPLOAD_CONCURRENCY, blob_company_id)
+    parser = MultipartParser(params[b"boundary"], stream.callbacks())
+    try:
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                await stream.handle_events()
+            parser.finalize()
+            await stream.handle_events()
+        except MultipartParseError as e:
+            raise APIException(status_code=status.HTTP_400_BAD_REQUEST, message="Malformed multipart body.", errors=[str(e)])
+        if stream.has_open_file:
+            raise APIException(status_code=status.HTTP_400_BAD_REQUEST, message="Malformed multipart body.", errors=["Request body ended inside a file."])
+    except BaseException:
+        await stream.abort()
+        raise
+    return stream.form
@@ -1,29 +1,92 @@
+from typing import Any, BinaryIO, List
 import boto3
-from fastapi import UploadFile
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from klaraflow.config.settings import settings
-import uuid
+from klaraflow.core.storage import StorageBackend, StoredObject
 
-class S3Service:
-    def __init__(self):
+
+class S3StorageBackend(StorageBackend):
+    def __init__(self, concurrency: int, timeout_seconds: float):
+        super().__init__(concurrency, timeout_seconds)
         self.s3 = boto3.client(
             "s3",
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
             region_name=settings.AWS_REGION,
+            config=Config(
+                connect_timeout=settings.S3_CONNECT_TIMEOUT_SECONDS,
+                read_timeout=settings.UPLOAD_TIMEOUT_SECONDS,
+                # One pooled HTTP connection per upload thread
+                max_pool_connections=concurrency,
+                signature_version="s3v4",
+                # Only send checksums we ask for; presigned URLs must not demand extra headers
+                request_checksum_calculation="when_required",
+            ),
         )
         self.bucket_name = settings.AWS_S3_BUCKET_NAME
 
-    async def upload_file(self, file: UploadFile, folder: str) -> str:
-        file_extension = file.filename.split(".")[-1]
-        file_name = f"{uuid.uuid4()}.{file_extension}"
-        file_key = f"{folder}/{file_name}"
-
-        self.s3.upload_fileobj(file.file,
+    def _put(self, fileobj: BinaryIO, key: str, content_type: str | None) -> None:
+        self.s3.upload_fileobj(fileobj,
                                self.bucket_name,
-                               file_key,
-                                ExtraArgs={"ContentType": file.content_type}
+                               key,
+                               ExtraArgs={"ContentType": content_type}
+        )
+
+    def _url(self, key: str) -> str:
+        return f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
+
+    def _delete(self, key: str) -> None:
+        self.s3.delete_object(Bucket=self.bucket_name, Key=key)
+
+    def _create_multipart(self, key: str, content_type: str | None) -> str:
+        response = self.s3.create_multipart_upload(
+            Bucket=self.bucket_name, Key=key, ContentType=content_type or "application/octet-stream"
         )
+        return response["UploadId"]
 
-        return f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{file_key}"
+    def _upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> Any:
+        response = self.s3.upload_part(
+            Bucket=self.bucket_name, Key=key, UploadId=upload_id, PartNumber=part_number, Body=data
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
 
-s3_service = S3Service()
\ No newline at end of file
+    def _complete_multipart(self, key: str, upload_id: str, parts: List[Any]) -> None:
+        self.s3.complete_multipart_upload(
+            Bucket=self.bucket_name, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+
+    def _abort_multipart(self, key: str, upload_id: str) -> None:
+        self.s3.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+
+    def _copy(self, source_key: str, key: str) -> None:
+        self.s3.copy_object(
+            Bucket=self.bucket_name, Key=key, CopySource={"Bucket": self.bucket_name, "Key": source_key}
+        )
+
+    def _head(self, key: str) -> StoredObject | None:
+        try:
+            response = self.s3.head_object(Bucket=self.bucket_name, Key=key, ChecksumMode="ENABLED")
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return StoredObject(
+            size=response["ContentLength"],
+            checksum_sha256=response.get("ChecksumSHA256"),
+            content_type=response.get("ContentType"),
+        )
+
+    def presign_put(self, key: str, content_type: str, size: int, checksum_sha256: str, expires_in: int) -> str:
+        # Content type, length and checksum are signed headers, so S3 rejects any other upload
+        return self.s3.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket_name,
+                "Key": key,
+                "ContentType": content_type,
+                "ContentLength": size,
+                "ChecksumSHA256": checksum_sha256,
+            },
+            ExpiresIn=expires_in,
+        )
@@ -1,7 +1,10 @@
+import hashlib
+import secrets
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from klaraflow.config.settings import settings
+from klaraflow.core.hashing_pool import hashing_pool
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -13,6 +16,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_hash_password(password: str) -> str:
     """Hash a plain password."""
     return pwd_context.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop."""
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_hash_password_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop."""
+    return await hashing_pool.run(get_hash_password, password)
   
 # JWT token creation and verification
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -20,7 +31,45 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(days=7)
+        expire = datetime.now(timezone.utc) + timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+# Version of the authorization claims embedded by create_user_access_token.
+# Bump it when the claim layout changes; tokens with another version fall back
+# to loading the user from the database.
+ACCESS_TOKEN_CLAIMS_VERSION = 1
+
+def create_user_access_token(user, expires_delta: timedelta | None = None):
+    """
+    Create a login token that carries the user's tenant, role and token generation
+    so routes that only need tenant and role checks can authorize without a query.
+    Lifetimes are capped at ACCESS_TOKEN_EXPIRE_SECONDS, which bounds how long
+    `token_generations` has to remember a revocation.
+    """
+    max_lifetime = timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS)
+    if expires_delta is not None:
+        expires_delta = min(expires_delta, max_lifetime)
+    claims = {
+        "sub": user.email,
+        "cv": ACCESS_TOKEN_CLAIMS_VERSION,
+        "uid": user.id,
+        "cid": user.company_id,
+        "role": user.role,
+        "act": bool(user.is_active),
+        "gen": user.token_generation or 0,
+    }
+    return create_access_token(data=claims, expires_delta=expires_delta)
+
+# Onboarding invitation tokens are opaque random strings; the database only
+# stores their SHA-256 digest, so a leaked table cannot be replayed as links.
+INVITATION_TOKEN_BYTES = 24
+
+def generate_invitation_token() -> str:
+    """Create a random URL-safe invitation token (32 characters)."""
+    return secrets.token_urlsafe(INVITATION_TOKEN_BYTES)
+
+def hash_invitation_token(token: str) -> bytes:
+    """SHA-256 digest used to look up an invitation. Also accepts legacy JWT invitations."""
+    return hashlib.sha256(token.encode("utf-8")).digest()
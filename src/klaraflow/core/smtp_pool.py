@@ -0,0 +1,99 @@
+import asyncio
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional
+import aiosmtplib
+from klaraflow.config.settings import settings
+
+
+def build_message(recipient: str, subject: str, html_body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = settings.MAIL_FROM
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(html_body, subtype="html")
+    return message
+
+
+class SmtpConnectionPool:
+    """
+    Keeps up to `size` logged-in SMTP connections open between messages, so a
+    message costs one SMTP transaction instead of a TCP connect, TLS handshake
+    and login each. A connection the server has closed in the meantime is
+    replaced and the message retried once on the new connection.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: List[aiosmtplib.SMTP] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.connects = 0
+        self.reused = 0
+
+    def _new_client(self) -> aiosmtplib.SMTP:
+        credentials = {}
+        if settings.MAIL_USE_CREDENTIALS:
+            credentials = {"username": settings.MAIL_USERNAME, "password": settings.MAIL_PASSWORD}
+        return aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            use_tls=settings.MAIL_SSL_TLS,
+            start_tls=settings.MAIL_STARTTLS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+            **credentials,
+        )
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = self._new_client()
+        await client.connect()
+        self.connects += 1
+        return client
+
+    async def send(self, message: EmailMessage) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        async with self._slots:
+            client = self._idle.pop() if self._idle else None
+            if client is not None and client.is_connected:
+                self.reused += 1
+                try:
+                    await client.send_message(message)
+                except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+                    # Idle connections get dropped by the server; not the message's fault
+                    client = None
+                except BaseException:
+                    self._close(client)
+                    raise
+                else:
+                    self._idle.append(client)
+                    return
+
+            client = await self._connect()
+            try:
+                await client.send_message(message)
+            except BaseException:
+                self._close(client)
+                raise
+            self._idle.append(client)
+
+    def _close(self, client: aiosmtplib.SMTP) -> None:
+        if client.is_connected:
+            client.close()
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for client in idle:
+            try:
+                await client.quit()
+            except Exception:
+                self._close(client)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle_connections": len(self._idle),
+            "connects": self.connects,
+            "reused": self.reused,
+        }
+
+
+smtp_pool = SmtpConnectionPool(settings.SMTP_POOL_SIZE)
@@ -0,0 +1,287 @@
+import asyncio
+import io
+import logging
+import re
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Set
+from fastapi import UploadFile, status
+from klaraflow.config.settings import settings
+from klaraflow.base.exceptions import APIException
+
+logger = logging.getLogger("klaraflow.storage")
+
+
+@dataclass
+class StoredObject:
+    size: int
+    # Base64 SHA-256, as in the x-amz-checksum-sha256 header; None if the backend has none
+    checksum_sha256: str | None
+    content_type: str | None
+
+
+class StorageBackend(ABC):
+    """
+    Object storage interface. Implementations: S3StorageBackend (core/s3_service.py)
+    and LocalStorageBackend (core/local_storage.py), selected by STORAGE_BACKEND.
+
+    Subclasses implement the blocking primitives (`_put`, `_upload_part`, ...);
+    this class runs every one of them on a dedicated thread pool. At most
+    `concurrency` calls run at once; further uploads wait up to `timeout_seconds`
+    for a slot and fail with a 503 otherwise. A transfer that
+    takes longer than `timeout_seconds` fails the request with a 504, and its
+    slot is only released once the thread has actually finished. If such an
+    abandoned transfer still succeeds, its `cleanup` (e.g. deleting the object
+    it wrote) runs, since nobody is left to use or delete the result.
+    """
+
+    def __init__(self, concurrency: int, timeout_seconds: float):
+        self.concurrency = concurrency
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.bytes_uploaded = 0
+        self.transfers = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.abandoned_cleanups = 0
+        self._cleanup_tasks: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="klaraflow-upload"
+            )
+            self._slots = asyncio.Semaphore(self.concurrency)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._slots = None
+
+    # --- Blocking backend operations, always called on the upload pool ---
+
+    @abstractmethod
+    def _put(self, fileobj: BinaryIO, key: str, content_type: str | None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _url(self, key: str) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _create_multipart(self, key: str, content_type: str | None) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _complete_multipart(self, key: str, upload_id: str, parts: List[Any]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _abort_multipart(self, key: str, upload_id: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _head(self, key: str) -> StoredObject | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _copy(self, source_key: str, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def presign_put(self, key: str, content_type: str, size: int, checksum_sha256: str, expires_in: int) -> str:
+        """
+        URL a client can PUT exactly this object to, without going through the API.
+        The upload must send the same Content-Type, Content-Length and
+        x-amz-checksum-sha256 headers.
+        """
+        raise NotImplementedError
+
+    def _key_from_url(self, url: str) -> str:
+        return url.removeprefix(self._url(""))
+
+    async def _run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        nbytes: int = 0,
+        cleanup: Callable[[Any], Awaitable[None]] | None = None,
+    ) -> Any:
+        self.start()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise APIException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                message="The server is busy, please retry the upload shortly.",
+                errors=["Upload queue is full."]
+            )
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        transfer = loop.run_in_executor(self._executor, func, *args)
+        transfer.add_done_callback(lambda _: self._finish_transfer(started))
+        try:
+            # shield: a timeout abandons the wait, not the running transfer
+            result = await asyncio.wait_for(asyncio.shield(transfer), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            if cleanup is not None:
+                transfer.add_done_callback(lambda done: self._cleanup_abandoned(done, cleanup))
+            raise APIException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                message="The file upload took too long, please retry.",
+                errors=["Upload timed out."]
+            )
+        except Exception:
+            self.failed += 1
+            raise
+
+        self.completed += 1
+        self.bytes_uploaded += nbytes
+        return result
+
+    def _cleanup_abandoned(self, transfer: asyncio.Future, cleanup: Callable[[Any], Awaitable[None]]) -> None:
+        if transfer.cancelled() or transfer.exception() is not None:
+            return
+        task = asyncio.ensure_future(self._run_cleanup(cleanup, transfer.result()))
+        # Keep a reference until it finishes, the event loop only holds weak ones
+        self._cleanup_tasks.add(task)
+        task.add_done_callback(self._cleanup_tasks.discard)
+
+    async def _run_cleanup(self, cleanup: Callable[[Any], Awaitable[None]], result: Any) -> None:
+        try:
+            await cleanup(result)
+            self.abandoned_cleanups += 1
+        except Exception as e:
+            logger.warning(f"Cleaning up after a timed-out transfer failed: {e}")
+
+    async def upload_file(self, file: UploadFile, folder: str) -> str:
+        file_key = self.new_key(folder, file.filename)
+        await self._run(
+            self._put, file.file, file_key, file.content_type,
+            nbytes=file.size or 0, cleanup=lambda _: self.delete_key(file_key),
+        )
+        return self._url(file_key)
+
+    async def delete_file(self, url: str) -> None:
+        """Delete an object previously returned by `upload_file` or `complete_multipart`."""
+        await self.delete_key(self._key_from_url(url))
+
+    # --- Streaming uploads, see core/multipart_upload.py ---
+
+    def new_key(self, folder: str, filename: str) -> str:
+        # The extension comes from the client, keep it from adding path segments
+        file_extension = re.sub(r"[^A-Za-z0-9]", "", filename.rsplit(".", 1)[-1])[:16] or "bin"
+        return f"{folder}/{uuid.uuid4()}.{file_extension}"
+
+    def url_for(self, key: str) -> str:
+        return self._url(key)
+
+    async def head(self, key: str) -> StoredObject | None:
+        """Size and checksum of a stored object, or None if it does not exist."""
+        return await self._run(self._head, key)
+
+    async def move(self, source_key: str, key: str) -> str:
+        """Move an object to a new key (server-side copy, then delete)."""
+        # A copy that finishes after the timeout still leaves the source behind
+        await self._run(self._copy, source_key, key, cleanup=lambda _: self.delete_key(source_key))
+        await self._run(self._delete, source_key)
+        return self._url(key)
+
+    async def delete_key(self, key: str) -> None:
+        await self._run(self._delete, key)
+
+    async def put_bytes(self, key: str, data: bytes, content_type: str | None, shared_key: bool = False) -> str:
+        """
+        Store `data` at `key`. Pass `shared_key` for content-addressed keys other
+        uploads may write too: those are never deleted after a timeout, since the
+        object may be another upload's (identical) copy.
+        """
+        await self._run(
+            self._put, io.BytesIO(data), key, content_type,
+            nbytes=len(data), cleanup=None if shared_key else (lambda _: self.delete_key(key)),
+        )
+        return self._url(key)
+
+    async def create_multipart(self, key: str, content_type: str | None) -> str:
+        return await self._run(
+            self._create_multipart, key, content_type,
+            cleanup=lambda upload_id: self.abort_multipart(key, upload_id),
+        )
+
+    async def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> Any:
+        # The caller aborts the upload on failure, but a part still in flight can
+        # outlive that abort; aborting again once it lands frees its storage
+        return await self._run(
+            self._upload_part, key, upload_id, part_number, data,
+            nbytes=len(data), cleanup=lambda _: self.abort_multipart(key, upload_id),
+        )
+
+    async def complete_multipart(self, key: str, upload_id: str, parts: List[Any]) -> str:
+        await self._run(self._complete_multipart, key, upload_id, parts, cleanup=lambda _: self.delete_key(key))
+        return self._url(key)
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        await self._run(self._abort_multipart, key, upload_id)
+
+    def _finish_transfer(self, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self.in_flight -= 1
+        self.transfers += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": settings.STORAGE_BACKEND,
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "abandoned_cleanups": self.abandoned_cleanups,
+            "bytes_uploaded": self.bytes_uploaded,
+            "avg_latency_ms": round(self.total_seconds / self.transfers * 1000, 2) if self.transfers else None,
+            "max_latency_ms": round(self.max_seconds * 1000, 2),
+        }
+
+
+def create_storage_backend() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "s3":
+        from klaraflow.core.s3_service import S3StorageBackend
+        backend_class = S3StorageBackend
+    elif settings.STORAGE_BACKEND == "local":
+        from klaraflow.core.local_storage import LocalStorageBackend
+        backend_class = LocalStorageBackend
+    else:
+        raise ValueError(f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}', expected 's3' or 'local'")
+    return backend_class(
+        concurrency=settings.UPLOAD_CONCURRENCY,
+        timeout_seconds=settings.UPLOAD_TIMEOUT_SECONDS,
+    )
+
+
+storage = create_storage_backend()
@@ -0,0 +1,84 @@
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Tuple
+from sqlalchemy import func, select
+from klaraflow.config.database import db_manager
+from klaraflow.config.settings import settings
+from klaraflow.models.user_model import User
+
+
+class TokenGenerationTable:
+    """
+    In-memory copy of `users.token_generation` used to revoke stateless access tokens.
+
+    Only generations bumped within the last ACCESS_TOKEN_EXPIRE_SECONDS are kept:
+    every token an older bump revoked has expired by now, so forgetting it lets
+    nothing back in. The table therefore tracks recent revocations, not every
+    user ever onboarded.
+
+    The first refresh loads that window; later ones only read bumps since the
+    previous refresh (minus TOKEN_GENERATION_REFRESH_OVERLAP_SECONDS). Bumps made
+    by this worker are applied immediately, bumps made by other workers become
+    visible after the next refresh.
+    """
+
+    def __init__(self):
+        # user id -> (generation, epoch seconds of the bump)
+        self._generations: Dict[int, Tuple[int, float]] = {}
+        self._refreshed_until: datetime | None = None
+        self.refreshes = 0
+        self.pruned = 0
+        self.last_refreshed_at: float | None = None
+        self.last_refresh_rows = 0
+
+    def current(self, user_id: int) -> int:
+        entry = self._generations.get(user_id)
+        return entry[0] if entry is not None else 0
+
+    def is_current(self, user_id: int, generation: int) -> bool:
+        return generation >= self.current(user_id)
+
+    def record(self, user_id: int, generation: int, bumped_at: float | None = None) -> None:
+        if generation > self.current(user_id):
+            self._generations[user_id] = (generation, bumped_at if bumped_at is not None else time.time())
+
+    def _prune(self, now: float) -> None:
+        horizon = now - settings.ACCESS_TOKEN_EXPIRE_SECONDS
+        expired = [user_id for user_id, (_, bumped_at) in self._generations.items() if bumped_at < horizon]
+        for user_id in expired:
+            del self._generations[user_id]
+        self.pruned += len(expired)
+
+    async def refresh(self) -> None:
+        async with db_manager.session_factory() as db:
+            now = (await db.execute(select(func.now()))).scalar_one()
+            if self._refreshed_until is None:
+                since = now - timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS)
+            else:
+                since = self._refreshed_until - timedelta(seconds=settings.TOKEN_GENERATION_REFRESH_OVERLAP_SECONDS)
+            result = await db.execute(
+                select(User.id, User.token_generation, User.token_generation_bumped_at)
+                .where(User.token_generation_bumped_at > since)
+            )
+            rows = result.all()
+        # Generations only ever increase, so merging by max never resurrects a
+        # revoked token even if a local bump raced with this query.
+        for user_id, generation, bumped_at in rows:
+            self.record(user_id, generation, bumped_at.timestamp())
+        self._refreshed_until = now
+        self._prune(now.timestamp())
+        self.refreshes += 1
+        self.last_refresh_rows = len(rows)
+        self.last_refreshed_at = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._generations),
+            "refreshes": self.refreshes,
+            "last_refresh_rows": self.last_refresh_rows,
+            "pruned": self.pruned,
+            "last_refreshed_at": self.last_refreshed_at,
+        }
+
+
+token_generations = TokenGenerationTable()
@@ -0,0 +1,23 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from klaraflow.config.database import mark_tenant_write
+from klaraflow.models import Company
+
+async def get_settings_version(db: AsyncSession, company_id: int) -> int:
+    """The company's settings version, read without loading any settings."""
+    result = await db.execute(select(Company.settings_version).where(Company.id == company_id))
+    return result.scalar_one_or_none() or 0
+
+async def bump_settings_version(db: AsyncSession, company_id: int) -> None:
+    """
+    Move the company's settings version on, in the caller's transaction. Call it
+    from every write to document templates, onboarding templates, departments
+    and designations so cached copies of them stop matching.
+    """
+    await db.execute(
+        update(Company)
+        .where(Company.id == company_id)
+        .values(settings_version=Company.settings_version + 1)
+    )
+    mark_tenant_write(db, company_id)
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from klaraflow.models import Department
+from klaraflow.crud.company_crud import bump_settings_version
 from klaraflow.schemas import department_schema
 from typing import List
 
@@ -17,16 +18,17 @@ async def get_departments_by_company(db: AsyncSession, company_id: int) -> List[
 async def create_department(db: AsyncSession, department: department_schema.DepartmentCreate, company_id: int) -> Department:
     db_department = Department(**department.model_dump(), company_id=company_id)
     db.add(db_department)
-    await db.commit()
-    await db.refresh(db_department)
+    await db.flush()
+    await bump_settings_version(db, company_id)
     return db_department
 
 async def update_department(db: AsyncSession, db_department: Department, department_in: department_schema.DepartmentUpdate) -> Department:
     db_department.name = department_in.name
-    await db.commit()
-    await db.refresh(db_department)
+    await db.flush()
+    await bump_settings_version(db, db_department.company_id)
     return db_department
 
 async def delete_department(db: AsyncSession, db_department: Department):
     await db.delete(db_department)
-    await db.commit()
\ No newline at end of file
+    await db.flush()
+    await bump_settings_version(db, db_department.company_id)
@@ -4,6 +4,7 @@ from typing import List, Optional
 
 from klaraflow.models import Designation, User
 from klaraflow.schemas import designation_schema
+from klaraflow.crud.company_crud import bump_settings_version
 
 async def get_designation(db: AsyncSession, *, designation_id: int, company_id: int) -> Optional[Designation]:
     """Get a single designation by ID, ensuring it belongs to the correct company."""
@@ -22,8 +23,8 @@ async def create_designation(db: AsyncSession, *, designation_in: designation_sc
     # model_dump() is the Pydantic v2 equivalent of .dict()
     db_designation = Designation(**designation_in.model_dump(), company_id=company_id)
     db.add(db_designation)
-    await db.commit()
-    await db.refresh(db_designation)
+    await db.flush()
+    await bump_settings_version(db, company_id)
     return db_designation
 
 async def update_designation(
@@ -37,13 +38,14 @@ async def update_designation(
     update_data = designation_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_designation, field, value)
-    await db.commit()
-    await db.refresh(db_designation)
+    await db.flush()
+    await bump_settings_version(db, db_designation.company_id)
     return db_designation
 
 async def delete_designation(db: AsyncSession, *, db_designation: Designation):
     """Delete a designation."""
     # Consider checking if any employees are assigned to this designation before deleting
     await db.delete(db_designation)
-    await db.commit()
+    await db.flush()
+    await bump_settings_version(db, db_designation.company_id)
     return {"ok": True}
\ No newline at end of file
@@ -1,16 +1,50 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from sqlalchemy import func, union, update
 from fastapi import status
 from typing import List, Optional
 
 from klaraflow.models.settings.document_template_model import DocumentTemplate, DocumentField
+from klaraflow.models.onboarding.onboarding_template_model import (
+    OnboardingTemplate,
+    onboarding_template_required_documents,
+    onboarding_template_optional_documents
+)
+from klaraflow.config.database import run_after_commit
+from klaraflow.core.cache import onboarding_view_cache
+from klaraflow.crud.company_crud import bump_settings_version
 from klaraflow.schemas.document_schema import (
     DocumentTemplateCreate, 
     DocumentTemplateUpdate,
     DocumentFieldCreate
 )
 from klaraflow.base.exceptions import APIException
+from klaraflow.base.pagination import KeysetPage, fetch_keyset_page
+
+async def _invalidate_onboarding_views(db: AsyncSession, document_template_id: int, bump_versions: bool = False) -> None:
+    """
+    Drop cached onboarding views of every template using this document once committed.
+    With `bump_versions`, also touch those templates' updated_at, which other
+    workers compare against their cached view version. Needed when the change
+    does not move the document's own updated_at, i.e. when it is deleted.
+    """
+    
+    result = await db.execute(union(
+        select(onboarding_template_required_documents.c.onboarding_template_id)
+        .where(onboarding_template_required_documents.c.document_template_id == document_template_id),
+        select(onboarding_template_optional_documents.c.onboarding_template_id)
+        .where(onboarding_template_optional_documents.c.document_template_id == document_template_id),
+    ))
+    onboarding_template_ids = result.scalars().all()
+    if bump_versions and onboarding_template_ids:
+        await db.execute(
+            update(OnboardingTemplate)
+            .where(OnboardingTemplate.id.in_(onboarding_template_ids))
+            .values(updated_at=func.now())
+        )
+    for onboarding_template_id in onboarding_template_ids:
+        run_after_commit(db, onboarding_view_cache.invalidate, onboarding_template_id)
 
 async def create_document_template(
     db: AsyncSession, 
@@ -20,55 +54,51 @@ async def create_document_template(
 ) -> DocumentTemplate:
     """Create a new document template with fields"""
     
-    # Create the template
+    # Create the template together with its fields; the unit of work inserts
+    # both on flush and hands back ids and timestamps via RETURNING
     db_template = DocumentTemplate(
         name=template_data.name,
-        company_id=company_id
+        company_id=company_id,
+        max_file_size_bytes=template_data.max_file_size_bytes,
+        allowed_content_types=template_data.allowed_content_types,
+        fields=[
+            DocumentField(
+                label=field_data.label,
+                field_type=field_data.field_type,
+                placeholder=field_data.placeholder,
+                description=field_data.description,
+                required=field_data.required,
+                width=field_data.width,
+                order_index=field_data.order_index or idx
+            )
+            for idx, field_data in enumerate(template_data.fields)
+        ]
     )
     db.add(db_template)
-    await db.flush()  # Get the ID without committing
-    
-    # Create fields
-    for idx, field_data in enumerate(template_data.fields):
-        db_field = DocumentField(
-            template_id=db_template.id,
-            label=field_data.label,
-            field_type=field_data.field_type,
-            placeholder=field_data.placeholder,
-            description=field_data.description,
-            required=field_data.required,
-            width=field_data.width,
-            order_index=field_data.order_index or idx
-        )
-        db.add(db_field)
-    
-    await db.commit()
-    await db.refresh(db_template)
+    await db.flush()
+    await bump_settings_version(db, company_id)
     
-    # Load the template with fields
-    result = await db.execute(
-        select(DocumentTemplate)
-        .options(selectinload(DocumentTemplate.fields))
-        .where(DocumentTemplate.id == db_template.id)
-    )
-    return result.scalar_one()
+    # Fields are already in the identity map, no reload needed
+    return db_template
 
 async def get_document_templates(
     db: AsyncSession, 
     company_id: int, 
-    skip: int = 0, 
-    limit: int = 100
-) -> List[DocumentTemplate]:
-    """Get all document templates for a company"""
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> KeysetPage:
+    """Get a keyset page of document templates for a company, newest first"""
     
-    result = await db.execute(
-        select(DocumentTemplate)
-        .options(selectinload(DocumentTemplate.fields))
-        .where(DocumentTemplate.company_id == company_id)
-        .offset(skip)
-        .limit(limit)
+    return await fetch_keyset_page(
+        db,
+        select(DocumentTemplate).where(DocumentTemplate.company_id == company_id),
+        DocumentTemplate,
+        cursor=cursor,
+        limit=limit,
+        include_total=include_total,
+        options=(selectinload(DocumentTemplate.fields),)
     )
-    return result.scalars().all()
 
 async def get_document_template_by_id(
     db: AsyncSession, 
@@ -107,17 +137,20 @@ async def update_document_template(
     # Update basic fields
     if template_data.name is not None:
         db_template.name = template_data.name
+    for limit in ("max_file_size_bytes", "allowed_content_types"):
+        if limit in template_data.model_fields_set:
+            setattr(db_template, limit, getattr(template_data, limit))
     
     # Update fields if provided
     if template_data.fields is not None:
-        # Delete existing fields
-        for field in db_template.fields:
-            await db.delete(field)
-        
-        # Create new fields
+        # Upsert fields by id: update existing ones in place, add new ones and
+        # remove the ones missing from the incoming list. Unchanged fields cost
+        # nothing, since the unit of work only writes attributes that changed.
+        existing_fields = {f.id: f for f in db_template.fields}
+        incoming_ids = set()
+
         for idx, field_data in enumerate(template_data.fields):
-            db_field = DocumentField(
-                template_id=db_template.id,
+            values = dict(
                 label=field_data.label,
                 field_type=field_data.field_type,
                 placeholder=field_data.placeholder,
@@ -126,18 +159,28 @@ async def update_document_template(
                 width=field_data.width,
                 order_index=field_data.order_index or idx
             )
-            db.add(db_field)
-    
-    await db.commit()
-    await db.refresh(db_template)
+            if field_data.id in existing_fields:
+                # update existing
+                incoming_ids.add(field_data.id)
+                field = existing_fields[field_data.id]
+                for key, value in values.items():
+                    setattr(field, key, value)
+            else:
+                # new field (or an id that doesn't belong to this template)
+                db_template.fields.append(DocumentField(**values))
+
+        # delete-orphan removes the dropped fields on flush
+        for field_id, field in existing_fields.items():
+            if field_id not in incoming_ids:
+                db_template.fields.remove(field)
     
-    # Reload with fields
-    result = await db.execute(
-        select(DocumentTemplate)
-        .options(selectinload(DocumentTemplate.fields))
-        .where(DocumentTemplate.id == template_id)
-    )
-    return result.scalar_one()
+    # Field edits don't touch the template row, so bump updated_at explicitly;
+    # it versions the cached onboarding views that embed this document
+    db_template.updated_at = func.now()
+    await db.flush()
+    await bump_settings_version(db, company_id)
+    await _invalidate_onboarding_views(db, db_template.id)
+    return db_template
 
 async def delete_document_template(
     db: AsyncSession,
@@ -153,6 +196,8 @@ async def delete_document_template(
             message="Document template not found"
         )
     
+    await _invalidate_onboarding_views(db, db_template.id, bump_versions=True)
     await db.delete(db_template)
-    await db.commit()
+    await db.flush()
+    await bump_settings_version(db, company_id)
     return True
\ No newline at end of file
@@ -1,18 +1,43 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import literal_column, func, union_all, insert, false, text, any_, bindparam, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY
+from pydantic import ValidationError
 from fastapi import status, UploadFile
 from klaraflow.models.documents.document_submission_model import DocumentSubmission
 from klaraflow.models.onboarding.session_model import OnboardingSession
+from klaraflow.models.user_model import User
 from klaraflow.models.onboarding.task_model import OnboardingTask
+from klaraflow.models.onboarding.todo_item_model import TodoItem
+from klaraflow.models.onboarding.onboarding_template_model import (
+    OnboardingTemplate,
+    onboarding_template_required_documents,
+    onboarding_template_optional_documents
+)
+from klaraflow.models.settings.document_template_model import DocumentTemplate
+from klaraflow.models.designation_model import Designation
+from klaraflow.models.department_model import Department
 from klaraflow.models.documents.document_submission_model import DocumentSubmission 
-from klaraflow.schemas import onboarding_schema
-from klaraflow.core.security import create_access_token, get_hash_password
-from klaraflow.core.email_service import send_onboarding_invitation
+from klaraflow.schemas import onboarding_schema, document_schema
+from klaraflow.core.security import create_user_access_token, get_hash_password_async, generate_invitation_token, hash_invitation_token
+from klaraflow.core.email_service import queue_onboarding_invitation, queue_onboarding_invitations
 from klaraflow.crud import document_template_crud, user_crud
-from klaraflow.core.s3_service import s3_service
+from klaraflow.core.storage import storage
+from klaraflow.core.blob_store import blob_store
+from klaraflow.core.multipart_upload import StreamedForm, UploadLimits, delete_stored_files
+from klaraflow.core.cache import principal_cache, onboarding_view_cache, invalid_invitation_cache
+from klaraflow.core.token_generations import token_generations
 from klaraflow.base.exceptions import APIException
+from klaraflow.base.pagination import KeysetPage, fetch_keyset_page
+from klaraflow.config.database import run_after_commit, run_after_rollback, mark_tenant_write
+from klaraflow.config.settings import settings
+import base64
+import binascii
+import csv
+import io
 import json
 
 import logging
@@ -23,6 +48,49 @@ logging.basicConfig(
     format="%(asctime)s %(levelname)s %(name)s %(message)s"
 )
 
+TASK_COLUMNS = ["session_id", "todo_item_id", "title", "description", "is_completed"]
+
+# Onboarding tasks carry no company_id, so the ORM cannot tell which tenant a
+# task write belongs to. Every task mutation calls mark_tenant_write, or the
+# employee's next read could be served from a lagging replica.
+
+async def create_session_tasks(db: AsyncSession, session_ids: List[int], company_id: int) -> None:
+    """
+    Create one task per todo of each new session's template with a single
+    INSERT ... SELECT, however many sessions there are. Sessions without a
+    template get no tasks.
+    """
+    if not session_ids:
+        return
+    await db.execute(
+        insert(OnboardingTask).from_select(
+            TASK_COLUMNS,
+            select(OnboardingSession.id, TodoItem.id, TodoItem.title, TodoItem.description, false())
+            .join(TodoItem, TodoItem.template_id == OnboardingSession.template_id)
+            .where(OnboardingSession.id.in_(session_ids))
+        )
+    )
+    mark_tenant_write(db, company_id)
+
+async def backfill_onboarding_tasks(db: AsyncSession, template_id: int, company_id: int) -> None:
+    """
+    Add tasks for todos added to a template to every open session using it.
+    Existing tasks are left untouched thanks to the (session_id, todo_item_id)
+    unique constraint.
+    """
+    await db.execute(
+        pg_insert(OnboardingTask).from_select(
+            TASK_COLUMNS,
+            select(OnboardingSession.id, TodoItem.id, TodoItem.title, TodoItem.description, false())
+            .join(TodoItem, TodoItem.template_id == OnboardingSession.template_id)
+            .where(
+                OnboardingSession.template_id == template_id,
+                OnboardingSession.status.notin_(["onboarded", "expired"])
+            )
+        ).on_conflict_do_nothing(index_elements=["session_id", "todo_item_id"])
+    )
+    mark_tenant_write(db, company_id)
+
 async def invite_new_employee(db: AsyncSession,invite_data: onboarding_schema.OnboardingInviteRequest,company_id: int, profile_picture_url: str = None):
     #? Check for existing pending invites
     existing_session = select(OnboardingSession).where(
@@ -36,12 +104,7 @@ async def invite_new_employee(db: AsyncSession,invite_data: onboarding_schema.On
     expires_delta = timedelta(hours=24)
     expires_at = datetime.now(timezone.utc) + expires_delta
     
-    token_data = {
-        "sub": invite_data.email, 
-        "cid": company_id,
-        "scope": "onboarding_invitation"
-    }
-    invitation_token = create_access_token(data=token_data, expires_delta=expires_delta)
+    invitation_token = generate_invitation_token()
 
     # We'll create the user with a placeholder, inactive status.
     # The actual user record will be fully created after onboarding.
@@ -49,7 +112,7 @@ async def invite_new_employee(db: AsyncSession,invite_data: onboarding_schema.On
     db_session = OnboardingSession(
         company_id=company_id,
         new_employee_email=invite_data.email,
-        invitation_token=invitation_token,
+        invitation_token_hash=hash_invitation_token(invitation_token),
         expires_at=expires_at,
         created_at=datetime.now(timezone.utc),
         empId=invite_data.empId,
@@ -72,20 +135,207 @@ async def invite_new_employee(db: AsyncSession,invite_data: onboarding_schema.On
         template_id=invite_data.onboardingTemplateId
     )
     db.add(db_session)
-    await db.commit()
-    await db.refresh(db_session)
-    
-    await send_onboarding_invitation(
-        email_to=invite_data.email, 
-        token=invitation_token
-    )
-    
+    await db.flush()
+    await create_session_tasks(db, [db_session.id], company_id)
+    # Queued in the same transaction: the email goes out if and only if the session exists
+    queue_onboarding_invitation(db, email_to=invite_data.email, token=invitation_token)
+    # get_db commits once the request has its response; nothing is sent before that
+    await db.flush()
+
     return db_session
 
+BULK_INVITE_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+def parse_bulk_invite_rows(body: bytes, content_type: str) -> List[Tuple[int, Dict[str, Any] | str]]:
+    """
+    Split a CSV (header row with OnboardingInviteRequest field names) or NDJSON
+    (one object per line) upload into (row number, fields) pairs. Rows that
+    cannot be parsed come back as (row number, error message).
+    """
+    upload_format = BULK_INVITE_FORMATS.get(content_type)
+    if upload_format is None:
+        raise APIException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            message=f"Expected one of: {', '.join(BULK_INVITE_FORMATS)}.",
+            errors=["Unsupported content type."]
+        )
+    try:
+        text_body = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise APIException(status_code=400, message="The upload must be UTF-8 encoded.", errors=["Invalid encoding."])
+
+    rows: List[Tuple[int, Dict[str, Any] | str]] = []
+    if upload_format == "csv":
+        reader = csv.DictReader(io.StringIO(text_body))
+        for number, record in enumerate(reader, start=1):
+            if None in record:
+                rows.append((number, "Row has more columns than the header."))
+            else:
+                # Empty cells are missing values, not empty strings
+                rows.append((number, {key.strip(): value for key, value in record.items() if value not in (None, "")}))
+    else:
+        for number, line in enumerate(text_body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                rows.append((number, f"Invalid JSON: {e.msg}"))
+                continue
+            rows.append((number, record if isinstance(record, dict) else "Expected a JSON object."))
+
+    if len(rows) > settings.BULK_INVITE_MAX_ROWS:
+        raise APIException(status_code=413, message=f"At most {settings.BULK_INVITE_MAX_ROWS} invitations can be sent at once.", errors=["Too many rows."])
+    return rows
+
+async def _invited_emails(db: AsyncSession, emails: List[str]) -> set:
+    """Which of `emails` already have an invitation. One array parameter, whatever the number of emails."""
+    if not emails:
+        return set()
+    result = await db.execute(
+        select(OnboardingSession.new_employee_email).where(
+            OnboardingSession.new_employee_email == any_(bindparam("emails", emails, type_=ARRAY(String)))
+        )
+    )
+    return set(result.scalars().all())
+
+async def _existing_company_ids(db: AsyncSession, model, ids: set, company_id: int) -> set:
+    if not ids:
+        return set()
+    result = await db.execute(select(model.id).where(model.id.in_(ids), model.company_id == company_id))
+    return set(result.scalars().all())
+
+async def bulk_invite_employees(
+    db: AsyncSession,
+    *,
+    company_id: int,
+    rows: List[Tuple[int, Dict[str, Any] | str]]
+) -> onboarding_schema.BulkInviteReport:
+    """
+    Invite many employees in one transaction. Every row is validated first;
+    duplicates are found with a single `= ANY(...)` query, sessions and their
+    tasks are written with multi-row INSERTs and the invitation emails are
+    queued in the outbox together. Invalid rows are reported and skipped, they
+    do not stop the valid ones.
+    """
+    results: Dict[int, onboarding_schema.BulkInviteRowResult] = {}
+    valid: List[Tuple[int, onboarding_schema.OnboardingInviteRequest]] = []
+    for number, record in rows:
+        if isinstance(record, str):
+            results[number] = onboarding_schema.BulkInviteRowResult(row=number, status="invalid", errors=[record])
+            continue
+        try:
+            invite = onboarding_schema.OnboardingInviteRequest.model_validate(record)
+        except ValidationError as e:
+            results[number] = onboarding_schema.BulkInviteRowResult(
+                row=number, email=str(record["email"]) if record.get("email") is not None else None, status="invalid",
+                errors=[f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()]
+            )
+            continue
+        errors = [f"{name}: must be an integer id" for name in ("designation", "department")
+                  if getattr(invite, name) is not None and not getattr(invite, name).isdigit()]
+        if errors:
+            results[number] = onboarding_schema.BulkInviteRowResult(row=number, email=invite.email, status="invalid", errors=errors)
+            continue
+        valid.append((number, invite))
+
+    # Duplicates within the upload, then against existing invitations in one round trip
+    first_row: Dict[str, int] = {}
+    unique = []
+    for number, invite in valid:
+        if invite.email in first_row:
+            results[number] = onboarding_schema.BulkInviteRowResult(
+                row=number, email=invite.email, status="duplicate", errors=[f"Same email as row {first_row[invite.email]}."]
+            )
+        else:
+            first_row[invite.email] = number
+            unique.append((number, invite))
+    existing_emails = await _invited_emails(db, [invite.email for _, invite in unique])
+
+    # Referenced templates, designations and departments must belong to the company
+    templates = await _existing_company_ids(db, OnboardingTemplate, {i.onboardingTemplateId for _, i in unique if i.onboardingTemplateId is not None}, company_id)
+    designations = await _existing_company_ids(db, Designation, {int(i.designation) for _, i in unique if i.designation is not None}, company_id)
+    departments = await _existing_company_ids(db, Department, {int(i.department) for _, i in unique if i.department is not None}, company_id)
+
+    to_insert: List[Tuple[int, onboarding_schema.OnboardingInviteRequest]] = []
+    for number, invite in unique:
+        errors = []
+        if invite.email in existing_emails:
+            results[number] = onboarding_schema.BulkInviteRowResult(
+                row=number, email=invite.email, status="duplicate", errors=["An active invitation for this email already exists."]
+            )
+            continue
+        if invite.onboardingTemplateId is not None and invite.onboardingTemplateId not in templates:
+            errors.append("onboardingTemplateId: onboarding template not found")
+        if invite.designation is not None and int(invite.designation) not in designations:
+            errors.append("designation: designation not found")
+        if invite.department is not None and int(invite.department) not in departments:
+            errors.append("department: department not found")
+        if errors:
+            results[number] = onboarding_schema.BulkInviteRowResult(row=number, email=invite.email, status="invalid", errors=errors)
+        else:
+            to_insert.append((number, invite))
+
+    if to_insert:
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(hours=24)
+        tokens = [generate_invitation_token() for _ in to_insert]
+        session_rows = [
+            {
+                "company_id": company_id,
+                "new_employee_email": invite.email,
+                "invitation_token_hash": hash_invitation_token(token),
+                "expires_at": expires_at,
+                "created_at": now,
+                "empId": invite.empId,
+                "firstName": invite.firstName,
+                "lastName": invite.lastName,
+                "phone": invite.phone,
+                "gender": invite.gender,
+                "userRole": invite.userRole,
+                "designation_id": int(invite.designation) if invite.designation is not None else None,
+                "department_id": int(invite.department) if invite.department is not None else None,
+                "jobType": invite.jobType,
+                "hiringDate": invite.hiringDate,
+                "reportTo": invite.reportTo,
+                "grade": invite.grade,
+                "probationPeriod": invite.probationPeriod,
+                "dateOfBirth": invite.dateOfBirth,
+                "maritalStatus": invite.maritalStatus,
+                "nationality": invite.nationality,
+                "template_id": invite.onboardingTemplateId,
+            }
+            for (_, invite), token in zip(to_insert, tokens)
+        ]
+        # Sent as multi-row INSERT ... RETURNING statements (insertmanyvalues)
+        result = await db.execute(
+            insert(OnboardingSession).returning(OnboardingSession.id, sort_by_parameter_order=True),
+            session_rows
+        )
+        session_ids = result.scalars().all()
+        await create_session_tasks(db, session_ids, company_id)
+        queue_onboarding_invitations(db, [(invite.email, token) for (_, invite), token in zip(to_insert, tokens)])
+        for (number, invite), session_id in zip(to_insert, session_ids):
+            results[number] = onboarding_schema.BulkInviteRowResult(row=number, email=invite.email, status="invited", session_id=session_id)
+
+    ordered = [results[number] for number in sorted(results)]
+    invited = sum(1 for result in ordered if result.status == "invited")
+    return onboarding_schema.BulkInviteReport(invited=invited, rejected=len(ordered) - invited, results=ordered)
+
 async def get_session_by_token(db: AsyncSession, token: str) -> OnboardingSession:
-    statement = select(OnboardingSession).where(OnboardingSession.invitation_token == token)
-    result = await db.execute(statement)
-    session = result.scalar_one_or_none()
+    token_hash = hash_invitation_token(token)
+    session = None
+    if invalid_invitation_cache.get(token_hash) is None:
+        statement = select(OnboardingSession).where(OnboardingSession.invitation_token_hash == token_hash)
+        result = await db.execute(statement)
+        session = result.scalar_one_or_none()
+        if not session:
+            invalid_invitation_cache.set(token_hash, True)
     
     if not session:
         raise APIException(status_code=status.HTTP_404_NOT_FOUND, message="Invitation link is invalid or has been used.", errors=["Invalid or used token."])
@@ -95,6 +345,7 @@ async def get_session_by_token(db: AsyncSession, token: str) -> OnboardingSessio
 
     if session.expires_at < datetime.now(timezone.utc):
         session.status = "expired"
+        # Commit explicitly: the request fails below, which rolls back anything not committed
         await db.commit()
         raise APIException(status_code=status.HTTP_400_BAD_REQUEST, message="This invitation link has expired.", errors=["Token expired."])
         
@@ -105,7 +356,7 @@ async def activate_employee_account(db: AsyncSession, *, activation_data: onboar
     session = await get_session_by_token(db, token=activation_data.token)
     
     # 2. Hash the new password provided by the employee
-    hashed_password = get_hash_password(activation_data.password)
+    hashed_password = await get_hash_password_async(activation_data.password)
     
     # 3. Create the permanent user record in the 'users' table
     new_user = await user_crud.create_user_from_onboarding(
@@ -116,18 +367,18 @@ async def activate_employee_account(db: AsyncSession, *, activation_data: onboar
     
     # 4. Mark the temporary onboarding session as 'in_progress'
     session.status = "in_progress"
-    await db.commit()
+    await db.flush()
+    run_after_commit(db, principal_cache.invalidate, new_user.email)
     
     # 5. Create a login token for the new user so they are immediately logged in
-    login_token = create_access_token(data={"sub": new_user.email})
+    login_token = create_user_access_token(new_user)
     
     return {"access_token": login_token, "token_type": "bearer"}
 
 async def update_onboarding_step(db: AsyncSession, token: str, step_data: onboarding_schema.OnboardingStepUpdateRequest) -> OnboardingSession:
     session = await get_session_by_token(db, token=token)
     session.current_step = step_data.current_step
-    await db.commit()
-    await db.refresh(session)
+    await db.flush()
     return session
 
 async def get_onboarding_session_for_user(db: AsyncSession, user_email: str) -> OnboardingSession:
@@ -140,120 +391,134 @@ async def get_onboarding_session_for_user(db: AsyncSession, user_email: str) ->
         raise APIException(status_code=status.HTTP_404_NOT_FOUND, message="No active onboarding session found", errors=["No onboarding session"])
     return session
 
+def _compile_document(doc) -> dict:
+    """Serialize a document template and its fields for the onboarding view."""
+    return {
+        "id": doc.id,
+        "name": doc.name,
+        "fields": [
+            {
+                "id": f.id,
+                "label": f.label,
+                "field_type": getattr(f.field_type, "value", f.field_type),
+                "placeholder": f.placeholder,
+                "description": f.description,
+                "required": f.required,
+                "width": getattr(f.width, "value", f.width),
+                "order_index": f.order_index,
+                "created_at": f.created_at,
+            }
+            for f in doc.fields
+        ],
+        "created_at": doc.created_at,
+        "updated_at": doc.updated_at,
+    }
+
+def compile_onboarding_view(template) -> dict:
+    """
+    Build the session-independent part of the onboarding view: todos and the
+    required/optional documents with their fields, as plain dicts.
+    """
+    return {
+        "todos": [
+            onboarding_schema.TodoItemRead.model_validate(todo).model_dump()
+            for todo in template.todos
+        ],
+        "required_documents": [_compile_document(doc) for doc in template.required_documents],
+        "optional_documents": [_compile_document(doc) for doc in template.optional_documents],
+    }
+
+async def _get_onboarding_view_version(db: AsyncSession, template_id: int):
+    """
+    Version of a template's compiled view: its own updated_at plus the latest
+    updated_at of the document templates attached to it. Template and
+    document-template edits touch updated_at, so any edit yields a new version.
+    """
+    attached = union_all(
+        select(onboarding_template_required_documents.c.document_template_id.label("document_template_id"))
+        .where(onboarding_template_required_documents.c.onboarding_template_id == template_id),
+        select(onboarding_template_optional_documents.c.document_template_id)
+        .where(onboarding_template_optional_documents.c.onboarding_template_id == template_id),
+    ).subquery()
+    docs_updated_at = (
+        select(func.max(DocumentTemplate.updated_at))
+        .where(DocumentTemplate.id.in_(select(attached.c.document_template_id)))
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(OnboardingTemplate.updated_at, docs_updated_at)
+        .where(OnboardingTemplate.id == template_id)
+    )
+    return result.one_or_none()
+
+async def get_onboarding_view(db: AsyncSession, template_id: int, company_id: int) -> dict | None:
+    """
+    Return the compiled view of an onboarding template, from the in-process
+    cache when its version is unchanged. Returns None if the template is gone.
+    """
+    version = await _get_onboarding_view_version(db, template_id)
+    if version is None:
+        return None
+    version = tuple(version)
+
+    cached = onboarding_view_cache.get(template_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    from klaraflow.crud.onboarding_template_crud import get_onboarding_template_by_id
+    template = await get_onboarding_template_by_id(db, template_id=template_id, company_id=company_id)
+    if template is None:
+        return None
+    view = compile_onboarding_view(template)
+    onboarding_view_cache.set(template_id, (version, view))
+    return view
+
 async def get_onboarding_data_for_user(db: AsyncSession, user_email: str) -> onboarding_schema.OnboardingDataRead:
     try:
         session = await get_onboarding_session_for_user(db, user_email)
         logger.info(f"Retrieved onboarding session for user {user_email}: {session.id}")
         
-        from klaraflow.crud.onboarding_template_crud import get_onboarding_template_by_id
-        template = await get_onboarding_template_by_id(db, template_id=session.template_id, company_id=session.company_id)
-        logger.info(f"Onboarding template for session {session.id}: {template}")
+        view = None
+        if session.template_id is not None:
+            view = await get_onboarding_view(db, template_id=session.template_id, company_id=session.company_id)
         
         todos = []
         required_documents = []
         optional_documents = []
         
-        if template:
-            logger.info(f"Template found, processing todos and documents for session {session.id}")
-            # Pre-fetch existing tasks and documents for this session
-            existing_tasks_result = await db.execute(select(OnboardingTask).where(OnboardingTask.session_id == session.id))
-            existing_tasks = {task.todo_item_id: task for task in existing_tasks_result.scalars().all()}
-            logger.debug(f"Existing tasks for session {session.id}: {list(existing_tasks.keys())}")
+        if view:
+            logger.info(f"Template found, applying session state for session {session.id}")
+            # Tasks are created at invite time, so this path only reads
+            tasks_result = await db.execute(
+                select(OnboardingTask.todo_item_id, OnboardingTask.is_completed)
+                .where(OnboardingTask.session_id == session.id)
+            )
+            completed_by_todo = dict(tasks_result.all())
+            logger.debug(f"Existing tasks for session {session.id}: {list(completed_by_todo.keys())}")
 
             uploaded_docs_result = await db.execute(
-                select(DocumentSubmission).where(DocumentSubmission.employee_id == session.empId)
+                select(DocumentSubmission.template_id).where(DocumentSubmission.session_id == session.id)
             )
-            uploaded_doc_ids = {doc.template_id for doc in uploaded_docs_result.scalars().all()}
+            uploaded_doc_ids = set(uploaded_docs_result.scalars().all())
             logger.debug(f"Uploaded doc IDs for session {session.id} from submissions: {uploaded_doc_ids}")
             
-            # Create tasks for todos that don't have one yet
-            for todo_template in template.todos:
-                if todo_template.id not in existing_tasks:
-                    new_task = OnboardingTask(
-                        session_id=session.id,
-                        todo_item_id=todo_template.id,
-                        title=todo_template.title,
-                        description=todo_template.description,
-                        is_completed=False
-                    )
-                    db.add(new_task)
-                    existing_tasks[todo_template.id] = new_task
-                    logger.info(f"Created new task for todo {todo_template.id} in session {session.id}")
-            await db.commit()  # Commit new tasks
-            logger.info(f"Committed new tasks for session {session.id}")
-            
-            # Build todo representations and attach completion status returned as plain dicts
-            todos = []
-            for todo in template.todos:
-                todo_model = onboarding_schema.TodoItemRead.model_validate(todo)
-                todo_dict = todo_model.model_dump()
-                todo_dict["is_completed"] = existing_tasks.get(todo.id).is_completed if todo.id in existing_tasks else False
-                todos.append(todo_dict)
-            logger.debug(f"Processed {len(todos)} todos for session {session.id}")
-            
-            # Build document representations and set 'uploaded' flag on plain dicts
-            # Convert DocumentTemplate and nested DocumentField ORM objects into serializable dicts
-            required_documents = []
-            for doc in template.required_documents:
-                # Convert fields into simple dicts
-                fields_list = []
-                for f in getattr(doc, "fields", []) or []:
-                    fields_list.append({
-                        "id": getattr(f, "id", None),
-                        "label": getattr(f, "label", None),
-                        "field_type": getattr(f.field_type, "value", f.field_type) if f is not None else None,
-                        "placeholder": getattr(f, "placeholder", None),
-                        "description": getattr(f, "description", None),
-                        "required": getattr(f, "required", False),
-                        "width": getattr(f.width, "value", f.width) if f is not None else None,
-                        "order_index": getattr(f, "order_index", None),
-                        "created_at": getattr(f, "created_at", None),
-                    })
-
-                doc_dict = {
-                    "id": getattr(doc, "id", None),
-                    "name": getattr(doc, "name", None),
-                    "fields": fields_list,
-                    "required": True,
-                    "uploaded": doc.id in uploaded_doc_ids,
-                    "created_at": getattr(doc, "created_at", None),
-                    "updated_at": getattr(doc, "updated_at", None),
-                }
-                required_documents.append(doc_dict)
-            logger.debug(f"Processed {len(required_documents)} required documents for session {session.id}")
-
-            optional_documents = []
-            for doc in template.optional_documents:
-                fields_list = []
-                for f in getattr(doc, "fields", []) or []:
-                    fields_list.append({
-                        "id": getattr(f, "id", None),
-                        "label": getattr(f, "label", None),
-                        "field_type": getattr(f.field_type, "value", f.field_type) if f is not None else None,
-                        "placeholder": getattr(f, "placeholder", None),
-                        "description": getattr(f, "description", None),
-                        "required": getattr(f, "required", False),
-                        "width": getattr(f.width, "value", f.width) if f is not None else None,
-                        "order_index": getattr(f, "order_index", None),
-                        "created_at": getattr(f, "created_at", None),
-                    })
-
-                doc_dict = {
-                    "id": getattr(doc, "id", None),
-                    "name": getattr(doc, "name", None),
-                    "fields": fields_list,
-                    "required": False,
-                    "uploaded": doc.id in uploaded_doc_ids,
-                    "created_at": getattr(doc, "created_at", None),
-                    "updated_at": getattr(doc, "updated_at", None),
-                }
-                optional_documents.append(doc_dict)
-            logger.debug(f"Processed {len(optional_documents)} optional documents for session {session.id}")
+            # Overlay the session's state on copies of the cached dicts
+            todos = [
+                {**todo, "is_completed": completed_by_todo.get(todo["id"], False)}
+                for todo in view["todos"]
+            ]
+            required_documents = [
+                {**doc, "required": True, "uploaded": doc["id"] in uploaded_doc_ids}
+                for doc in view["required_documents"]
+            ]
+            optional_documents = [
+                {**doc, "required": False, "uploaded": doc["id"] in uploaded_doc_ids}
+                for doc in view["optional_documents"]
+            ]
+            logger.debug(f"Processed {len(todos)} todos and {len(required_documents) + len(optional_documents)} documents for session {session.id}")
         else:
             logger.warning(f"No template found for session {session.id} (template_id={session.template_id}, company_id={session.company_id})")
         
-        logger.debug(f"Employee data prepared for session {session.id}")
-
         logger.info(f"Returning onboarding data for session {session.id}")
         # Return a simplified view matching OnboardingDataRead
         return onboarding_schema.OnboardingDataRead(
@@ -277,6 +542,111 @@ async def get_onboarding_data_for_user(db: AsyncSession, user_email: str) -> onb
         logger.error(f"Error in get_onboarding_data_for_user for user {user_email}: {str(e)}", exc_info=True)
         raise
 
+def _utc_iso(column: str) -> str:
+    """
+    SQL for a timestamptz as the Python path writes it (jsonable_encoder's
+    isoformat() of a UTC datetime), whatever the session's TimeZone.
+    """
+    return (
+        f"regexp_replace(to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD\"T\"HH24:MI:SS.US'), '\\.000000$', '')"
+        " || '+00:00'"
+    )
+
+# Documents of one kind (required or optional) attached to the session's
+# template, with their fields and the session's uploaded flag
+_DOCUMENTS_JSON = f"""
+    COALESCE((
+        SELECT json_agg(json_build_object(
+            'id', d.id,
+            'name', d.name,
+            'fields', COALESCE((
+                SELECT json_agg(json_build_object(
+                    'id', f.id,
+                    'label', f.label,
+                    -- Enums are stored by name (TEXT, FULL, ...), the API returns the lowercase values
+                    'field_type', lower(f.field_type::text),
+                    'placeholder', f.placeholder,
+                    'description', f.description,
+                    'required', f.required,
+                    'width', lower(f.width::text),
+                    'order_index', f.order_index,
+                    'created_at', {_utc_iso("f.created_at")}
+                ) ORDER BY f.id)
+                FROM document_fields f
+                WHERE f.template_id = d.id
+            ), '[]'),
+            'required', {{required}},
+            'uploaded', EXISTS (
+                SELECT 1 FROM document_submissions ds
+                WHERE ds.session_id = s.id AND ds.template_id = d.id
+            ),
+            'created_at', {_utc_iso("d.created_at")},
+            'updated_at', {_utc_iso("d.updated_at")}
+        ) ORDER BY d.id)
+        FROM {{association}} a
+        JOIN document_templates d ON d.id = a.document_template_id
+        WHERE a.onboarding_template_id = ot.id
+    ), '[]')
+"""
+
+# The whole GET /onboarding/my-data response envelope, built by Postgres in one
+# statement, with the same JSON values as create_response(..., exclude_none=True)
+# on the ORM path. json_strip_nulls drops the None fields of the session and its
+# todos; documents are added after it, because their `fields` are plain dicts
+# whose nulls that path keeps. Key order and whitespace may differ.
+ONBOARDING_DATA_JSON_SQL = text(f"""
+SELECT json_build_object(
+    'success', true,
+    'message', CAST(:message AS text),
+    'data', json_strip_nulls(json_build_object(
+        'new_employee_email', s.new_employee_email,
+        'firstName', s."firstName",
+        'lastName', s."lastName",
+        'empId', s."empId",
+        'phone', s.phone,
+        'gender', s.gender,
+        'dateOfBirth', s."dateOfBirth",
+        'maritalStatus', s."maritalStatus",
+        'nationality', s.nationality,
+        'profilePic', s.profile_picture_url,
+        'status', s.status,
+        'current_step', s.current_step,
+        'todos', COALESCE((
+            SELECT json_agg(json_build_object(
+                'title', t.title,
+                'description', t.description,
+                'order_index', t.order_index,
+                'id', t.id,
+                'template_id', t.template_id,
+                'created_at', {_utc_iso("t.created_at")},
+                'is_completed', COALESCE(k.is_completed, false)
+            ) ORDER BY t.id)
+            FROM todo_items t
+            LEFT JOIN onboarding_tasks k ON k.todo_item_id = t.id AND k.session_id = s.id
+            WHERE t.template_id = ot.id
+        ), '[]')
+    ))::jsonb || jsonb_build_object(
+        'required_documents', {_DOCUMENTS_JSON.format(required="true", association="onboarding_template_required_documents")},
+        'optional_documents', {_DOCUMENTS_JSON.format(required="false", association="onboarding_template_optional_documents")}
+    )
+)::text
+FROM onboarding_sessions s
+LEFT JOIN onboarding_templates ot ON ot.id = s.template_id AND ot.company_id = s.company_id
+WHERE s.new_employee_email = :email
+LIMIT 1
+""")
+
+async def get_onboarding_data_json(db: AsyncSession, user_email: str, message: str) -> bytes:
+    """
+    Alternative to get_onboarding_data_for_user that returns the complete,
+    already-serialized response body in a single round trip.
+    """
+    result = await db.execute(ONBOARDING_DATA_JSON_SQL, {"email": user_email, "message": message})
+    payload = result.scalar_one_or_none()
+    if payload is None:
+        raise APIException(status_code=status.HTTP_404_NOT_FOUND, message="No active onboarding session found", errors=["No onboarding session"])
+    return payload.encode()
+
 async def update_todo_for_user(db: AsyncSession, user_email: str, todo_id: int, completed: bool):
     session = await get_onboarding_session_for_user(db, user_email)
     
@@ -291,14 +661,15 @@ async def update_todo_for_user(db: AsyncSession, user_email: str, todo_id: int,
         raise APIException(status_code=status.HTTP_404_NOT_FOUND, message="Todo item not found for this session")
 
     task_to_update.is_completed = completed
-    await db.commit()
+    await db.flush()
+    mark_tenant_write(db, session.company_id)
     return {"message": "Todo updated successfully"}
 
 async def submit_onboarding(db: AsyncSession, user_email: str):
     session = await get_onboarding_session_for_user(db, user_email)
     session.status = "submitted"
     
-    await db.commit()
+    await db.flush()
 
 async def update_onboarding_review_for_user(
     db: AsyncSession,
@@ -334,15 +705,15 @@ async def update_onboarding_review_for_user(
     # Handle profile picture upload if provided
     if profile_file is not None:
         try:
-            file_url = await s3_service.upload_file(profile_file, folder=f"onboarding/{session.id}/profile")
+            file_url = await storage.upload_file(profile_file, folder=f"onboarding/{session.id}/profile")
             session.profile_picture_url = file_url
+            run_after_rollback(db, storage.delete_file, file_url)
         except Exception as e:
             logger.error(f"Failed to upload profile picture for session {session.id}: {e}")
             raise APIException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, message="Failed to upload profile picture", errors=[str(e)])
 
     # If email was updated, also update the session email field
-    await db.commit()
-    await db.refresh(session)
+    await db.flush()
 
     # Return updated onboarding data view
     return await get_onboarding_data_for_user(db, user_email=session.new_employee_email)
@@ -350,78 +721,257 @@ async def update_onboarding_review_for_user(
 async def increment_step_for_user(db: AsyncSession, user_email: str):
     session = await get_onboarding_session_for_user(db, user_email)
     session.current_step += 1
-    await db.commit()
+    await db.flush()
     
-async def submit_onboarding_document(
+async def get_document_upload_limits(db: AsyncSession, *, document_template_id: int, company_id: int) -> UploadLimits:
+    """Upload limits for submissions of a document template; 404 if the template does not exist."""
+    result = await db.execute(
+        select(DocumentTemplate.max_file_size_bytes, DocumentTemplate.allowed_content_types).where(
+            DocumentTemplate.id == document_template_id,
+            DocumentTemplate.company_id == company_id
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise APIException(status_code=404, message="Document template not found")
+    return UploadLimits(
+        max_file_size=row.max_file_size_bytes or settings.DOCUMENT_UPLOAD_MAX_BYTES,
+        allowed_content_types=row.allowed_content_types,
+        max_total_size=settings.DOCUMENT_UPLOAD_MAX_TOTAL_BYTES,
+    )
+
+async def _submitter_employee_id(db: AsyncSession, user_id: int, claimed: str | None = None) -> str:
+    """
+    The employee id recorded on a user's submissions: their empId, or the user
+    id for accounts without one. It never comes from the request; a client that
+    still sends employee_id must send this value.
+    """
+    result = await db.execute(select(User.empId).where(User.id == user_id))
+    employee_id = result.scalar_one_or_none() or str(user_id)
+    if claimed is not None and claimed != employee_id:
+        raise APIException(status_code=403, message="Documents can only be submitted for your own account.", errors=["employee_id does not match the signed-in user."])
+    return employee_id
+
+async def _record_submission(
     db: AsyncSession,
     *,
     document_template_id: int,
-    employee_id: str,
     company_id: int,
-    fields_data: str,
-    files: Optional[List[UploadFile]]
+    employee_id: str,
+    field_values: dict,
+    file_paths: dict,
+    blob_digests: List[bytes],
+    user_email: str | None
 ) -> DocumentSubmission:
-    """
-    Handles the submission of a complete onboarding document, including
-    all field types and file uploads.
-    """
-    # 1. Validate the template
-    template = await document_template_crud.get_document_template_by_id(
-        db, template_id=document_template_id, company_id=company_id
-    )
-    if not template:
-        raise APIException(status_code=404, message="Document template not found")
+    # The submission's files are shared blobs; keep them alive while it exists
+    await blob_store.add_references(db, company_id, blob_digests)
 
-    # 2. Upload files to S3
-    file_paths = {}
-    if files:
-        for file in files:
-            if file.filename:
-                folder = f"onboarding_documents/{company_id}/{employee_id}"
-                file_url = await s3_service.upload_file(file, folder=folder)
-                # Use the field name from the frontend as the key
-                file_paths[file.filename] = file_url
-
-    # 3. Parse the JSON fields data
-    try:
-        field_values = json.loads(fields_data)
-    except json.JSONDecodeError:
-        raise APIException(status_code=400, message="Invalid JSON format for fields")
+    # Find the onboarding session the submission belongs to
+    session_id = None
+    if user_email is not None:
+        result = await db.execute(
+            select(OnboardingSession.id).where(
+                OnboardingSession.new_employee_email == user_email,
+                OnboardingSession.company_id == company_id
+            )
+        )
+        session_id = result.scalars().first()
 
-    # 4. Create the DocumentSubmission record
     submission = DocumentSubmission(
         template_id=document_template_id,
+        session_id=session_id,
         employee_id=employee_id,
         company_id=company_id,
         field_values=field_values,
+        # Use the file name from the frontend as the key
         file_paths=file_paths,
         status="submitted"
     )
     db.add(submission)
-    await db.commit()
-    await db.refresh(submission)
+    await db.flush()
+    return submission
+
+async def submit_onboarding_document(
+    db: AsyncSession,
+    *,
+    document_template_id: int,
+    company_id: int,
+    form: StreamedForm,
+    user_id: int,
+    user_email: str | None = None
+) -> DocumentSubmission:
+    """
+    Record a document submission whose files were already streamed to storage
+    (see get_document_upload_limits and core/multipart_upload.py). The form must
+    carry the JSON `fields`; the employee id is the submitter's (see
+    _submitter_employee_id). The submission is linked to the submitter's
+    onboarding session (found by `user_email`) when there is one.
+    If the submission cannot be written, or the request fails to commit it, the
+    stored files are deleted again.
+    """
+    try:
+        if "fields" not in form.fields:
+            raise APIException(status_code=422, message="fields is required", errors=["Missing form fields."])
+        employee_id = await _submitter_employee_id(db, user_id, form.fields.get("employee_id") or None)
+        try:
+            field_values = json.loads(form.fields["fields"])
+        except json.JSONDecodeError:
+            raise APIException(status_code=400, message="Invalid JSON format for fields")
+
+        submission = await _record_submission(
+            db,
+            document_template_id=document_template_id,
+            company_id=company_id,
+            employee_id=employee_id,
+            field_values=field_values,
+            file_paths=form.file_paths,
+            blob_digests=form.blob_digests,
+            user_email=user_email
+        )
+    except Exception:
+        await form.discard()
+        raise
+    # The request commits after this returns; if that fails, nothing points at the files
+    run_after_rollback(db, form.discard)
     return submission
 
+def _checksum_digest(file) -> bytes:
+    try:
+        digest = base64.b64decode(file.checksum_sha256, validate=True)
+    except binascii.Error:
+        digest = b""
+    if len(digest) != 32:
+        raise APIException(status_code=400, message=f"File '{file.filename}' has an invalid checksum_sha256.", errors=["Expected a base64 SHA-256 digest."])
+    return digest
 
-async def list_onboarding_sessions(
+async def create_document_upload_urls(
     db: AsyncSession,
+    *,
+    document_template_id: int,
+    company_id: int,
+    user_id: int,
+    upload_request: document_schema.PresignedUploadRequest
+) -> List[document_schema.PresignedUpload]:
+    """
+    First step of a direct-to-storage submission: check the files against the
+    template's limits and issue one presigned PUT URL per file. Keys are derived
+    from the checksum (see core/blob_store.py) and the URLs only accept the
+    declared content type, size and checksum. Files the company already stores
+    come back as `already_stored` without a URL.
+    """
+    if len(upload_request.files) > settings.PRESIGNED_UPLOAD_MAX_FILES:
+        raise APIException(status_code=400, message=f"At most {settings.PRESIGNED_UPLOAD_MAX_FILES} files can be uploaded at once.")
+    await _submitter_employee_id(db, user_id, upload_request.employee_id)
+    limits = await get_document_upload_limits(db, document_template_id=document_template_id, company_id=company_id)
+    digests = []
+    for file in upload_request.files:
+        limits.check_content_type(file.filename, file.content_type)
+        limits.check_size(file.filename, file.size)
+        digests.append(_checksum_digest(file))
+    existing = await asyncio.gather(*(blob_store.find(company_id, digest) for digest in digests))
+
+    uploads = []
+    for file, digest, blob in zip(upload_request.files, digests, existing):
+        key = blob_store.key_for(company_id, digest)
+        if blob is not None and blob.size == file.size:
+            uploads.append(document_schema.PresignedUpload(filename=file.filename, key=key, already_stored=True))
+            continue
+        uploads.append(document_schema.PresignedUpload(
+            filename=file.filename,
+            key=key,
+            url=storage.presign_put(
+                key, file.content_type, file.size, file.checksum_sha256,
+                expires_in=settings.PRESIGNED_UPLOAD_EXPIRES_SECONDS
+            ),
+            headers={"Content-Type": file.content_type, "x-amz-checksum-sha256": file.checksum_sha256},
+            expires_in=settings.PRESIGNED_UPLOAD_EXPIRES_SECONDS,
+        ))
+    return uploads
+
+async def _verify_uploaded_blob(company_id: int, file, digest: bytes, limits: UploadLimits) -> str | None:
+    """Check one finalized file and register its blob. Returns an error, or None if the file is fine."""
+    blob = await blob_store.find(company_id, digest)
+    if blob is not None:
+        stored_size, stored_type = blob.size, blob.content_type
+    else:
+        stored_object = await storage.head(file.key)
+        if stored_object is None:
+            return f"{file.filename}: not uploaded"
+        if stored_object.checksum_sha256 != file.checksum_sha256:
+            await delete_stored_files([storage.url_for(file.key)])
+            return f"{file.filename}: checksum mismatch"
+        # The content matches its key, so track it even if a check below fails;
+        # the blob garbage collector removes it if nothing ends up referencing it
+        stored_size, stored_type = stored_object.size, stored_object.content_type
+        await blob_store.register(company_id, digest, file.key, stored_size, stored_type)
+
+    if stored_size != file.size or stored_size > limits.max_file_size:
+        return f"{file.filename}: size mismatch"
+    if stored_type is not None and limits.allowed_content_types is not None \
+            and stored_type not in limits.allowed_content_types:
+        return f"{file.filename}: unsupported type"
+    return None
+
+async def finalize_onboarding_document(
+    db: AsyncSession,
+    *,
+    document_template_id: int,
+    company_id: int,
+    finalize_request: document_schema.DocumentUploadFinalizeRequest,
+    user_id: int,
+    user_email: str | None = None
+) -> DocumentSubmission:
+    """
+    Second step of a direct-to-storage submission: verify that every file is
+    stored under the key its checksum maps to, with the declared size, then
+    record the submission. Objects whose content does not match their checksum
+    are deleted, so the client has to upload them again.
+    """
+    employee_id = await _submitter_employee_id(db, user_id, finalize_request.employee_id)
+    limits = await get_document_upload_limits(db, document_template_id=document_template_id, company_id=company_id)
+    digests = []
+    for file in finalize_request.files:
+        digest = _checksum_digest(file)
+        if file.key != blob_store.key_for(company_id, digest):
+            raise APIException(status_code=400, message=f"File '{file.filename}' was not uploaded for this company.", errors=["Invalid upload key."])
+        digests.append(digest)
+
+    results = await asyncio.gather(*(
+        _verify_uploaded_blob(company_id, file, digest, limits)
+        for file, digest in zip(finalize_request.files, digests)
+    ))
+    errors = [error for error in results if error is not None]
+    if errors:
+        raise APIException(status_code=400, message="Uploaded files could not be verified.", errors=errors)
+
+    return await _record_submission(
+        db,
+        document_template_id=document_template_id,
+        company_id=company_id,
+        employee_id=employee_id,
+        field_values=finalize_request.fields,
+        file_paths={file.filename: storage.url_for(file.key) for file in finalize_request.files},
+        blob_digests=digests,
+        user_email=user_email
+    )
+
+
+def build_onboarding_session_search(
     company_id: int | None = None,
     status: str | None = None,
     first_name: str | None = None,
     last_name: str | None = None,
     email: str | None = None,
-    limit: int = 100,
-    offset: int = 0,
-) -> list[onboarding_schema.OnboardingSessionRead]:
-    """Return onboarding sessions optionally filtered by company and status.
+):
+    """Build the filtered SELECT used by list_onboarding_sessions.
 
-    - company_id: if provided, restrict results to that company
-    - status: if provided, filter by onboarding session status (pending, in_progress, submitted, expired, etc.)
-    - limit/offset: simple pagination
-    Returns a list of Pydantic-validated OnboardingSessionRead objects.
+    Matches the indexes on onboarding_sessions: (company_id, status, created_at),
+    the partial (company_id, created_at) index for non-onboarded sessions and the
+    pg_trgm GIN indexes behind the ILIKE name/email filters. The 'onboarded'
+    literal is inlined so the planner can match the partial index predicate.
     """
     stmt = select(OnboardingSession)
-    stmt = stmt.where(OnboardingSession.status != "onboarded")
+    stmt = stmt.where(OnboardingSession.status != literal_column("'onboarded'"))
     if company_id is not None:
         stmt = stmt.where(OnboardingSession.company_id == company_id)
     if status is not None:
@@ -432,10 +982,40 @@ async def list_onboarding_sessions(
         stmt = stmt.where(OnboardingSession.lastName.ilike(f"%{last_name}%"))
     if email is not None:
         stmt = stmt.where(OnboardingSession.new_employee_email.ilike(f"%{email}%"))
-    stmt = stmt.limit(limit).offset(offset)
+    return stmt
 
-    result = await db.execute(stmt)
-    sessions = result.scalars().all()
+async def list_onboarding_sessions(
+    db: AsyncSession,
+    company_id: int | None = None,
+    status: str | None = None,
+    first_name: str | None = None,
+    last_name: str | None = None,
+    email: str | None = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+) -> KeysetPage:
+    """Return onboarding sessions optionally filtered by company and status.
+
+    - company_id: if provided, restrict results to that company
+    - status: if provided, filter by onboarding session status (pending, in_progress, submitted, expired, etc.)
+    - first_name/last_name/email: case-insensitive substring search
+    - limit/cursor: keyset pagination, newest first
+    - include_total: also return the number of matching sessions
+    Returns a KeysetPage of Pydantic-validated OnboardingSessionRead objects.
+    """
+    stmt = build_onboarding_session_search(
+        company_id=company_id,
+        status=status,
+        first_name=first_name,
+        last_name=last_name,
+        email=email,
+    )
+    page = await fetch_keyset_page(
+        db, stmt, OnboardingSession,
+        cursor=cursor, limit=limit, include_total=include_total
+    )
+    sessions = page.items
 
     # Convert ORM objects to Pydantic models for a stable shape
     sessions_out: list[onboarding_schema.OnboardingSessionRead] = []
@@ -457,10 +1037,8 @@ async def list_onboarding_sessions(
                 current_step=getattr(s, "current_step", 0),
             ))
 
-    return sessions_out
-    await db.commit()
-    await db.refresh(submission)
-    return submission
+    page.items = sessions_out
+    return page
 
 
 async def onboard_employee(db: AsyncSession, *, session_id: int, company_id: int):
@@ -488,13 +1066,16 @@ async def onboard_employee(db: AsyncSession, *, session_id: int, company_id: int
     # Find existing user by email
     user = await user_crud.get_user_by_email(db, email=session.new_employee_email)
     if user:
-        user.is_active = True
+        if not user.is_active:
+            user.is_active = True
+            user_crud.bump_token_generation(user)
     else:
         # Create the user from the onboarding session with a temporary password
-        temp_hashed = get_hash_password("temporary-password")
+        temp_hashed = await get_hash_password_async("temporary-password")
         user = await user_crud.create_user_from_onboarding(db, session=session, hashed_password=temp_hashed)
 
-    await db.commit()
-    await db.refresh(session)
+    await db.flush()
+    run_after_commit(db, principal_cache.invalidate, user.email)
+    run_after_commit(db, token_generations.record, user.id, user.token_generation)
 
     return session, user
\ No newline at end of file
@@ -1,7 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from sqlalchemy import insert, delete
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import insert, delete, func
 from fastapi import status
 from typing import List, Optional
 
@@ -21,6 +22,55 @@ from klaraflow.schemas.onboarding_schema import (
 from sqlalchemy.orm import selectinload
 from klaraflow.models.onboarding.onboarding_template_model import OnboardingTemplate
 from klaraflow.base.exceptions import APIException
+from klaraflow.base.pagination import KeysetPage, fetch_keyset_page
+from klaraflow.config.database import run_after_commit, mark_tenant_write
+from klaraflow.core.cache import onboarding_view_cache
+from klaraflow.crud.company_crud import bump_settings_version
+from klaraflow.crud.onboarding_crud import backfill_onboarding_tasks
+
+async def _get_company_document_templates(
+    db: AsyncSession,
+    required_ids: Optional[List[int]],
+    optional_ids: Optional[List[int]],
+    company_id: int
+) -> tuple[List[DocumentTemplate], List[DocumentTemplate]]:
+    """
+    Load the requested required and optional document templates (with fields)
+    in one query, keeping only those that belong to the company.
+    """
+    wanted_ids = set(required_ids or ()) | set(optional_ids or ())
+    if not wanted_ids:
+        return [], []
+    
+    result = await db.execute(
+        select(DocumentTemplate)
+        .options(selectinload(DocumentTemplate.fields))
+        .where(
+            DocumentTemplate.id.in_(wanted_ids),
+            DocumentTemplate.company_id == company_id
+        )
+    )
+    docs_by_id = {doc.id: doc for doc in result.scalars().all()}
+    required_docs = [docs_by_id[doc_id] for doc_id in dict.fromkeys(required_ids or ()) if doc_id in docs_by_id]
+    optional_docs = [docs_by_id[doc_id] for doc_id in dict.fromkeys(optional_ids or ()) if doc_id in docs_by_id]
+    return required_docs, optional_docs
+
+async def _insert_document_associations(
+    db: AsyncSession,
+    association_table,
+    template_id: int,
+    docs: List[DocumentTemplate]
+) -> None:
+    """Write all associations of one kind with a single multi-row INSERT"""
+    
+    if not docs:
+        return
+    await db.execute(
+        insert(association_table).values([
+            {"onboarding_template_id": template_id, "document_template_id": doc.id}
+            for doc in docs
+        ])
+    )
 
 async def create_onboarding_template(
     db: AsyncSession,
@@ -30,99 +80,64 @@ async def create_onboarding_template(
 ) -> OnboardingTemplate:
     """Create a new onboarding template with todos and document associations"""
     
-    # Create the template
+    # Create the template together with its todos
     db_template = OnboardingTemplate(
         name=template_data.name,
-        company_id=company_id
+        company_id=company_id,
+        todos=[
+            TodoItem(
+                title=todo_data.title,
+                description=todo_data.description,
+                order_index=todo_data.order_index or idx
+            )
+            for idx, todo_data in enumerate(template_data.todos)
+        ]
     )
     db.add(db_template)
     await db.flush()  # Get the ID without committing
     
-    # Create todos
-    for idx, todo_data in enumerate(template_data.todos):
-        db_todo = TodoItem(
-            template_id=db_template.id,
-            title=todo_data.title,
-            description=todo_data.description,
-            order_index=todo_data.order_index or idx
-        )
-        db.add(db_todo)
-    
-    # Associate required documents
-    if template_data.required_document_ids:
-        # Verify document templates belong to the same company
-        required_docs = await db.execute(
-            select(DocumentTemplate.id).where(
-                DocumentTemplate.id.in_(template_data.required_document_ids),
-                DocumentTemplate.company_id == company_id
-            )
-        )
-        valid_required_ids = required_docs.scalars().all()
-        
-        # Insert associations
-        for doc_id in valid_required_ids:
-            await db.execute(
-                insert(onboarding_template_required_documents).values(
-                    onboarding_template_id=db_template.id,
-                    document_template_id=doc_id
-                )
-            )
-    
-    # Associate optional documents
-    if template_data.optional_document_ids:
-        # Verify document templates belong to the same company
-        optional_docs = await db.execute(
-            select(DocumentTemplate.id).where(
-                DocumentTemplate.id.in_(template_data.optional_document_ids),
-                DocumentTemplate.company_id == company_id
-            )
-        )
-        valid_optional_ids = optional_docs.scalars().all()
-        
-        # Insert associations
-        for doc_id in valid_optional_ids:
-            await db.execute(
-                insert(onboarding_template_optional_documents).values(
-                    onboarding_template_id=db_template.id,
-                    document_template_id=doc_id
-                )
-            )
-    
-    await db.commit()
-    await db.refresh(db_template)
+    # Verify document templates belong to the same company
+    required_docs, optional_docs = await _get_company_document_templates(
+        db, template_data.required_document_ids, template_data.optional_document_ids, company_id
+    )
     
-    # Load the template with all relationships
-    result = await db.execute(
-        select(OnboardingTemplate)
-        .options(
-            selectinload(OnboardingTemplate.todos),
-            selectinload(OnboardingTemplate.required_documents).selectinload(DocumentTemplate.fields),
-            selectinload(OnboardingTemplate.optional_documents).selectinload(DocumentTemplate.fields)
-        )
-        .where(OnboardingTemplate.id == db_template.id)
+    # Associate documents, one INSERT per kind regardless of how many there are
+    await _insert_document_associations(
+        db, onboarding_template_required_documents, db_template.id, required_docs
     )
-    return result.scalar_one()
+    await _insert_document_associations(
+        db, onboarding_template_optional_documents, db_template.id, optional_docs
+    )
+    
+    # The association rows were written with Core, so fill in the collections
+    # from the documents already loaded instead of re-selecting the template
+    set_committed_value(db_template, "required_documents", required_docs)
+    set_committed_value(db_template, "optional_documents", optional_docs)
+    await bump_settings_version(db, company_id)
+    return db_template
 
 async def get_onboarding_templates(
     db: AsyncSession,
     company_id: int,
-    skip: int = 0,
-    limit: int = 100
-) -> List[OnboardingTemplate]:
-    """Get all onboarding templates for a company"""
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> KeysetPage:
+    """Get a keyset page of onboarding templates for a company, newest first"""
     
-    result = await db.execute(
-        select(OnboardingTemplate)
-        .options(
+    return await fetch_keyset_page(
+        db,
+        select(OnboardingTemplate).where(OnboardingTemplate.company_id == company_id),
+        OnboardingTemplate,
+        cursor=cursor,
+        limit=limit,
+        include_total=include_total,
+        options=(
             selectinload(OnboardingTemplate.todos),
             selectinload(OnboardingTemplate.required_documents).selectinload(DocumentTemplate.fields),
             selectinload(OnboardingTemplate.optional_documents).selectinload(DocumentTemplate.fields)
         )
-        .where(OnboardingTemplate.company_id == company_id)
-        .offset(skip)
-        .limit(limit)
     )
-    return result.scalars().all()
 
 async def get_onboarding_template_by_id(
     db: AsyncSession,
@@ -170,9 +185,9 @@ async def update_onboarding_template(
     
     # Update todos if provided
     if template_data.todos is not None:
-        # Upsert todos: update existing ones, create new ones, and only delete
-        # template todos that are not present in the incoming list AND not
-        # referenced by any onboarding session tasks.
+        # Upsert todos: update existing ones, create new ones, and delete
+        # template todos that are not present in the incoming list unless an
+        # employee already completed a task for them.
         existing_todos = {t.id: t for t in db_template.todos if t.id is not None}
         incoming_ids = set()
 
@@ -188,110 +203,79 @@ async def update_onboarding_template(
                     todo.order_index = todo_data.order_index or idx
                 else:
                     # client supplied an id that doesn't belong to this template -> treat as new
-                    db_todo = TodoItem(
-                        template_id=db_template.id,
+                    db_template.todos.append(TodoItem(
                         title=todo_data.title,
                         description=todo_data.description,
                         order_index=todo_data.order_index or idx
-                    )
-                    db.add(db_todo)
+                    ))
             else:
                 # new todo
-                db_todo = TodoItem(
-                    template_id=db_template.id,
+                db_template.todos.append(TodoItem(
                     title=todo_data.title,
                     description=todo_data.description,
                     order_index=todo_data.order_index or idx
-                )
-                db.add(db_todo)
+                ))
 
         # Determine which existing todos were removed by the client
         to_remove_ids = [eid for eid in existing_todos.keys() if eid not in incoming_ids]
-        for eid in to_remove_ids:
-            # Prevent deletion if any onboarding session task references this todo
+        if to_remove_ids:
+            # Every invited session has a task per todo; drop the uncompleted ones
+            # before the todos themselves go
+            await db.execute(
+                delete(OnboardingTask).where(
+                    OnboardingTask.todo_item_id.in_(to_remove_ids),
+                    OnboardingTask.is_completed.is_(False)
+                )
+            )
+            mark_tenant_write(db, company_id)
+            # Completed tasks are onboarding history; keep the todo they point at.
+            # Checked after the delete, so a task completed meanwhile is caught too.
             ref = await db.execute(
-                select(OnboardingTask.id).where(OnboardingTask.todo_item_id == eid).limit(1)
+                select(OnboardingTask.id).where(OnboardingTask.todo_item_id.in_(to_remove_ids)).limit(1)
             )
             if ref.scalar_one_or_none():
-                # Abort with a clear API error so frontend can decide (or user can soft-delete)
+                # Abort with a clear API error so frontend can decide (or user can soft-delete);
+                # the failed request rolls the task deletion back
                 raise APIException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    message="Cannot remove todo that is referenced by onboarding sessions",
+                    message="Cannot remove a todo that employees have already completed",
                 )
-            # safe to delete
-            await db.delete(existing_todos[eid])
+            # safe to delete (delete-orphan removes them in one batch on flush)
+            for eid in to_remove_ids:
+                db_template.todos.remove(existing_todos[eid])
     
     # Update document associations if provided
-    if template_data.required_document_ids is not None:
-        # Clear existing required document associations
-        await db.execute(
-            delete(onboarding_template_required_documents).where(
-                onboarding_template_required_documents.c.onboarding_template_id == db_template.id
-            )
-        )
-        
-        # Add new required document associations
-        if template_data.required_document_ids:
-            # Verify document templates belong to the same company
-            required_docs = await db.execute(
-                select(DocumentTemplate.id).where(
-                    DocumentTemplate.id.in_(template_data.required_document_ids),
-                    DocumentTemplate.company_id == company_id
-                )
-            )
-            valid_required_ids = required_docs.scalars().all()
-            
-            # Insert new associations
-            for doc_id in valid_required_ids:
-                await db.execute(
-                    insert(onboarding_template_required_documents).values(
-                        onboarding_template_id=db_template.id,
-                        document_template_id=doc_id
-                    )
-                )
-    
-    if template_data.optional_document_ids is not None:
-        # Clear existing optional document associations
-        await db.execute(
-            delete(onboarding_template_optional_documents).where(
-                onboarding_template_optional_documents.c.onboarding_template_id == db_template.id
-            )
+    if template_data.required_document_ids is not None or template_data.optional_document_ids is not None:
+        # Verify document templates belong to the same company
+        required_docs, optional_docs = await _get_company_document_templates(
+            db, template_data.required_document_ids, template_data.optional_document_ids, company_id
         )
         
-        # Add new optional document associations
-        if template_data.optional_document_ids:
-            # Verify document templates belong to the same company
-            optional_docs = await db.execute(
-                select(DocumentTemplate.id).where(
-                    DocumentTemplate.id.in_(template_data.optional_document_ids),
-                    DocumentTemplate.company_id == company_id
+        for ids, docs, association_table, collection in (
+            (template_data.required_document_ids, required_docs, onboarding_template_required_documents, "required_documents"),
+            (template_data.optional_document_ids, optional_docs, onboarding_template_optional_documents, "optional_documents"),
+        ):
+            if ids is None:
+                continue
+            # Replace the existing associations of this kind
+            await db.execute(
+                delete(association_table).where(
+                    association_table.c.onboarding_template_id == db_template.id
                 )
             )
-            valid_optional_ids = optional_docs.scalars().all()
-            
-            # Insert new associations
-            for doc_id in valid_optional_ids:
-                await db.execute(
-                    insert(onboarding_template_optional_documents).values(
-                        onboarding_template_id=db_template.id,
-                        document_template_id=doc_id
-                    )
-                )
+            await _insert_document_associations(db, association_table, db_template.id, docs)
+            set_committed_value(db_template, collection, docs)
     
-    await db.commit()
-    await db.refresh(db_template)
-    
-    # Reload with all relationships
-    result = await db.execute(
-        select(OnboardingTemplate)
-        .options(
-            selectinload(OnboardingTemplate.todos),
-            selectinload(OnboardingTemplate.required_documents).selectinload(DocumentTemplate.fields),
-            selectinload(OnboardingTemplate.optional_documents).selectinload(DocumentTemplate.fields)
-        )
-        .where(OnboardingTemplate.id == template_id)
-    )
-    return result.scalar_one()
+    # Child and association edits don't touch the template row; bumping
+    # updated_at gives cached onboarding views a new version
+    db_template.updated_at = func.now()
+    await db.flush()
+    if template_data.todos is not None:
+        # Give open sessions a task for every todo added above
+        await backfill_onboarding_tasks(db, db_template.id, company_id)
+    await bump_settings_version(db, company_id)
+    run_after_commit(db, onboarding_view_cache.invalidate, db_template.id)
+    return db_template
 
 async def delete_onboarding_template(
     db: AsyncSession,
@@ -308,5 +292,7 @@ async def delete_onboarding_template(
         )
     
     await db.delete(db_template)
-    await db.commit()
+    await db.flush()
+    await bump_settings_version(db, company_id)
+    run_after_commit(db, onboarding_view_cache.invalidate, db_template.id)
     return True
\ No newline at end of file
@@ -1,9 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql import func
+from sqlalchemy.orm import selectinload
 from klaraflow.models.user_model import User
 from klaraflow.models.onboarding.session_model import OnboardingSession
 from klaraflow.schemas.user_schema import UserCreate
-from klaraflow.core.security import get_hash_password, verify_password
+from klaraflow.core.security import get_hash_password_async
+from klaraflow.models.company_model import Company
 from klaraflow.models.department_model import Department
 from klaraflow.models.designation_model import Designation
 from klaraflow.base.exceptions import APIException
@@ -14,6 +17,26 @@ async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
     result = await db.execute(select(User).where(User.email == email))
     return result.scalar_one_or_none()
   
+async def create_user(db: AsyncSession, *, user: UserCreate) -> User:
+    """
+    Sign up a new company with `user` as its first admin, like scripts/seeder.py.
+    The password is hashed on the hashing pool, off the event loop.
+    """
+    hashed_password = await get_hash_password_async(user.password)
+    db_company = Company(name=user.company_name or user.email.split("@", 1)[1])
+    db.add(db_company)
+    await db.flush()
+    db_user = User(
+        email=user.email,
+        hashed_password=hashed_password,
+        company_id=db_company.id,
+        role="admin",
+        is_active=True,
+    )
+    db.add(db_user)
+    await db.flush()
+    return db_user
+
 async def create_user_from_onboarding(db: AsyncSession, *, session: OnboardingSession, hashed_password: str) -> User:
     # Validate referenced Department and Designation IDs if provided
     designation_id = getattr(session, "designation_id", None)
@@ -57,10 +80,27 @@ async def create_user_from_onboarding(db: AsyncSession, *, session: OnboardingSe
         nationality=session.nationality
     )
     db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
+    await db.flush()
     return db_user
 
+def bump_token_generation(user: User) -> None:
+    """
+    Revoke every access token issued to the user so far. Call whenever
+    `is_active`, `role` or `company_id` change, then record the new generation
+    in `token_generations` once the change is committed (see run_after_commit).
+    """
+    user.token_generation = (user.token_generation or 0) + 1
+    user.token_generation_bumped_at = func.now()
+
+async def get_user(db: AsyncSession, user_id: int) -> User | None:
+    """Retrieve a user by id, with the department and designation UserPublic shows."""
+    result = await db.execute(
+        select(User)
+        .options(selectinload(User.department), selectinload(User.designation))
+        .where(User.id == user_id)
+    )
+    return result.scalar_one_or_none()
+
 async def get_my_user_data(db: AsyncSession, user_id: int) -> User:
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -3,43 +3,96 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import inspect
 from jose import jwt, JWTError
 
 from klaraflow.config.database import get_db
 from klaraflow.config.settings import settings
+from klaraflow.core.cache import principal_cache
+from klaraflow.core.security import ACCESS_TOKEN_CLAIMS_VERSION
+from klaraflow.core.token_generations import token_generations
 from klaraflow.crud import user_crud
 from klaraflow.models.user_model import User
-from klaraflow.schemas.user_schema import Token
+from klaraflow.schemas.user_schema import Token, Principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), 
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """
-    Decodes the JWT token and returns the user if they exist.
-    """
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _detached_copy(user: User) -> User:
+    """
+    Copies the column values of a loaded user into a new, session-less instance
+    so it can be shared between requests through the principal cache.
+    """
+    return User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+
+def _decode_token(token: str) -> dict:
+    """
+    Decodes and verifies the JWT, rejecting tokens whose generation was revoked.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.JWT_ALG]
         )
-        email: str | None = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    if payload.get("cv") == ACCESS_TOKEN_CLAIMS_VERSION:
+        if not token_generations.is_current(payload["uid"], payload["gen"]):
+            raise _credentials_exception()
+    return payload
+
+async def _load_user(db: AsyncSession, email: str) -> User:
+    user = principal_cache.get(email)
+    if user is not None:
+        return user
+
     user = await user_crud.get_user_by_email(db, email=email)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    user = _detached_copy(user)
+    principal_cache.set(email, user)
     return user
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Decodes the JWT token and returns the user if they exist.
+    Users are served from the principal cache when possible; writes that change
+    `is_active`, `role` or `company_id` must invalidate the cached entry.
+    """
+    payload = _decode_token(token)
+    return await _load_user(db, email=payload["sub"])
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Returns the caller's tenant and role straight from the token claims.
+    Only tokens issued before claims were embedded need the user row.
+    """
+    payload = _decode_token(token)
+    if payload.get("cv") == ACCESS_TOKEN_CLAIMS_VERSION:
+        return Principal(
+            id=payload["uid"],
+            email=payload["sub"],
+            company_id=payload["cid"],
+            role=payload["role"],
+            is_active=payload["act"],
+        )
+
+    user = await _load_user(db, email=payload["sub"])
+    return Principal.model_validate(user)
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -51,15 +104,18 @@ async def get_current_active_user(
     return current_user
 
 async def get_current_active_admin(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    current_principal: Principal = Depends(get_current_principal),
+) -> Principal:
     """
-    Checks if the active user is an admin.
+    Checks if the active principal is an admin.
     This is the dependency we will use to protect our invite endpoint.
+    Authorizes from token claims alone, so admin routes do not touch the users table.
     """
-    if current_user.role not in ["admin", "hr"]: # Allowing HR as well
+    if not current_principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    if current_principal.role not in ["admin", "hr"]: # Allowing HR as well
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user doesn't have enough privileges"
         )
-    return current_user
\ No newline at end of file
+    return current_principal
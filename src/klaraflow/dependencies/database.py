@@ -0,0 +1,29 @@
+from fastapi import Depends, Request
+
+from klaraflow.config.database import db_manager, count_round_trips
+from klaraflow.dependencies.auth import get_current_active_admin, get_current_active_user
+from klaraflow.models.user_model import User
+from klaraflow.schemas.user_schema import Principal
+
+async def get_read_db(
+    request: Request,
+    current_admin: Principal = Depends(get_current_active_admin),
+):
+    """
+    Read-only session for admin listing endpoints. Served from a read replica
+    unless the admin's company wrote within the read-your-writes window.
+    """
+    async with count_round_trips(request), db_manager.get_read_session(company_id=current_admin.company_id) as session:
+        yield session
+
+
+async def get_user_read_db(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Read-only session for endpoints serving a signed-in employee, routed like
+    get_read_db using the employee's company.
+    """
+    async with count_round_trips(request), db_manager.get_read_session(company_id=current_user.company_id) as session:
+        yield session
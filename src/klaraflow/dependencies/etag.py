@@ -0,0 +1,43 @@
+from typing import Dict
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from klaraflow.base.exceptions import NotModifiedException
+from klaraflow.crud import company_crud
+from klaraflow.dependencies.auth import get_current_active_admin
+from klaraflow.dependencies.database import get_read_db
+from klaraflow.schemas.user_schema import Principal
+
+# Clients must revalidate on every use, but may keep the copy between page loads
+SETTINGS_CACHE_CONTROL = "private, no-cache"
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+async def settings_etag(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_active_admin),
+) -> Dict[str, str]:
+    """
+    Conditional GET for company settings (templates, departments, designations).
+
+    The ETag is the company's settings_version, which every settings write bumps,
+    so checking it costs one primary-key lookup. If the client's If-None-Match
+    still matches, a 304 is returned before the route loads anything. Otherwise
+    the route passes the returned headers to create_response.
+
+    The version is read before the resources in the same session, so a response
+    is never tagged with a version newer than its data.
+    """
+    version = await company_crud.get_settings_version(db, current_admin.company_id)
+    etag = f'"settings-{current_admin.company_id}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": SETTINGS_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        raise NotModifiedException(headers)
+    return headers
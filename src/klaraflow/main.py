@@ -1,21 +1,70 @@
+import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from klaraflow.config.database import db_manager, get_db
-from klaraflow.api.v1 import auth_router, onboarding_router
+from klaraflow.config.settings import settings
+from klaraflow.core.hashing_pool import hashing_pool
+from klaraflow.core.storage import storage
+from klaraflow.core.blob_store import blob_store
+from klaraflow.core.background import PeriodicTask
+from klaraflow.core.token_generations import token_generations
+from klaraflow.services.onboarding_expiry_service import onboarding_expiry_sweeper
+from klaraflow.services.email_outbox_service import email_outbox_worker
+from klaraflow.api.v1 import auth_router, onboarding_router, ops_router, local_storage_router
 from klaraflow.api.v1.settings import document_router, onboarding_template_router
 from klaraflow.api.v1.company_settings import department_router, designation_router
 from klaraflow.api.v1.employees import employee_router
-from klaraflow.base.exceptions import api_exception_handler, validation_exception_handler, APIException
+from klaraflow.base.exceptions import api_exception_handler, validation_exception_handler, not_modified_handler, APIException, NotModifiedException
+
+token_generation_refresher = PeriodicTask(
+    "token-generation-refresh",
+    settings.TOKEN_GENERATION_REFRESH_SECONDS,
+    token_generations.refresh,
+)
+
+replica_health_checker = PeriodicTask(
+    "replica-health-check",
+    settings.REPLICA_HEALTH_CHECK_SECONDS,
+    db_manager.check_replicas,
+)
+
+onboarding_expiry_task = PeriodicTask(
+    "onboarding-expiry-sweep",
+    settings.ONBOARDING_EXPIRY_SWEEP_SECONDS,
+    onboarding_expiry_sweeper.sweep,
+)
+
+blob_gc_task = PeriodicTask(
+    "blob-gc",
+    settings.BLOB_GC_SECONDS,
+    blob_store.collect_garbage,
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # On startup
     await db_manager.connect()
+    hashing_pool.start()
+    storage.start()
+    await token_generations.refresh()
+    token_generation_refresher.start()
+    replica_health_checker.start()
+    onboarding_expiry_task.start()
+    blob_gc_task.start()
+    email_outbox_worker.start()
     yield
     # On shutdown
+    await email_outbox_worker.stop()
+    await blob_gc_task.stop()
+    await onboarding_expiry_task.stop()
+    await replica_health_checker.stop()
+    await token_generation_refresher.stop()
+    storage.shutdown()
+    hashing_pool.shutdown()
     await db_manager.disconnect()
 
 app = FastAPI(
@@ -34,10 +83,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 app.add_exception_handler(APIException, api_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
+app.add_exception_handler(NotModifiedException, not_modified_handler)
 
 # Welcome route
 @app.get("/")
@@ -71,5 +122,14 @@ app.include_router(designation_router.router, prefix="/api/v1/settings/designati
 # --- NEW: Employee Management Routes ---
 app.include_router(employee_router.router, prefix="/api/v1/employees", tags=["Employees"])
 
+# --- Local file storage (STORAGE_BACKEND=local) ---
+if settings.STORAGE_BACKEND == "local":
+    os.makedirs(settings.LOCAL_STORAGE_DIR, exist_ok=True)
+    app.include_router(local_storage_router.router, prefix=settings.LOCAL_STORAGE_URL_PREFIX, tags=["Local Storage"])
+    app.mount(settings.LOCAL_STORAGE_URL_PREFIX, StaticFiles(directory=settings.LOCAL_STORAGE_DIR), name="uploads")
+
+# --- Operator Routes ---
+app.include_router(ops_router.router, prefix="/api/v1/ops", tags=["Operations"])
+
 # poetry run uvicorn src.main:app --reload --port 3000
 # poetry run poe dev
\ No newline at end of file
@@ -12,5 +12,7 @@ from .onboarding.todo_item_model import TodoItem
 from .onboarding.onboarding_template_model import OnboardingTemplate
 from .settings.document_template_model import DocumentTemplate, DocumentField
 from .documents.document_submission_model import DocumentSubmission
+from .documents.stored_blob_model import StoredBlob
 from .department_model import Department
-from .designation_model import Designation
\ No newline at end of file
+from .designation_model import Designation
+from .email_outbox_model import EmailOutbox
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -9,6 +9,8 @@ class Company(Base):
   id = Column(Integer, primary_key=True, index=True)
   name = Column(String, nullable=False, index=True)
   created_at = Column(DateTime(timezone=True), server_default=func.now())
+  # Bumped by every write to templates, departments or designations; settings GETs use it as their ETag
+  settings_version = Column(BigInteger, nullable=False, default=0, server_default='0')
   
   users = relationship("User", back_populates='company')
   document_templates = relationship("DocumentTemplate", back_populates="company")
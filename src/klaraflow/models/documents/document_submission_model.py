@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy import DateTime
@@ -6,6 +6,11 @@ from ..base import Base
 
 class DocumentSubmission(Base):
     __tablename__ = "document_submissions"
+    __table_args__ = (
+        # "Which of this session's documents are uploaded?" as an index-only scan
+        Index("ix_document_submissions_session_template", "session_id", "template_id"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     template_id = Column(Integer, ForeignKey("document_templates.id"), nullable=False)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, BigInteger, String, LargeBinary, ForeignKey, DateTime, Index, text
+from sqlalchemy.sql import func
+from ..base import Base
+
+class StoredBlob(Base):
+    """
+    One stored file, addressed by the SHA-256 of its content. Identical uploads
+    within a company share a blob; `ref_count` counts the DocumentSubmission
+    file_paths entries pointing at it. Unreferenced blobs are deleted by the
+    garbage collector in core/blob_store.py.
+    """
+    __tablename__ = "stored_blobs"
+    __table_args__ = (
+        # The garbage collector only ever scans unreferenced blobs
+        Index("ix_stored_blobs_unreferenced", "last_used_at", postgresql_where=text("ref_count = 0")),
+    )
+
+    # Scoped per company so one tenant cannot probe for another tenant's files
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    sha256 = Column(LargeBinary(32), primary_key=True)
+    key = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String, nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Bumped on every upload or reference, so the GC leaves blobs alone while a
+    # submission that is about to reference them is still in flight
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, Index, text
+from sqlalchemy.sql import func
+from .base import Base
+
+class EmailOutbox(Base):
+    """
+    Outgoing email, written in the same transaction as the change that causes it
+    and sent by the outbox worker (services/email_outbox_service.py).
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # The worker only ever looks for pending messages that are due
+        Index("ix_email_outbox_due", "next_attempt_at", postgresql_where=text("status = 'pending'")),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    # Cleared once the message is sent or given up on; it may carry an invitation token
+    html_body = Column(Text, nullable=True)
+
+    status = Column(String, nullable=False, default="pending", server_default="pending")  # pending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
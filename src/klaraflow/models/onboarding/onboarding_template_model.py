@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, Table
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Index
 from ..base import Base
 
 # Association tables for many-to-many relationships
@@ -21,6 +21,12 @@ onboarding_template_optional_documents = Table(
 
 class OnboardingTemplate(Base):
     __tablename__ = "onboarding_templates"
+    __table_args__ = (
+        # Keyset pagination of a tenant's templates, newest first
+        Index("ix_onboarding_templates_company_created_id", "company_id", "created_at", "id"),
+    )
+    # created_at/updated_at come back from the INSERT/UPDATE itself
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
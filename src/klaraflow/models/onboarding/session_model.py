@@ -1,9 +1,36 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, LargeBinary, text
 from sqlalchemy.orm import relationship
 from ..base import Base
 
 class OnboardingSession(Base):
     __tablename__ = "onboarding_sessions"
+    __table_args__ = (
+        # Tenant-scoped listing, optionally filtered by status, newest first
+        Index("ix_onboarding_sessions_company_status_created", "company_id", "status", "created_at"),
+        # Default listing only shows sessions that are not onboarded yet
+        Index(
+            "ix_onboarding_sessions_company_open_created", "company_id", "created_at",
+            postgresql_where=text("status <> 'onboarded'"),
+        ),
+        # Expiry sweeper only ever looks at pending invitations past their deadline
+        Index(
+            "ix_onboarding_sessions_pending_expires", "expires_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        # Leading-wildcard ILIKE search (requires the pg_trgm extension)
+        Index(
+            "ix_onboarding_sessions_first_name_trgm", "firstName",
+            postgresql_using="gin", postgresql_ops={"firstName": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_onboarding_sessions_last_name_trgm", "lastName",
+            postgresql_using="gin", postgresql_ops={"lastName": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_onboarding_sessions_email_trgm", "new_employee_email",
+            postgresql_using="gin", postgresql_ops={"new_employee_email": "gin_trgm_ops"},
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     profile_picture_url = Column(String, nullable=True) 
@@ -14,7 +41,8 @@ class OnboardingSession(Base):
     status = Column(String, default="pending")
     current_step = Column(Integer, default=1)
     
-    invitation_token = Column(String, nullable=False, unique=True, index=True)
+    # SHA-256 of the invitation token, see core.security.hash_invitation_token
+    invitation_token_hash = Column(LargeBinary(32), nullable=False, unique=True, index=True)
     created_at = Column(DateTime(timezone=True), nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     
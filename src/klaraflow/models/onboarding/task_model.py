@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from ..base import Base
 
 class OnboardingTask(Base):
     __tablename__ = 'onboarding_tasks'
+    __table_args__ = (
+        # One task per todo and session; lets template edits backfill with ON CONFLICT DO NOTHING
+        UniqueConstraint('session_id', 'todo_item_id', name='uq_onboarding_tasks_session_todo'),
+    )
 
     id = Column(Integer, primary_key=True)
     session_id = Column(Integer, ForeignKey("onboarding_sessions.id"), nullable=False)
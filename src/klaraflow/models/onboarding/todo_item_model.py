@@ -6,6 +6,7 @@ from ..base import Base
 
 class TodoItem(Base):
     __tablename__ = "todo_items"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     template_id = Column(Integer, ForeignKey("onboarding_templates.id"), nullable=False)
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, Text, ForeignKey, Enum, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Index
 from ..base import Base
 import enum
 
@@ -17,10 +17,21 @@ class FieldWidthEnum(str, enum.Enum):
 
 class DocumentTemplate(Base):
     __tablename__ = "document_templates"
+    __table_args__ = (
+        # Keyset pagination of a tenant's templates, newest first
+        Index("ix_document_templates_company_created_id", "company_id", "created_at", "id"),
+    )
+    # Fetch server-generated timestamps with RETURNING so new rows need no reload
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     name = Column(String, nullable=False)
+
+    # Upload limits for submissions of this document; NULL falls back to the
+    # DOCUMENT_UPLOAD_MAX_BYTES setting and to accepting any content type
+    max_file_size_bytes = Column(BigInteger, nullable=True)
+    allowed_content_types = Column(JSON, nullable=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -40,6 +51,7 @@ class DocumentTemplate(Base):
 
 class DocumentField(Base):
     __tablename__ = "document_fields"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     template_id = Column(Integer, ForeignKey("document_templates.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -6,6 +6,15 @@ from .company_model import Company
 
 class User(Base):
     __tablename__ = "users"
+    # Server defaults (created_at, token_generation) are returned by the INSERT
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Token generation refreshes only read recent bumps
+        Index(
+            "ix_users_token_generation_bumped_at", "token_generation_bumped_at",
+            postgresql_where=text("token_generation_bumped_at IS NOT NULL"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -25,6 +34,9 @@ class User(Base):
     # --- Status & Roles ---
     is_active = Column(Boolean, default=False) # Should be False until onboarding is complete
     role = Column(String, nullable=False, default="employee") # e.g., 'employee', 'admin', 'hr'
+    # Bumped whenever is_active/role/company_id change; tokens carrying an older value are revoked
+    token_generation = Column(Integer, nullable=False, default=0, server_default="0")
+    token_generation_bumped_at = Column(DateTime(timezone=True), nullable=True)
     
     # --- Timestamps ---
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -27,6 +27,10 @@ class DocumentFieldBase(BaseModel):
 class DocumentFieldCreate(DocumentFieldBase):
     pass
 
+class DocumentFieldUpsert(DocumentFieldBase):
+    # Set to update an existing field in place; omit to add a new field
+    id: Optional[int] = None
+
 class DocumentFieldUpdate(BaseModel):
     label: Optional[str] = None
     field_type: Optional[FieldTypeEnum] = Field(None, alias="type")
@@ -48,13 +52,20 @@ class DocumentFieldRead(DocumentFieldBase):
 # Document Template Schemas
 class DocumentTemplateBase(BaseModel):
     name: str
+    # Upload limits for submissions; None uses the server default size and allows any type
+    max_file_size_bytes: Optional[int] = Field(None, gt=0)
+    allowed_content_types: Optional[List[str]] = None
 
 class DocumentTemplateCreate(DocumentTemplateBase):
     fields: List[DocumentFieldCreate] = []
 
 class DocumentTemplateUpdate(BaseModel):
     name: Optional[str] = None
-    fields: Optional[List[DocumentFieldCreate]] = None
+    # Send null explicitly to go back to the defaults
+    max_file_size_bytes: Optional[int] = Field(None, gt=0)
+    allowed_content_types: Optional[List[str]] = None
+    # Full list of fields: listed ids are updated, new entries added, missing ones removed
+    fields: Optional[List[DocumentFieldUpsert]] = None
 
 class DocumentTemplateRead(DocumentTemplateBase):
     id: int
@@ -75,6 +86,42 @@ class DocumentUploadRequest(BaseModel):
     employee_id: str
     fields: List[DocumentUploadFieldRequest] = []
 
+# Direct-to-storage uploads: request presigned URLs, PUT the files, then finalize.
+# The submission's employee id is the signed-in user's; employee_id is optional
+# and, when sent, must match it.
+EMPLOYEE_ID_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9._-]*$"
+
+class PresignedUploadFile(BaseModel):
+    filename: str
+    content_type: str
+    size: int = Field(gt=0)
+    checksum_sha256: str  # base64 SHA-256 of the file, sent as x-amz-checksum-sha256
+
+class PresignedUploadRequest(BaseModel):
+    employee_id: Optional[str] = Field(default=None, pattern=EMPLOYEE_ID_PATTERN)
+    files: List[PresignedUploadFile] = Field(min_length=1)
+
+class PresignedUpload(BaseModel):
+    filename: str
+    key: str
+    # The company already stores a file with this content: skip the PUT, go straight to finalize
+    already_stored: bool = False
+    url: Optional[str] = None
+    method: str = "PUT"
+    headers: Dict[str, str] = {}  # must be sent with the PUT exactly as given
+    expires_in: Optional[int] = None
+
+class DocumentUploadFinalizeFile(BaseModel):
+    filename: str
+    key: str
+    size: int = Field(gt=0)
+    checksum_sha256: str
+
+class DocumentUploadFinalizeRequest(BaseModel):
+    employee_id: Optional[str] = Field(default=None, pattern=EMPLOYEE_ID_PATTERN)
+    fields: Dict[str, Any] = {}
+    files: List[DocumentUploadFinalizeFile] = []
+
 class DocumentUploadResponse(BaseModel):
     id: int
     template_id: int
@@ -28,6 +28,18 @@ class OnboardingInviteRequest(BaseModel):
     nationality: str | None = None
     onboardingTemplateId: int | None = None
 
+class BulkInviteRowResult(BaseModel):
+    row: int  # 1-based: CSV data row (header not counted) or NDJSON line
+    email: Optional[str] = None
+    status: str  # invited, invalid, duplicate
+    session_id: Optional[int] = None
+    errors: List[str] = []
+
+class BulkInviteReport(BaseModel):
+    invited: int
+    rejected: int
+    results: List[BulkInviteRowResult]
+
 class OnboardingSessionRead(BaseModel):
     id: int
     company_id: int
@@ -107,6 +119,10 @@ class TodoItemBase(BaseModel):
 class TodoItemCreate(TodoItemBase):
     pass
 
+class TodoItemUpsert(TodoItemBase):
+    # Set to update an existing todo in place (keeping its tasks); omit to add a new todo
+    id: Optional[int] = None
+
 class TodoItemUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -135,7 +151,7 @@ class OnboardingTemplateCreate(OnboardingTemplateBase):
 
 class OnboardingTemplateUpdate(BaseModel):
     name: Optional[str] = None
-    todos: Optional[List[TodoItemCreate]] = None
+    todos: Optional[List[TodoItemUpsert]] = None
     required_document_ids: Optional[List[int]] = None
     optional_document_ids: Optional[List[int]] = None
 
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from .company_schema import CompanyPublic
 from datetime import datetime
 
@@ -6,6 +6,8 @@ from datetime import datetime
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
+    # Name of the company the account is created for; defaults to the email domain
+    company_name: str | None = None
   
 # Data shape for user login
 class UserLogin(BaseModel):
@@ -26,10 +28,28 @@ class UserPublic(BaseModel):
     department: str | None = None
     designation: str | None = None
 
+    @field_validator("department", "designation", mode="before")
+    @classmethod
+    def _name_of(cls, value):
+        # ORM users carry Department/Designation objects; show their names
+        return getattr(value, "name", value)
+
     class Config:
         from_attributes = True
 
 # Properties for the login response token
 class Token(BaseModel):
     access_token: str
-    token_type: str
\ No newline at end of file
+    token_type: str
+
+# Authorization claims carried by access tokens (or loaded from the users table
+# for tokens issued before claims were embedded)
+class Principal(BaseModel):
+    id: int
+    email: str
+    company_id: int
+    role: str
+    is_active: bool
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional
+import aiosmtplib
+from sqlalchemy import bindparam, text
+from klaraflow.config.database import db_manager
+from klaraflow.config.settings import settings
+from klaraflow.core.smtp_pool import build_message, smtp_pool
+
+logger = logging.getLogger("klaraflow.email_outbox")
+
+# Claiming a batch pushes next_attempt_at out by the lease instead of holding row
+# locks while mail is sent. Another worker picks the rows up again only if this
+# one dies before recording the outcome, so a message is sent at least once.
+CLAIM_BATCH_SQL = text("""
+WITH batch AS (
+    SELECT id FROM email_outbox
+    WHERE status = 'pending' AND next_attempt_at <= now()
+    ORDER BY next_attempt_at
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE email_outbox o
+SET attempts = o.attempts + 1,
+    next_attempt_at = now() + make_interval(secs => :lease_seconds)
+FROM batch
+WHERE o.id = batch.id
+RETURNING o.id, o.recipient, o.subject, o.html_body, o.attempts
+""")
+
+MARK_SENT_SQL = text("""
+UPDATE email_outbox
+SET status = 'sent', sent_at = now(), html_body = NULL, last_error = NULL
+WHERE id IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
+MARK_RETRY_SQL = text("""
+UPDATE email_outbox
+SET next_attempt_at = now() + make_interval(secs => :delay_seconds), last_error = :error
+WHERE id = :id
+""")
+
+MARK_FAILED_SQL = text("""
+UPDATE email_outbox
+SET status = 'failed', html_body = NULL, last_error = :error
+WHERE id = :id
+""")
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx replies (unknown mailbox, rejected message) will not succeed on a retry."""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(refused.code >= 500 for refused in error.recipients)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code >= 500
+
+
+class EmailOutboxWorker:
+    """
+    Delivers the email_outbox table over the pooled SMTP connections in
+    core/smtp_pool.py.
+
+    Started and stopped from the application lifespan in main.py. It drains the
+    outbox whenever a transaction that queued mail commits (`wake`) and every
+    EMAIL_OUTBOX_POLL_SECONDS otherwise, so mail queued by other workers or left
+    over from a failure is picked up too. Batches are claimed with SKIP LOCKED,
+    so any number of workers can drain at once. Temporary failures are retried
+    with exponential backoff up to EMAIL_OUTBOX_MAX_ATTEMPTS; 5xx replies fail
+    the message right away.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.batches = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.last_drained_at: float | None = None
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="email-outbox")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        await smtp_pool.close()
+
+    def wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Email outbox drain failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.EMAIL_OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _claim_batch(self) -> List[Any]:
+        async with db_manager.engine.begin() as conn:
+            result = await conn.execute(
+                CLAIM_BATCH_SQL,
+                {"batch_size": settings.EMAIL_OUTBOX_BATCH_SIZE, "lease_seconds": settings.EMAIL_OUTBOX_LEASE_SECONDS},
+            )
+            return result.all()
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(
+            settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+            settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS,
+        )
+        # Jitter, so messages that failed together are not retried in lockstep
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _send_batch(self, rows: List[Any]) -> None:
+        results = await asyncio.gather(
+            *(smtp_pool.send(build_message(row.recipient, row.subject, row.html_body)) for row in rows),
+            return_exceptions=True,
+        )
+        sent_ids = []
+        retries = []
+        failures = []
+        for row, result in zip(rows, results):
+            if not isinstance(result, Exception):
+                sent_ids.append(row.id)
+                continue
+            error = f"{type(result).__name__}: {result}"[:1000]
+            if _is_permanent(result) or row.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                logger.error(f"Giving up on email {row.id} to {row.recipient} after {row.attempts} attempts: {error}")
+                failures.append({"id": row.id, "error": error})
+            else:
+                logger.warning(f"Email {row.id} to {row.recipient} failed (attempt {row.attempts}), retrying: {error}")
+                retries.append({"id": row.id, "error": error, "delay_seconds": self._retry_delay(row.attempts)})
+
+        async with db_manager.engine.begin() as conn:
+            if sent_ids:
+                await conn.execute(MARK_SENT_SQL, {"ids": sent_ids})
+            if retries:
+                await conn.execute(MARK_RETRY_SQL, retries)
+            if failures:
+                await conn.execute(MARK_FAILED_SQL, failures)
+        self.sent += len(sent_ids)
+        self.retried += len(retries)
+        self.failed += len(failures)
+
+    async def drain(self) -> None:
+        while True:
+            rows = await self._claim_batch()
+            if not rows:
+                break
+            started = time.perf_counter()
+            await self._send_batch(rows)
+            self.batches += 1
+            self.last_batch_size = len(rows)
+            self.last_batch_ms = (time.perf_counter() - started) * 1000
+            logger.info(f"Sent email batch of {len(rows)} in {self.last_batch_ms:.1f} ms")
+            if len(rows) < settings.EMAIL_OUTBOX_BATCH_SIZE:
+                break
+        self.last_drained_at = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "last_drained_at": self.last_drained_at,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_ms": round(self.last_batch_ms, 2),
+            "smtp": smtp_pool.stats(),
+        }
+
+
+email_outbox_worker = EmailOutboxWorker()
@@ -2,6 +2,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from klaraflow.crud import user_crud, department_crud, designation_crud
 from klaraflow.models import User
+from klaraflow.core.cache import principal_cache
+from klaraflow.config.database import run_after_commit
 
 async def assign_department(db: AsyncSession, employee_id: int, department_id: int, company_id: int) -> User:
     employee = await user_crud.get_user(db, user_id=employee_id)
@@ -12,9 +14,9 @@ async def assign_department(db: AsyncSession, employee_id: int, department_id: i
     if not department:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Department not found")
         
-    employee.department_id = department_id
-    await db.commit()
-    await db.refresh(employee)
+    employee.department = department
+    await db.flush()
+    run_after_commit(db, principal_cache.invalidate, employee.email)
     return employee
 
 async def remove_department(db: AsyncSession, employee_id: int, company_id: int) -> User:
@@ -22,9 +24,9 @@ async def remove_department(db: AsyncSession, employee_id: int, company_id: int)
     if not employee or employee.company_id != company_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
         
-    employee.department_id = None
-    await db.commit()
-    await db.refresh(employee)
+    employee.department = None
+    await db.flush()
+    run_after_commit(db, principal_cache.invalidate, employee.email)
     return employee
 
 async def assign_designation(db: AsyncSession, employee_id: int, designation_id: int, company_id: int) -> User:
@@ -36,9 +38,9 @@ async def assign_designation(db: AsyncSession, employee_id: int, designation_id:
     if not designation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Designation not found")
         
-    employee.designation_id = designation_id
-    await db.commit()
-    await db.refresh(employee)
+    employee.designation = designation
+    await db.flush()
+    run_after_commit(db, principal_cache.invalidate, employee.email)
     return employee
 
 async def remove_designation(db: AsyncSession, employee_id: int, company_id: int) -> User:
@@ -46,7 +48,7 @@ async def remove_designation(db: AsyncSession, employee_id: int, company_id: int
     if not employee or employee.company_id != company_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
         
-    employee.designation_id = None
-    await db.commit()
-    await db.refresh(employee)
+    employee.designation = None
+    await db.flush()
+    run_after_commit(db, principal_cache.invalidate, employee.email)
     return employee
\ No newline at end of file
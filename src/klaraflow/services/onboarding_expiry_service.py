@@ -0,0 +1,101 @@
+import logging
+import time
+from typing import Any, Dict
+from sqlalchemy import text
+from klaraflow.config.database import db_manager
+from klaraflow.config.settings import settings
+
+logger = logging.getLogger("klaraflow.onboarding_expiry")
+
+# Transaction-scoped, so the lock is released with every batch and can never leak
+# into a pooled connection if a worker dies mid-sweep.
+TRY_LOCK_SQL = text("SELECT pg_try_advisory_xact_lock(hashtext('klaraflow.onboarding_expiry'))")
+
+# Postgres has no UPDATE ... LIMIT, so the batch is picked in a CTE. SKIP LOCKED
+# leaves rows alone that a user request is currently activating.
+EXPIRE_BATCH_SQL = text("""
+WITH batch AS (
+    SELECT id FROM onboarding_sessions
+    WHERE status = 'pending' AND expires_at < now()
+    ORDER BY expires_at
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE onboarding_sessions s
+SET status = 'expired'
+FROM batch
+WHERE s.id = batch.id
+""")
+
+
+class OnboardingExpirySweeper:
+    """
+    Marks pending onboarding sessions whose invitation has expired as `expired`.
+
+    Runs as a periodic task from main.py. Each batch is its own short transaction
+    guarded by an advisory lock, so with several workers only one sweeps at a time
+    and the others skip the tick. A single sweep is capped at
+    ONBOARDING_EXPIRY_MAX_BATCHES batches; any backlog is picked up on the next tick.
+    """
+
+    def __init__(self):
+        self.sweeps = 0
+        self.skipped = 0
+        self.expired = 0
+        self.last_swept_at: float | None = None
+        self.last_expired = 0
+        self.last_duration_ms = 0.0
+
+    async def _expire_batch(self) -> int | None:
+        """Expire one batch. Returns None when another worker holds the lock."""
+        async with db_manager.engine.begin() as conn:
+            if not (await conn.execute(TRY_LOCK_SQL)).scalar():
+                return None
+            result = await conn.execute(
+                EXPIRE_BATCH_SQL, {"batch_size": settings.ONBOARDING_EXPIRY_BATCH_SIZE}
+            )
+            return result.rowcount
+
+    async def sweep(self) -> None:
+        started = time.perf_counter()
+        expired = 0
+
+        for _ in range(settings.ONBOARDING_EXPIRY_MAX_BATCHES):
+            count = await self._expire_batch()
+            if count is None:
+                if expired == 0:
+                    self.skipped += 1
+                    return
+                break
+            expired += count
+            if count < settings.ONBOARDING_EXPIRY_BATCH_SIZE:
+                break
+
+        duration = time.perf_counter() - started
+        self.sweeps += 1
+        self.expired += expired
+        self.last_swept_at = time.time()
+        self.last_expired = expired
+        self.last_duration_ms = duration * 1000
+        if expired:
+            logger.info(
+                f"Expired {expired} onboarding sessions in {self.last_duration_ms:.1f} ms "
+                f"({expired / duration:.0f} sessions/s)"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sweeps": self.sweeps,
+            "skipped_locked": self.skipped,
+            "sessions_expired": self.expired,
+            "last_swept_at": self.last_swept_at,
+            "last_expired": self.last_expired,
+            "last_duration_ms": round(self.last_duration_ms, 2),
+            "last_sessions_per_second": (
+                round(self.last_expired / (self.last_duration_ms / 1000), 1)
+                if self.last_duration_ms else 0.0
+            ),
+        }
+
+
+onboarding_expiry_sweeper = OnboardingExpirySweeper()
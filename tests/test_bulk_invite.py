@@ -0,0 +1,138 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from klaraflow.base.exceptions import APIException
+from klaraflow.config.settings import settings
+from klaraflow.crud.onboarding_crud import bulk_invite_employees, parse_bulk_invite_rows
+from klaraflow.models import (
+    Company, Department, Designation, EmailOutbox, OnboardingSession, OnboardingTask, OnboardingTemplate, TodoItem,
+)
+
+
+def ndjson(*lines) -> bytes:
+    return "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines).encode()
+
+
+def test_csv_with_bom_and_empty_cells():
+    body = "\ufeffempId, email ,phone,department\r\nE1,a@example.com,,7\r\nE2,b@example.com,555,\r\n".encode()
+
+    assert parse_bulk_invite_rows(body, "text/csv") == [
+        (1, {"empId": "E1", "email": "a@example.com", "department": "7"}),
+        (2, {"empId": "E2", "email": "b@example.com", "phone": "555"}),
+    ]
+
+
+def test_csv_row_with_more_columns_than_the_header():
+    body = b"empId,email\nE1,a@example.com\nE2,b@example.com,extra\n"
+
+    rows = parse_bulk_invite_rows(body, "text/csv")
+
+    assert rows[0] == (1, {"empId": "E1", "email": "a@example.com"})
+    assert rows[1] == (2, "Row has more columns than the header.")
+
+
+def test_ndjson_blank_invalid_and_non_object_lines():
+    body = ndjson({"email": "a@example.com"}, "", "   ", "{not json", "[1, 2]", '"text"', {"email": "b@example.com"})
+
+    rows = parse_bulk_invite_rows(body, "application/x-ndjson")
+
+    # Blank lines are skipped, but rows keep their line numbers
+    assert [number for number, _ in rows] == [1, 4, 5, 6, 7]
+    assert rows[0] == (1, {"email": "a@example.com"})
+    assert rows[1][1].startswith("Invalid JSON: ")
+    assert rows[2] == (5, "Expected a JSON object.")
+    assert rows[3] == (6, "Expected a JSON object.")
+    assert rows[4] == (7, {"email": "b@example.com"})
+
+
+def test_unsupported_content_type_and_encoding():
+    with pytest.raises(APIException) as error:
+        parse_bulk_invite_rows(b"{}", "application/json")
+    assert error.value.status_code == 415
+
+    with pytest.raises(APIException) as error:
+        parse_bulk_invite_rows("email\nzoë@example.com\n".encode("latin-1"), "text/csv")
+    assert error.value.status_code == 400
+
+
+def test_more_rows_than_allowed_is_rejected_with_413(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_INVITE_MAX_ROWS", 2)
+
+    assert len(parse_bulk_invite_rows(ndjson({}, {}), "application/x-ndjson")) == 2
+    with pytest.raises(APIException) as error:
+        parse_bulk_invite_rows(ndjson({}, {}, {}), "application/x-ndjson")
+    assert error.value.status_code == 413
+
+
+def invite(email: str, **fields) -> dict:
+    return {"empId": email.split("@")[0], "firstName": "New", "lastName": "Hire", "email": email,
+            "gender": "other", "userRole": "employee", **fields}
+
+
+def test_bulk_invite_report(pg_sessions):
+    async def scenario():
+        async with pg_sessions() as db:
+            company, other = Company(name="acme"), Company(name="other")
+            db.add_all([company, other])
+            await db.flush()
+            template = OnboardingTemplate(company_id=company.id, name="default")
+            designation = Designation(company_id=company.id, name="engineer")
+            department = Department(company_id=company.id, name="engineering")
+            foreign_department = Department(company_id=other.id, name="sales")
+            db.add_all([template, designation, department, foreign_department])
+            await db.flush()
+            db.add_all([TodoItem(template_id=template.id, title="Sign contract"), TodoItem(template_id=template.id, title="Set up laptop")])
+            db.add(OnboardingSession(
+                company_id=company.id,
+                new_employee_email="invited@example.com",
+                invitation_token_hash=b"\0" * 32,
+                created_at=datetime.now(timezone.utc),
+                expires_at=datetime.now(timezone.utc) + timedelta(hours=24),
+            ))
+            await db.flush()
+
+            refs = {"onboardingTemplateId": template.id, "designation": str(designation.id), "department": str(department.id)}
+            rows = [
+                (1, invite("first@example.com", **refs)),
+                (2, invite("first@example.com")),
+                (3, invite("invited@example.com")),
+                (4, invite("title@example.com", designation="Engineer", department="sales")),
+                (5, invite("foreign@example.com", department=str(foreign_department.id))),
+                (6, invite("template@example.com", onboardingTemplateId=template.id + 100)),
+                (7, "Row has more columns than the header."),
+                (8, {"firstName": "No email"}),
+                (9, invite("second@example.com", designation=str(designation.id))),
+            ]
+            report = await bulk_invite_employees(db, company_id=company.id, rows=rows)
+
+            invited_ids = [result.session_id for result in report.results if result.status == "invited"]
+            tasks = (await db.execute(
+                select(OnboardingTask.session_id, func.count()).group_by(OnboardingTask.session_id)
+            )).all()
+            queued = (await db.execute(select(EmailOutbox.recipient).order_by(EmailOutbox.recipient))).scalars().all()
+            return report, invited_ids, dict(tasks), queued
+
+    report, invited_ids, tasks, queued = asyncio.run(scenario())
+
+    assert (report.invited, report.rejected) == (2, 7)
+    by_row = {result.row: result for result in report.results}
+    assert [result.row for result in report.results] == list(range(1, 10))
+    assert [by_row[n].status for n in range(1, 10)] == [
+        "invited", "duplicate", "duplicate", "invalid", "invalid", "invalid", "invalid", "invalid", "invited",
+    ]
+    assert by_row[2].errors == ["Same email as row 1."]
+    assert by_row[3].errors == ["An active invitation for this email already exists."]
+    assert by_row[4].errors == ["designation: must be an integer id", "department: must be an integer id"]
+    assert by_row[5].errors == ["department: department not found"]
+    assert by_row[6].errors == ["onboardingTemplateId: onboarding template not found"]
+    assert by_row[7].errors == ["Row has more columns than the header."]
+    assert by_row[8].email is None
+    assert any(error.startswith("email: ") for error in by_row[8].errors)
+
+    # Only the row with a template gets tasks; every invited row gets an email
+    assert tasks == {invited_ids[0]: 2}
+    assert queued == ["first@example.com", "second@example.com"]
@@ -0,0 +1,46 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from klaraflow.config.database import InstrumentedAsyncQueuePool
+
+
+def make_pool(timeout: float = 0.05) -> InstrumentedAsyncQueuePool:
+    return InstrumentedAsyncQueuePool(
+        creator=mock.MagicMock, pool_size=1, max_overflow=0, timeout=timeout, dialect=mock.MagicMock()
+    )
+
+
+def run_in_greenlet(func, *args):
+    # The async pool waits through await_only, like it does under an AsyncSession
+    return asyncio.run(greenlet_spawn(func, *args))
+
+
+def test_timed_out_checkouts_are_not_counted_as_acquisitions():
+    pool = make_pool(timeout=0.2)
+
+    def checkouts():
+        held = pool.connect()
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        held.close()
+        pool.connect().close()
+
+    run_in_greenlet(checkouts)
+
+    stats = pool.snapshot()
+    assert stats["acquisitions"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["waiters"] == 0
+    # The 200 ms spent timing out is not part of the wait statistics
+    assert stats["max_acquire_wait_ms"] < 200
+    assert stats["avg_acquire_wait_ms"] < 200
+
+
+def test_snapshot_before_any_checkout():
+    stats = make_pool().snapshot()
+    assert stats["acquisitions"] == 0
+    assert stats["avg_acquire_wait_ms"] is None
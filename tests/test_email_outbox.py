@@ -0,0 +1,210 @@
+import asyncio
+import socket
+from datetime import datetime, timedelta, timezone
+
+import aiosmtplib
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import select
+
+from klaraflow.config.database import db_manager
+from klaraflow.config.settings import settings
+from klaraflow.core.smtp_pool import SmtpConnectionPool, build_message
+from klaraflow.models import EmailOutbox
+from klaraflow.services import email_outbox_service
+from klaraflow.services.email_outbox_service import EmailOutboxWorker
+
+
+class RecordingHandler:
+    """Accepts mail except for recipients given a reply in `replies`; remembers who sent what over which connection."""
+
+    def __init__(self):
+        self.replies = {}
+        self.received = []
+        self.drop_next_connection = False
+
+    async def handle_DATA(self, server, session, envelope):
+        recipient = envelope.rcpt_tos[0]
+        if recipient in self.replies:
+            return self.replies[recipient]
+        self.received.append((session.peer, recipient))
+        if self.drop_next_connection:
+            # Like a server closing an idle connection before the next message
+            self.drop_next_connection = False
+            asyncio.get_running_loop().call_soon(server.transport.close)
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    monkeypatch.setattr(settings, "MAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(settings, "MAIL_PORT", controller.port)
+    monkeypatch.setattr(settings, "MAIL_STARTTLS", False)
+    monkeypatch.setattr(settings, "MAIL_SSL_TLS", False)
+    monkeypatch.setattr(settings, "MAIL_USE_CREDENTIALS", False)
+    monkeypatch.setattr(settings, "SMTP_TIMEOUT_SECONDS", 5.0)
+    yield handler
+    controller.stop()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # One connection, so reuse is deterministic; a fresh pool per test, whose
+    # connections belong to that test's event loop
+    pool = SmtpConnectionPool(1)
+    monkeypatch.setattr(email_outbox_service, "smtp_pool", pool)
+    return pool
+
+
+def message(recipient: str):
+    return build_message(recipient, "Welcome", "<p>Hello</p>")
+
+
+def send_all(pool: SmtpConnectionPool, recipients: list) -> None:
+    async def scenario():
+        try:
+            for recipient in recipients:
+                await pool.send(message(recipient))
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_pool_sends_a_batch_over_one_reused_connection(smtp_server, pool):
+    recipients = [f"hire{i}@example.com" for i in range(5)]
+
+    send_all(pool, recipients)
+
+    assert [recipient for _, recipient in smtp_server.received] == recipients
+    assert len({peer for peer, _ in smtp_server.received}) == 1
+    assert pool.connects == 1
+    assert pool.reused == 4
+
+
+def test_pool_reopens_a_connection_the_server_dropped(smtp_server, pool):
+    smtp_server.drop_next_connection = True
+
+    send_all(pool, ["first@example.com", "second@example.com"])
+
+    assert [recipient for _, recipient in smtp_server.received] == ["first@example.com", "second@example.com"]
+    assert len({peer for peer, _ in smtp_server.received}) == 2
+    assert pool.connects == 2
+
+
+def test_pool_raises_server_rejections(smtp_server, pool):
+    smtp_server.replies["gone@example.com"] = "550 No such user"
+
+    with pytest.raises(aiosmtplib.SMTPDataError) as error:
+        send_all(pool, ["gone@example.com"])
+
+    assert error.value.code == 550
+    assert email_outbox_service._is_permanent(error.value)
+    assert not email_outbox_service._is_permanent(aiosmtplib.SMTPDataError(451, "Try again later"))
+
+
+@pytest.fixture
+def outbox(pg_engine, pg_sessions, monkeypatch):
+    """Adds pending messages to the Postgres outbox and reads them back after the worker ran."""
+    monkeypatch.setattr(db_manager, "engine", pg_engine)
+
+    class Outbox:
+        def add(self, *recipients: str) -> None:
+            async def insert():
+                async with pg_sessions() as db:
+                    db.add_all([EmailOutbox(recipient=r, subject="Welcome", html_body="<p>token</p>") for r in recipients])
+                    await db.commit()
+
+            asyncio.run(insert())
+
+        def rows(self) -> dict:
+            async def load():
+                async with pg_sessions() as db:
+                    return {row.recipient: row for row in (await db.execute(select(EmailOutbox))).scalars()}
+
+            return asyncio.run(load())
+
+    return Outbox()
+
+
+def drain(worker: EmailOutboxWorker) -> None:
+    async def scenario():
+        try:
+            await worker.drain()
+        finally:
+            await worker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_worker_delivers_a_batch_and_clears_the_bodies(smtp_server, pool, outbox):
+    recipients = [f"hire{i}@example.com" for i in range(4)]
+    outbox.add(*recipients)
+    worker = EmailOutboxWorker()
+
+    drain(worker)
+
+    assert sorted(recipient for _, recipient in smtp_server.received) == recipients
+    assert pool.connects == 1
+    assert worker.batches == 1
+    assert worker.sent == 4
+    for row in outbox.rows().values():
+        assert (row.status, row.attempts, row.html_body, row.last_error) == ("sent", 1, None, None)
+        assert row.sent_at is not None
+
+
+def test_worker_reschedules_temporary_failures_with_backoff(smtp_server, pool, outbox, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_RETRY_BASE_SECONDS", 60.0)
+    smtp_server.replies["busy@example.com"] = "451 Temporary failure, try again later"
+    outbox.add("busy@example.com", "ok@example.com")
+    worker = EmailOutboxWorker()
+
+    before = datetime.now(timezone.utc)
+    drain(worker)
+
+    rows = outbox.rows()
+    busy = rows["busy@example.com"]
+    assert (busy.status, busy.attempts) == ("pending", 1)
+    assert busy.html_body == "<p>token</p>"
+    assert "451" in busy.last_error
+    # First retry after the base delay, give or take the 20% jitter
+    assert before + timedelta(seconds=47) <= busy.next_attempt_at <= before + timedelta(seconds=74)
+    assert rows["ok@example.com"].status == "sent"
+    assert (worker.sent, worker.retried, worker.failed) == (1, 1, 0)
+
+    # Not due yet: a second drain leaves it alone
+    drain(worker)
+    assert outbox.rows()["busy@example.com"].attempts == 1
+
+
+def test_worker_fails_permanent_rejections_right_away(smtp_server, pool, outbox):
+    smtp_server.replies["gone@example.com"] = "550 No such user"
+    outbox.add("gone@example.com")
+    worker = EmailOutboxWorker()
+
+    drain(worker)
+
+    gone = outbox.rows()["gone@example.com"]
+    assert (gone.status, gone.attempts, gone.html_body) == ("failed", 1, None)
+    assert "550" in gone.last_error
+    assert (worker.sent, worker.retried, worker.failed) == (0, 0, 1)
+
+
+def test_worker_gives_up_after_the_last_attempt(smtp_server, pool, outbox, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 1)
+    smtp_server.replies["busy@example.com"] = "451 Temporary failure, try again later"
+    outbox.add("busy@example.com")
+
+    drain(EmailOutboxWorker())
+
+    busy = outbox.rows()["busy@example.com"]
+    assert (busy.status, busy.html_body) == ("failed", None)
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from klaraflow.base.exceptions import NotModifiedException, not_modified_handler
+from klaraflow.base.responses import create_response
+from klaraflow.crud import (
+    company_crud, department_crud, designation_crud, document_template_crud, onboarding_template_crud,
+)
+from klaraflow.dependencies.auth import get_current_active_admin
+from klaraflow.dependencies.database import get_read_db
+from klaraflow.dependencies.etag import SETTINGS_CACHE_CONTROL, _etag_matches, settings_etag
+from klaraflow.models import Company
+from klaraflow.schemas.department_schema import DepartmentCreate, DepartmentUpdate
+from klaraflow.schemas.designation_schema import DesignationCreate, DesignationUpdate
+from klaraflow.schemas.document_schema import DocumentTemplateCreate, DocumentTemplateUpdate
+from klaraflow.schemas.onboarding_schema import OnboardingTemplateCreate, OnboardingTemplateUpdate
+from klaraflow.schemas.user_schema import Principal
+
+ETAG = '"settings-1-7"'
+
+
+def admin(company_id: int = 1) -> Principal:
+    return Principal(id=1, email="admin@example.com", company_id=company_id, role="admin", is_active=True)
+
+
+@pytest.mark.parametrize("if_none_match", [
+    ETAG,
+    f"W/{ETAG}",
+    f'"settings-1-6", {ETAG}',
+    f'"settings-1-6",W/{ETAG} , "other"',
+    "*",
+    " * ",
+])
+def test_if_none_match_matches(if_none_match):
+    assert _etag_matches(if_none_match, ETAG)
+
+
+@pytest.mark.parametrize("if_none_match", [
+    '"settings-1-6"',
+    '"settings-2-7"',
+    "settings-1-7",
+    '"settings-1-6", "settings-1-8"',
+    '"*"',
+])
+def test_if_none_match_does_not_match(if_none_match):
+    assert not _etag_matches(if_none_match, ETAG)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def settings_version(db, company_id):
+        return 7
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(company_crud, "get_settings_version", settings_version)
+    app = FastAPI()
+    app.add_exception_handler(NotModifiedException, not_modified_handler)
+    app.dependency_overrides[get_read_db] = no_db
+    app.dependency_overrides[get_current_active_admin] = admin
+
+    @app.get("/departments")
+    async def read_departments(cache_headers=Depends(settings_etag)):
+        return create_response(data=[{"id": 1, "name": "Engineering"}], headers=cache_headers)
+
+    return TestClient(app)
+
+
+def test_unconditional_get_is_tagged(client):
+    response = client.get("/departments")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == ETAG
+    assert response.headers["Cache-Control"] == SETTINGS_CACHE_CONTROL
+    assert response.json()["data"] == [{"id": 1, "name": "Engineering"}]
+
+
+@pytest.mark.parametrize("if_none_match", [ETAG, f"W/{ETAG}", f'"settings-1-6", {ETAG}', "*"])
+def test_matching_get_is_an_empty_304_with_cache_headers(client, if_none_match):
+    response = client.get("/departments", headers={"If-None-Match": if_none_match})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == ETAG
+    assert response.headers["Cache-Control"] == SETTINGS_CACHE_CONTROL
+
+
+def test_stale_get_is_answered_in_full(client):
+    response = client.get("/departments", headers={"If-None-Match": '"settings-1-6"'})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == ETAG
+    assert response.json()["data"]
+
+
+def test_every_settings_write_changes_the_etag(pg_sessions):
+    async def etag(db, company_id: int) -> str:
+        return (await settings_etag(Request({"type": "http", "headers": []}), db, admin(company_id)))["ETag"]
+
+    async def scenario():
+        tags = []
+        async with pg_sessions() as db:
+            company = Company(name="acme")
+            db.add(company)
+            await db.flush()
+            company_id = company.id
+
+            async def write(label, writer):
+                result = await writer
+                await db.commit()
+                tags.append((label, await etag(db, company_id)))
+                return result
+
+            tags.append(("initial", await etag(db, company_id)))
+
+            department = await write("create department", department_crud.create_department(db, DepartmentCreate(name="Engineering"), company_id))
+            await write("update department", department_crud.update_department(db, department, DepartmentUpdate(name="R&D")))
+            await write("delete department", department_crud.delete_department(db, department))
+
+            designation = await write("create designation", designation_crud.create_designation(
+                db, designation_in=DesignationCreate(name="Engineer"), company_id=company_id
+            ))
+            await write("update designation", designation_crud.update_designation(
+                db, db_designation=designation, designation_in=DesignationUpdate(name="Senior engineer")
+            ))
+            await write("delete designation", designation_crud.delete_designation(db, db_designation=designation))
+
+            document = await write("create document template", document_template_crud.create_document_template(
+                db, template_data=DocumentTemplateCreate(name="Passport", fields=[{"label": "Number", "type": "text"}]),
+                company_id=company_id,
+            ))
+            await write("update document template", document_template_crud.update_document_template(
+                db, template_id=document.id, template_data=DocumentTemplateUpdate(name="ID card"), company_id=company_id
+            ))
+
+            template = await write("create onboarding template", onboarding_template_crud.create_onboarding_template(
+                db, template_data=OnboardingTemplateCreate(
+                    name="default", todos=[{"title": "Sign contract"}], required_document_ids=[document.id]
+                ),
+                company_id=company_id,
+            ))
+            await write("update onboarding template", onboarding_template_crud.update_onboarding_template(
+                db, template_id=template.id, template_data=OnboardingTemplateUpdate(name="engineering"), company_id=company_id
+            ))
+            await write("delete onboarding template", onboarding_template_crud.delete_onboarding_template(db, template.id, company_id))
+            await write("delete document template", document_template_crud.delete_document_template(db, document.id, company_id))
+        return tags
+
+    tags = asyncio.run(scenario())
+
+    assert len(tags) == 13
+    for (_, before), (label, after) in zip(tags, tags[1:]):
+        assert after != before, f"{label} did not change the ETag"
+    assert len({tag for _, tag in tags}) == len(tags)
@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import importlib.util
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from jose import jwt
+from sqlalchemy import event, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from klaraflow.base.exceptions import APIException
+from klaraflow.config.settings import settings
+from klaraflow.core.cache import invalid_invitation_cache
+from klaraflow.core.security import generate_invitation_token, hash_invitation_token
+from klaraflow.crud import onboarding_crud
+from klaraflow.models import Company, OnboardingSession
+
+MIGRATION = Path(__file__).parents[1] / "alembic" / "versions" / "e91b3c5d7a20_hashed_invitation_tokens.py"
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("hashed_invitation_tokens", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_jwt_token() -> str:
+    """An invitation link as issued before tokens were hashed: a signed JWT."""
+    expires = datetime.now(timezone.utc) + timedelta(hours=24)
+    return jwt.encode(
+        {"sub": "new.hire@example.com", "company_id": 1, "type": "onboarding", "exp": expires},
+        settings.SECRET_KEY,
+        algorithm=settings.JWT_ALG,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_invalid_invitations():
+    invalid_invitation_cache.clear()
+    yield
+    invalid_invitation_cache.clear()
+
+
+def test_hash_is_sha256_of_utf8_token():
+    token = legacy_jwt_token()
+    assert hash_invitation_token(token) == hashlib.sha256(token.encode("utf-8")).digest()
+    assert len(hash_invitation_token(generate_invitation_token())) == 32
+
+
+def test_migration_digest_matches_hash_invitation_token(pg_sessions):
+    digest_sql = load_migration().LEGACY_TOKEN_DIGEST_SQL
+    tokens = [legacy_jwt_token(), generate_invitation_token(), "émployée-ünïcode-token"]
+
+    async def digests():
+        async with pg_sessions() as db:
+            return [
+                (await db.execute(
+                    text(f"SELECT {digest_sql} FROM (VALUES (CAST(:token AS varchar))) AS legacy(invitation_token)"),
+                    {"token": token},
+                )).scalar_one()
+                for token in tokens
+            ]
+
+    assert asyncio.run(digests()) == [hash_invitation_token(token) for token in tokens]
+
+
+def test_migrated_legacy_link_is_found_by_get_session_by_token(pg_sessions):
+    digest_sql = load_migration().LEGACY_TOKEN_DIGEST_SQL
+    token = legacy_jwt_token()
+
+    async def scenario():
+        async with pg_sessions() as db:
+            company = Company(name="acme")
+            db.add(company)
+            await db.flush()
+            session = OnboardingSession(
+                company_id=company.id,
+                new_employee_email="new.hire@example.com",
+                invitation_token_hash=b"\0" * 32,
+                created_at=datetime.now(timezone.utc),
+                expires_at=datetime.now(timezone.utc) + timedelta(hours=24),
+            )
+            db.add(session)
+            await db.flush()
+            # Digest written by the migration's SQL, as for links issued before it ran
+            await db.execute(
+                update(OnboardingSession)
+                .where(OnboardingSession.id == session.id)
+                .values(invitation_token_hash=text(
+                    f"(SELECT {digest_sql} FROM (VALUES (CAST(:token AS varchar))) AS legacy(invitation_token))"
+                ).bindparams(token=token))
+            )
+            await db.commit()
+
+        async with pg_sessions() as db:
+            found = await onboarding_crud.get_session_by_token(db, token=token)
+            return session.id, found.id
+
+    created_id, found_id = asyncio.run(scenario())
+    assert found_id == created_id
+
+
+def test_unknown_token_is_served_from_the_invalid_invitation_cache():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(OnboardingSession.__table__.create)
+        statements.clear()
+        async with AsyncSession(engine) as db:
+            for _ in range(2):
+                with pytest.raises(APIException) as error:
+                    await onboarding_crud.get_session_by_token(db, token="no-such-invitation")
+                assert error.value.status_code == 404
+        await engine.dispose()
+
+    hits = invalid_invitation_cache.hits
+    asyncio.run(scenario())
+
+    assert len(statements) == 1
+    assert invalid_invitation_cache.hits == hits + 1
+    assert invalid_invitation_cache.get(hash_invitation_token("no-such-invitation")) is True
@@ -0,0 +1,98 @@
+import base64
+import hashlib
+import os
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from klaraflow.api.v1 import local_storage_router
+from klaraflow.base.exceptions import APIException, api_exception_handler
+from klaraflow.config.settings import settings
+from klaraflow.core.storage import storage
+
+KEY = "blobs/1/ab/abcdef"
+BODY = b"%PDF-1.7 signed upload"
+CHECKSUM = base64.b64encode(hashlib.sha256(BODY).digest()).decode()
+
+
+def signed(url: str) -> tuple[int, str]:
+    query = parse_qs(urlsplit(url).query)
+    return int(query["expires"][0]), query["signature"][0]
+
+
+@pytest.fixture(autouse=True)
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "root", str(tmp_path))
+    yield tmp_path
+    storage.shutdown()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_exception_handler(APIException, api_exception_handler)
+    app.include_router(local_storage_router.router, prefix=settings.LOCAL_STORAGE_URL_PREFIX)
+    return TestClient(app)
+
+
+def test_presigned_put_verifies_only_the_signed_request():
+    expires, signature = signed(storage.presign_put(KEY, "application/pdf", len(BODY), CHECKSUM, expires_in=60))
+
+    assert storage.verify_presigned_put(KEY, "application/pdf", len(BODY), CHECKSUM, expires, signature)
+    # Every signed value is part of the signature
+    assert not storage.verify_presigned_put("blobs/1/ab/other", "application/pdf", len(BODY), CHECKSUM, expires, signature)
+    assert not storage.verify_presigned_put(KEY, "image/png", len(BODY), CHECKSUM, expires, signature)
+    assert not storage.verify_presigned_put(KEY, "application/pdf", len(BODY) + 1, CHECKSUM, expires, signature)
+    assert not storage.verify_presigned_put(KEY, "application/pdf", len(BODY), base64.b64encode(b"0" * 32).decode(), expires, signature)
+    assert not storage.verify_presigned_put(KEY, "application/pdf", len(BODY), CHECKSUM, expires + 3600, signature)
+    assert not storage.verify_presigned_put(KEY, "application/pdf", len(BODY), CHECKSUM, expires, "0" * 64)
+
+
+def test_presigned_put_expires():
+    expires, signature = signed(storage.presign_put(KEY, "application/pdf", len(BODY), CHECKSUM, expires_in=-1))
+
+    assert not storage.verify_presigned_put(KEY, "application/pdf", len(BODY), CHECKSUM, expires, signature)
+
+
+def test_signature_depends_on_the_secret_key(monkeypatch):
+    expires, signature = signed(storage.presign_put(KEY, "application/pdf", len(BODY), CHECKSUM, expires_in=60))
+    monkeypatch.setattr(settings, "SECRET_KEY", "another-secret")
+
+    assert not storage.verify_presigned_put(KEY, "application/pdf", len(BODY), CHECKSUM, expires, signature)
+
+
+def put(client, url: str, body: bytes, content_type: str = "application/pdf", checksum: str = CHECKSUM):
+    return client.put(url, content=body, headers={"Content-Type": content_type, "x-amz-checksum-sha256": checksum})
+
+
+def test_put_stores_the_object_as_a_shared_key(client, local_storage, monkeypatch):
+    calls = []
+    put_bytes = storage.put_bytes
+
+    async def recording_put_bytes(key, data, content_type, shared_key=False):
+        calls.append((key, shared_key))
+        return await put_bytes(key, data, content_type, shared_key=shared_key)
+
+    monkeypatch.setattr(storage, "put_bytes", recording_put_bytes)
+    url = storage.presign_put(KEY, "application/pdf", len(BODY), CHECKSUM, expires_in=60)
+
+    assert put(client, url, BODY).status_code == 200
+    with open(os.path.join(local_storage, KEY), "rb") as stored:
+        assert stored.read() == BODY
+    # A timed-out write must not delete a blob another upload may have registered
+    assert calls == [(KEY, True)]
+
+
+def test_put_rejects_expired_tampered_and_mismatched_uploads(client, local_storage):
+    url = storage.presign_put(KEY, "application/pdf", len(BODY), CHECKSUM, expires_in=60)
+    expired = storage.presign_put(KEY, "application/pdf", len(BODY), CHECKSUM, expires_in=-1)
+    other = BODY[:-1] + b"!"
+
+    assert put(client, expired, BODY).status_code == 403
+    assert put(client, url, BODY, content_type="image/png").status_code == 403
+    # Same length, different content: the signature holds, the checksum does not
+    assert put(client, url, other).status_code == 400
+    assert put(client, url, other, checksum=base64.b64encode(hashlib.sha256(other).digest()).decode()).status_code == 403
+    assert not os.path.exists(os.path.join(local_storage, KEY))
@@ -0,0 +1,196 @@
+import asyncio
+import os
+
+import pytest
+
+from klaraflow.base.exceptions import APIException
+from klaraflow.config.settings import settings
+from klaraflow.core.storage import storage
+from klaraflow.core.multipart_upload import UploadLimits, stream_multipart_upload
+
+BOUNDARY = "----klaraflowtestboundary"
+
+
+class FakeRequest:
+    """The parts of a Starlette request the parser uses: headers and the body stream."""
+
+    def __init__(self, body: bytes, chunk_size: int):
+        self.headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def stream(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start:start + self.chunk_size]
+
+
+def multipart_body(*parts) -> bytes:
+    """`parts` are (name, value) for fields and (name, filename, content_type, data) for files."""
+    body = b""
+    for part in parts:
+        body += f"--{BOUNDARY}\r\n".encode()
+        if len(part) == 2:
+            name, value = part
+            body += f'Content-Disposition: form-data; name="{name}"\r\n\r\n'.encode() + value.encode()
+        else:
+            name, filename, content_type, data = part
+            body += (
+                f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode() + data
+        body += b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def upload(body: bytes, limits: UploadLimits, chunk_size: int = 64 * 1024):
+    return asyncio.run(stream_multipart_upload(FakeRequest(body, chunk_size), folder="tests", limits=limits))
+
+
+def stored_files(root) -> list:
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, names in os.walk(root)
+        for name in names
+    )
+
+
+def stored_bytes(root, url: str) -> bytes:
+    with open(os.path.join(root, url.removeprefix(settings.LOCAL_STORAGE_URL_PREFIX + "/")), "rb") as f:
+        return f.read()
+
+
+@pytest.fixture(autouse=True)
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "root", str(tmp_path))
+    # Small parts, so files of a few KB already take the multipart path
+    monkeypatch.setattr(settings, "UPLOAD_PART_SIZE_BYTES", 1024)
+    yield tmp_path
+    # The pool's semaphore belongs to the event loop of the test that started it
+    storage.shutdown()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 13, 64, 1000, 4096])
+def test_chunk_boundaries_anywhere_in_headers_and_delimiters(local_storage, chunk_size):
+    small = b"tiny file\r\n--not-a-boundary"
+    large = bytes(range(256)) * 20  # 5 parts of 1024 bytes
+    body = multipart_body(
+        ("employee_id", "EMP-1"),
+        ("doc", "small.txt", "text/plain", small),
+        ("fields", '{"a": 1}'),
+        ("doc", "large.bin", "application/octet-stream", large),
+    )
+
+    form = upload(body, UploadLimits(max_file_size=len(large)), chunk_size)
+
+    assert form.fields == {"employee_id": "EMP-1", "fields": '{"a": 1}'}
+    assert [(f.field_name, f.filename, f.content_type, f.size) for f in form.files] == [
+        ("doc", "small.txt", "text/plain", len(small)),
+        ("doc", "large.bin", "application/octet-stream", len(large)),
+    ]
+    assert stored_bytes(local_storage, form.files[0].url) == small
+    assert stored_bytes(local_storage, form.files[1].url) == large
+    # Multipart parts were assembled and removed
+    assert not any(path.startswith(".multipart") for path in stored_files(local_storage))
+
+
+def test_file_over_per_file_limit_is_rejected_with_413(local_storage):
+    body = multipart_body(("doc", "big.bin", "application/octet-stream", b"x" * 3000))
+
+    with pytest.raises(APIException) as error:
+        upload(body, UploadLimits(max_file_size=2999), chunk_size=100)
+
+    assert error.value.status_code == 413
+    assert stored_files(local_storage) == []
+
+
+def test_files_over_total_limit_are_rejected_with_413(local_storage):
+    body = multipart_body(
+        ("doc", "a.bin", "application/octet-stream", b"a" * 1500),
+        ("doc", "b.bin", "application/octet-stream", b"b" * 1500),
+    )
+    limits = UploadLimits(max_file_size=2000, max_total_size=2999)
+
+    with pytest.raises(APIException) as error:
+        upload(body, limits, chunk_size=100)
+
+    assert error.value.status_code == 413
+    assert stored_files(local_storage) == []
+    # Each file is within the per-file limit, so the same files pass without the total limit
+    assert len(upload(body, UploadLimits(max_file_size=2000)).files) == 2
+
+
+def test_oversized_form_field_is_rejected_with_413(local_storage, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_FIELD_BYTES", 10)
+    body = multipart_body(("fields", "x" * 11))
+
+    with pytest.raises(APIException) as error:
+        upload(body, UploadLimits(max_file_size=1024))
+
+    assert error.value.status_code == 413
+
+
+def test_more_files_than_allowed_are_rejected_with_400(local_storage):
+    body = multipart_body(
+        ("profilePic", "first.png", "image/png", b"first"),
+        ("profilePic", "second.png", "image/png", b"second"),
+    )
+    limits = UploadLimits(max_file_size=1024, file_fields={"profilePic"}, max_files=1)
+
+    with pytest.raises(APIException) as error:
+        upload(body, limits)
+
+    assert error.value.status_code == 400
+    # The first picture was stored before the second part arrived, and removed again
+    assert stored_files(local_storage) == []
+
+
+def test_unexpected_content_type_is_rejected_with_415(local_storage):
+    body = multipart_body(("profilePic", "pic.gif", "image/gif", b"GIF89a"))
+    limits = UploadLimits(max_file_size=1024, allowed_content_types=["image/png"])
+
+    with pytest.raises(APIException) as error:
+        upload(body, limits)
+
+    assert error.value.status_code == 415
+    assert stored_files(local_storage) == []
+
+
+def test_abort_deletes_stored_files_and_aborts_open_multipart_upload(local_storage):
+    # Fails in the middle of the second file, after several of its parts were uploaded
+    body = multipart_body(
+        ("doc", "done.bin", "application/octet-stream", b"d" * 2500),
+        ("doc", "open.bin", "application/octet-stream", b"o" * 6000),
+    )
+
+    with pytest.raises(APIException):
+        upload(body, UploadLimits(max_file_size=5000), chunk_size=512)
+
+    assert stored_files(local_storage) == []
+    assert not os.listdir(os.path.join(local_storage, ".multipart"))
+
+
+def test_body_ending_inside_a_file_is_rejected_and_cleaned_up(local_storage):
+    body = multipart_body(
+        ("doc", "done.txt", "text/plain", b"complete"),
+        ("doc", "cut.bin", "application/octet-stream", b"c" * 3000),
+    )
+    truncated = body[:body.rindex(b"c") - 100]
+
+    with pytest.raises(APIException) as error:
+        upload(truncated, UploadLimits(max_file_size=5000), chunk_size=256)
+
+    assert error.value.status_code == 400
+    assert stored_files(local_storage) == []
+
+
+def test_discard_deletes_every_stored_file(local_storage):
+    body = multipart_body(
+        ("doc", "a.txt", "text/plain", b"a"),
+        ("doc", "b.bin", "application/octet-stream", b"b" * 3000),
+    )
+    form = upload(body, UploadLimits(max_file_size=5000))
+    assert len(stored_files(local_storage)) == 2
+
+    asyncio.run(form.discard())
+
+    assert stored_files(local_storage) == []
@@ -0,0 +1,85 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, text
+
+from klaraflow.base.responses import create_response
+from klaraflow.core.cache import onboarding_view_cache
+from klaraflow.crud import onboarding_crud
+from klaraflow.models import (
+    Company, DocumentField, DocumentSubmission, DocumentTemplate, OnboardingSession, OnboardingTask,
+    OnboardingTemplate, TodoItem,
+)
+from klaraflow.models.onboarding.onboarding_template_model import (
+    onboarding_template_optional_documents, onboarding_template_required_documents,
+)
+from klaraflow.models.settings.document_template_model import FieldTypeEnum, FieldWidthEnum
+
+EMAIL = "new.hire@example.com"
+MESSAGE = "Onboarding data retrieved successfully"
+
+
+async def seed(db) -> None:
+    company = Company(name="acme")
+    db.add(company)
+    await db.flush()
+    template = OnboardingTemplate(company_id=company.id, name="default")
+    passport = DocumentTemplate(company_id=company.id, name="Passport")
+    photo = DocumentTemplate(company_id=company.id, name="Photo")
+    db.add_all([template, passport, photo])
+    await db.flush()
+    await db.execute(insert(onboarding_template_required_documents).values(onboarding_template_id=template.id, document_template_id=passport.id))
+    await db.execute(insert(onboarding_template_optional_documents).values(onboarding_template_id=template.id, document_template_id=photo.id))
+    signed = TodoItem(template_id=template.id, title="Sign contract")
+    db.add_all([
+        signed,
+        TodoItem(template_id=template.id, title="Set up laptop", description="IT desk", order_index=1),
+        DocumentField(template_id=passport.id, label="Number", field_type=FieldTypeEnum.TEXT, width=FieldWidthEnum.HALF),
+        DocumentField(template_id=passport.id, label="Scan", field_type=FieldTypeEnum.FILE, placeholder="PDF", description="Both pages"),
+    ])
+    session = OnboardingSession(
+        company_id=company.id,
+        new_employee_email=EMAIL,
+        invitation_token_hash=b"\0" * 32,
+        created_at=datetime.now(timezone.utc),
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=24),
+        firstName="Zoë",
+        empId="E1",
+        template_id=template.id,
+    )
+    db.add(session)
+    await db.flush()
+    db.add_all([
+        OnboardingTask(session_id=session.id, todo_item_id=signed.id, title=signed.title, is_completed=True),
+        DocumentSubmission(template_id=passport.id, employee_id="E1", company_id=company.id, session_id=session.id, field_values={}),
+    ])
+    await db.commit()
+
+
+def test_sql_json_path_matches_the_orm_path(pg_sessions):
+    onboarding_view_cache.clear()
+
+    async def scenario():
+        async with pg_sessions() as db:
+            await seed(db)
+        async with pg_sessions() as db:
+            # The SQL path must not depend on the session's time zone
+            await db.execute(text("SET TIME ZONE 'Asia/Kolkata'"))
+            data = await onboarding_crud.get_onboarding_data_for_user(db, user_email=EMAIL)
+            orm_body = create_response(data=data, message=MESSAGE, exclude_none=True).body
+            json_body = await onboarding_crud.get_onboarding_data_json(db, user_email=EMAIL, message=MESSAGE)
+            return orm_body, json_body
+
+    orm_body, json_body = asyncio.run(scenario())
+
+    orm, sql = json.loads(orm_body), json.loads(json_body)
+    assert sql == orm
+    # What the comparison covers: dropped None fields, kept nulls in field dicts, UTC offsets
+    assert "phone" not in orm["data"]
+    assert "description" not in orm["data"]["todos"][0]
+    assert orm["data"]["todos"][0]["is_completed"] is True
+    assert orm["data"]["required_documents"][0]["uploaded"] is True
+    assert orm["data"]["required_documents"][0]["fields"][0]["placeholder"] is None
+    assert orm["data"]["required_documents"][0]["created_at"].endswith("+00:00")
+    assert orm["data"]["optional_documents"][0]["fields"] == []
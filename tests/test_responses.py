@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from klaraflow.base.responses import SuccessResponse, create_response
+from klaraflow.schemas.department_schema import DepartmentRead
+from klaraflow.schemas.onboarding_schema import OnboardingDataRead, OnboardingSessionRead
+
+CREATED_AT = datetime(2025, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def legacy_body(data, message=None) -> bytes:
+    """create_response as it was before responses were serialized in one pass."""
+    content = jsonable_encoder(SuccessResponse(data=data, message=message).model_dump(exclude_none=True))
+    return JSONResponse(content=content).body
+
+
+def onboarding_data() -> OnboardingDataRead:
+    # None fields on the model and its todos, and None values inside the plain field dicts
+    return OnboardingDataRead(
+        new_employee_email="new.hire@example.com",
+        firstName="Zoë",
+        phone=None,
+        status="pending",
+        current_step=1,
+        todos=[
+            {"id": 1, "template_id": 2, "title": "Sign contract", "description": None, "created_at": CREATED_AT},
+            {"id": 2, "template_id": 2, "title": "Set up laptop", "description": "IT desk", "created_at": CREATED_AT.replace(microsecond=0)},
+        ],
+        required_documents=[{
+            "id": 3,
+            "name": "Passport",
+            "fields": [{"id": 4, "label": "Number", "placeholder": None, "created_at": CREATED_AT}],
+            "required": True,
+            "created_at": CREATED_AT,
+            "updated_at": CREATED_AT,
+        }],
+    )
+
+
+def test_exclude_none_encodes_models_like_before():
+    data = onboarding_data()
+
+    body = create_response(data=data, message="Onboarding data retrieved successfully", exclude_none=True).body
+
+    assert body == legacy_body(data, "Onboarding data retrieved successfully")
+    assert b'"created_at":"2025-03-01T09:30:15.123456+00:00"' in body
+    assert b'"phone"' not in body
+    assert b'"description":null' not in body
+    # Plain dicts keep their None values, as model_dump(exclude_none=True) always did
+    assert b'"placeholder":null' in body
+
+
+def test_exclude_none_lists_of_models():
+    departments = [DepartmentRead(id=1, company_id=1, name="Engineering"), DepartmentRead(id=2, company_id=1, name="Sales")]
+
+    assert create_response(data=departments, exclude_none=True).body == legacy_body(departments)
+
+
+def test_models_match_model_dump_json_mode():
+    # Routes that already sent model_dump(mode="json") now pass the model itself
+    session = OnboardingSessionRead(
+        id=1, company_id=1, new_employee_email="new.hire@example.com", firstName="New", lastName=None, empId="E1",
+        status="pending", current_step=0, expires_at=CREATED_AT, created_at=CREATED_AT,
+    )
+
+    body = create_response(data=session, message="Invitation sent successfully").body
+
+    assert body == legacy_body(session.model_dump(mode="json"), "Invitation sent successfully")
+    assert b'"lastName":null' in body
+
+
+def test_dict_data_is_encoded_like_before():
+    data = {"uploaded_at": CREATED_AT, "amount": Decimal("12.50"), "missing": None, "items": [{"at": CREATED_AT}]}
+
+    assert create_response(data=data, message="Document submitted successfully").body == legacy_body(data, "Document submitted successfully")